@@ -7,19 +7,28 @@ with random actions and reward tracking.
 """
 
 import logging
-import time
 from typing import Dict, Any
 
-import gymnasium as gym
 import numpy as np
+from gymnasium.vector.utils import iterate
 
-from asana_replica_rl_env import AsanaReplicaEnv, EnvironmentConfig
+from asana_replica_rl_env import EnvironmentConfig
+from asana_replica_rl_env.logging_utils import start_queue_logging
 from asana_replica_rl_env.training_manager import TrainingEpisodeManager
+from asana_replica_rl_env.vector import make_vec, unbatch_info
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Parallel rollout settings: each worker drives its own browser against its
+# own instance of the application so sub-environments don't share task state.
+NUM_WORKERS = 4
+BASE_PORT = 3000
+
+# Seed for the random action generator
+SEED = 42
+
 
 def main():
     """Run basic training with random actions."""
@@ -35,44 +44,70 @@ def main():
         save_screenshots=False,
     )
     
-    # Create environment
-    env = AsanaReplicaEnv(config)
+    # Create vectorized environment (one browser per worker process)
+    base_urls = [f"http://localhost:{BASE_PORT + i}" for i in range(NUM_WORKERS)]
+    env = make_vec(NUM_WORKERS, config, base_urls)
+    action_meanings = env.call("get_action_meanings")[0]
     
-    # Create training manager
-    training_manager = TrainingEpisodeManager(config, log_dir="./logs/basic_training")
+    # Hand log output to a background thread now that the workers are forked
+    log_listener = start_queue_logging(log_file="./logs/basic_training/training.log")
+    
+    # Create one training manager per worker
+    training_managers = [
+        TrainingEpisodeManager(config, log_dir=f"./logs/basic_training/worker_{i}")
+        for i in range(NUM_WORKERS)
+    ]
     
     # Training parameters
     num_episodes = 10
     
-    logger.info(f"Starting basic training for {num_episodes} episodes")
-    logger.info(f"Action space: {env.action_space}")
-    logger.info(f"Observation space: {env.observation_space}")
+    rng = np.random.Generator(np.random.SFC64(SEED))
+    num_actions = env.single_action_space.n
+    
+    logger.info(f"Starting basic training for {num_episodes} episodes on {NUM_WORKERS} workers")
+    logger.info(f"Action space: {env.single_action_space}")
+    logger.info(f"Observation space: {env.single_observation_space}")
     
     try:
-        for episode in range(num_episodes):
-            logger.info(f"\n--- Episode {episode + 1}/{num_episodes} ---")
-            
-            # Start episode
-            training_manager.start_episode(episode + 1)
-            
-            # Reset environment
-            observation, info = env.reset()
-            logger.info(f"Episode started. Info: {info}")
+        # Start one episode per worker; finished workers pick up the next one
+        episodes_started = min(NUM_WORKERS, num_episodes)
+        for worker in range(episodes_started):
+            training_managers[worker].start_episode(worker + 1)
+        
+        # Reset environments once; sub-environments autoreset from here on
+        observations, infos = env.reset()
+        logger.info(f"Episodes started. Info: {infos}")
+        
+        episode_rewards = np.zeros(NUM_WORKERS)
+        step_counts = np.zeros(NUM_WORKERS, dtype=np.int64)
+        active = np.arange(NUM_WORKERS) < num_episodes
+        
+        while active.any():
+            # Take random actions for all workers
+            actions = rng.integers(num_actions, size=NUM_WORKERS)
             
-            episode_reward = 0.0
-            step_count = 0
+            # Execute actions
+            observations, rewards, terminated, truncated, infos = env.step(actions)
             
-            while True:
-                # Take random action
-                action = env.action_space.sample()
-                action_name = env.get_action_meanings()[action]
+            for worker, observation in enumerate(iterate(env.observation_space, observations)):
+                if not active[worker]:
+                    continue
+                
+                action = int(actions[worker])
+                action_name = action_meanings[action]
+                reward = float(rewards[worker])
+                info = unbatch_info(infos, worker)
+                done = terminated[worker] or truncated[worker]
+                training_manager = training_managers[worker]
                 
-                # Execute action
-                observation, reward, terminated, truncated, info = env.step(action)
+                # The observation of a finished worker already belongs to its next episode
+                if done:
+                    observation = info["final_obs"]
+                    info = info["final_info"]
                 
                 # Log step
                 training_manager.log_step(
-                    step_number=step_count,
+                    step_number=int(step_counts[worker]),
                     action=action,
                     action_name=action_name,
                     reward=reward,
@@ -80,38 +115,46 @@ def main():
                     info=info
                 )
                 
-                episode_reward += reward
-                step_count += 1
+                episode_rewards[worker] += reward
+                step_counts[worker] += 1
                 
-                logger.info(f"Step {step_count}: {action_name} -> Reward: {reward:.3f}, "
-                           f"Cumulative: {episode_reward:.3f}")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"[Worker {worker}] Step {step_counts[worker]}: {action_name} -> Reward: {reward:.3f}, "
+                               f"Cumulative: {episode_rewards[worker]:.3f}")
                 
-                if info.get("reward_components"):
-                    logger.debug(f"Reward breakdown: {info['reward_components']}")
+                components = info.get("reward_components")
+                if components:
+                    logger.debug("Reward breakdown: %s", components)
                 
                 # Check termination
-                if terminated or truncated:
-                    termination_reason = "terminated" if terminated else "truncated"
-                    logger.info(f"Episode ended: {termination_reason}")
-                    break
-            
-            # End episode
-            episode_summary = training_manager.end_episode(
-                final_reward=episode_reward,
-                episode_length=step_count,
-                termination_reason=termination_reason,
-                reward_calculator=env.reward_calculator
-            )
-            
-            # Print episode summary
-            logger.info(f"Episode {episode + 1} Summary:")
-            logger.info(f"  Total Reward: {episode_summary['episode_reward']:.2f}")
-            logger.info(f"  Episode Length: {episode_summary['episode_length']}")
-            logger.info(f"  Average Reward: {episode_summary['episode_reward'] / episode_summary['episode_length']:.3f}")
-            logger.info(f"  Recent Avg Reward: {episode_summary['recent_avg_reward']:.2f}")
-            
-            # Brief pause between episodes
-            time.sleep(1.0)
+                if done:
+                    termination_reason = "terminated" if terminated[worker] else "truncated"
+                    logger.info(f"[Worker {worker}] Episode ended: {termination_reason}")
+                    
+                    # End episode
+                    episode_summary = training_manager.end_episode(
+                        final_reward=float(episode_rewards[worker]),
+                        episode_length=int(step_counts[worker]),
+                        termination_reason=termination_reason,
+                        episode_bonus=info.get("episode_bonus"),
+                        episode_statistics=info.get("episode_statistics"),
+                    )
+                    
+                    # Print episode summary
+                    logger.info(f"Episode {episode_summary['episode_number']} Summary (worker {worker}):")
+                    logger.info(f"  Total Reward: {episode_summary['episode_reward']:.2f}")
+                    logger.info(f"  Episode Length: {episode_summary['episode_length']}")
+                    logger.info(f"  Average Reward: {episode_summary['episode_reward'] / episode_summary['episode_length']:.3f}")
+                    logger.info(f"  Recent Avg Reward: {episode_summary['recent_avg_reward']:.2f}")
+                    
+                    # Roll over to the next episode
+                    episode_rewards[worker] = 0.0
+                    step_counts[worker] = 0
+                    if episodes_started < num_episodes:
+                        episodes_started += 1
+                        training_manager.start_episode(episodes_started)
+                    else:
+                        active[worker] = False
     
     except KeyboardInterrupt:
         logger.info("Training interrupted by user")
@@ -121,22 +164,25 @@ def main():
         raise
     
     finally:
-        # Save training summary
-        training_manager.save_training_summary()
-        
-        # Get final performance metrics
-        metrics = training_manager.get_performance_metrics()
-        logger.info("\n--- Final Training Metrics ---")
-        for key, value in metrics.items():
-            if isinstance(value, float):
-                logger.info(f"{key}: {value:.3f}")
-            else:
-                logger.info(f"{key}: {value}")
+        for worker, training_manager in enumerate(training_managers):
+            # Save training summary and stop the manager's background writers
+            training_manager.save_training_summary()
+            training_manager.close()
+            
+            # Get final performance metrics
+            metrics = training_manager.get_performance_metrics()
+            logger.info(f"\n--- Final Training Metrics (worker {worker}) ---")
+            for key, value in metrics.items():
+                if isinstance(value, float):
+                    logger.info(f"{key}: {value:.3f}")
+                else:
+                    logger.info(f"{key}: {value}")
         
         # Close environment
         env.close()
         logger.info("Training completed successfully")
+        log_listener.stop()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
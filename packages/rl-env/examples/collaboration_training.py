@@ -7,56 +7,105 @@ focusing on team interaction and communication features.
 """
 
 import logging
-import time
-from typing import Dict, Any, List
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
 
-import gymnasium as gym
 import numpy as np
+from gymnasium.vector.utils import iterate
 
-from asana_replica_rl_env import AsanaReplicaEnv, EnvironmentConfig
+from asana_replica_rl_env import EnvironmentConfig
+from asana_replica_rl_env.logging_utils import start_queue_logging
 from asana_replica_rl_env.training_manager import TrainingEpisodeManager
-from asana_replica_rl_env.reward_calculator import RewardScenarioManager
+from asana_replica_rl_env.reward_calculator import get_scenario_config
+from asana_replica_rl_env.stats import RunningStats
+from asana_replica_rl_env.vector import make_vec, unbatch_info
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Parallel rollout settings: each worker drives its own browser against its
+# own instance of the application so sub-environments don't share task state.
+NUM_WORKERS = 4
+BASE_PORT = 3000
+
+# Seed for the action-sampling generator shared by the agents
+SEED = 42
+
 
 class CollaborationAgent:
     """
     An agent that focuses on collaboration and team interaction actions.
     """
     
-    def __init__(self, action_meanings: Dict[int, str]):
+    def __init__(self, action_meanings: Dict[int, str], rng: Optional[np.random.Generator] = None):
         """Initialize the collaboration-focused agent."""
         self.action_meanings = action_meanings
         
         # Define collaboration-focused action priorities
-        self.collaboration_actions = [
+        self.collaboration_actions = frozenset([
             "add_comment",
             "reply_to_comment",
             "mention_user",
             "set_task_assignee",
             "add_project_member",
-        ]
+        ])
         
-        self.task_management_actions = [
+        self.task_management_actions = frozenset([
             "create_new_task",
             "edit_task_description",
             "set_task_due_date",
             "set_task_priority",
-        ]
+        ])
         
-        self.project_actions = [
+        self.project_actions = frozenset([
             "create_new_project",
             "edit_project",
             "add_project_member",
-        ]
+        ])
         
         # Track interaction patterns
-        self.recent_actions: List[str] = []
+        self.recent_actions: Deque[str] = deque(maxlen=10)
         self.comment_count = 0
         self.assignment_count = 0
+        
+        # Precompute candidate action IDs for each phase of the episode
+        setup_actions = self.project_actions | {"navigate_to_projects", "create_new_task"}
+        self._setup_ids = self._action_ids(lambda name: name in setup_actions)
+        self._collab_ids = self._action_ids(lambda name: name in self.collaboration_actions)
+        self._task_ids = self._action_ids(lambda name: name in self.task_management_actions)
+        self._completion_ids = self._action_ids(
+            lambda name: "completed" in name or name in {"add_comment", "edit_task_description"}
+        )
+        self._all_ids = np.array(list(action_meanings.keys()), dtype=np.int64)
+        
+        # Weighted mid-episode selection favoring collaboration
+        self._collab_task_ids = np.concatenate([self._collab_ids, self._task_ids])
+        weights = np.concatenate([
+            np.full(len(self._collab_ids), 3.0),
+            np.full(len(self._task_ids), 1.0),
+        ])
+        self._weights = weights / np.sum(weights) if len(weights) else weights
+        
+        # Actions are drawn in chunks from the (possibly shared) generator
+        self._rng = rng if rng is not None else np.random.default_rng()
+        self._sample_buf: Dict[str, List[int]] = {}
+    
+    def _action_ids(self, predicate: Callable[[str], bool]) -> np.ndarray:
+        """Return the IDs of all actions whose name satisfies the predicate."""
+        return np.array(
+            [action_id for action_id, action_name in self.action_meanings.items() if predicate(action_name)],
+            dtype=np.int64,
+        )
+    
+    def _sample(self, key: str, ids: np.ndarray, p: Optional[np.ndarray] = None, chunk: int = 256) -> int:
+        """Return the next pre-sampled action ID for ``key``, refilling its buffer when empty."""
+        buffer = self._sample_buf.get(key)
+        if not buffer:
+            buffer = self._rng.choice(ids, size=chunk, p=p).tolist()
+            buffer.reverse()
+            self._sample_buf[key] = buffer
+        return buffer.pop()
     
     def select_action(self, observation: Any, step_count: int) -> int:
         """
@@ -69,52 +118,29 @@ class CollaborationAgent:
         Returns:
             Selected action ID
         """
-        # Update recent actions history
-        if len(self.recent_actions) > 10:
-            self.recent_actions = self.recent_actions[-10:]
-        
         # Early episode: Set up projects and tasks
         if step_count < 15:
-            setup_actions = [
-                action_id for action_id, action_name in self.action_meanings.items()
-                if action_name in self.project_actions + ["navigate_to_projects", "create_new_task"]
-            ]
-            if setup_actions:
-                return np.random.choice(setup_actions)
+            if len(self._setup_ids):
+                return self._sample("setup", self._setup_ids)
         
-        # Mid episode: Focus on collaboration
+        # Mid episode: Focus on collaboration, mixing in some task management
         elif step_count < 80:
-            # Prioritize collaboration actions
-            collab_actions = [
-                action_id for action_id, action_name in self.action_meanings.items()
-                if action_name in self.collaboration_actions
-            ]
-            
-            # Mix in some task management
-            task_actions = [
-                action_id for action_id, action_name in self.action_meanings.items()
-                if action_name in self.task_management_actions
-            ]
-            
-            # Weighted selection favoring collaboration
-            all_actions = collab_actions + task_actions
-            weights = [3.0] * len(collab_actions) + [1.0] * len(task_actions)
-            
-            if all_actions:
-                weights = np.array(weights) / np.sum(weights)
-                return np.random.choice(all_actions, p=weights)
+            if len(self._collab_task_ids):
+                return self._sample("collab", self._collab_task_ids, self._weights)
         
         # Late episode: Complete tasks and add final comments
         else:
-            completion_actions = [
-                action_id for action_id, action_name in self.action_meanings.items()
-                if "completed" in action_name or action_name in ["add_comment", "edit_task_description"]
-            ]
-            if completion_actions:
-                return np.random.choice(completion_actions)
+            if len(self._completion_ids):
+                return self._sample("completion", self._completion_ids)
         
         # Fallback: random action
-        return np.random.choice(list(self.action_meanings.keys()))
+        return self._sample("fallback", self._all_ids)
+    
+    def reset_episode(self) -> None:
+        """Clear per-episode interaction tracking."""
+        self.recent_actions.clear()
+        self.comment_count = 0
+        self.assignment_count = 0
     
     def update_action_history(self, action_name: str) -> None:
         """Update action history for pattern tracking."""
@@ -130,8 +156,7 @@ def main():
     """Run collaboration-focused training."""
     
     # Load collaboration reward configuration
-    scenario_manager = RewardScenarioManager()
-    reward_config = scenario_manager.get_scenario_config("collaboration")
+    reward_config = get_scenario_config("collaboration")
     
     # Configure environment
     config = EnvironmentConfig(
@@ -144,64 +169,92 @@ def main():
         debug_mode=True,
     )
     
-    # Create environment
-    env = AsanaReplicaEnv(config)
+    # Create vectorized environment (one browser per worker process)
+    base_urls = [f"http://localhost:{BASE_PORT + i}" for i in range(NUM_WORKERS)]
+    env = make_vec(NUM_WORKERS, config, base_urls)
+    action_meanings = env.call("get_action_meanings")[0]
     
-    # Create training manager
-    training_manager = TrainingEpisodeManager(config, log_dir="./logs/collaboration_training")
+    # Hand log output to a background thread now that the workers are forked
+    log_listener = start_queue_logging(log_file="./logs/collaboration_training/training.log")
     
-    # Create agent
-    agent = CollaborationAgent(env.get_action_meanings())
+    # Create one training manager and one agent per worker
+    training_managers = [
+        TrainingEpisodeManager(config, log_dir=f"./logs/collaboration_training/worker_{i}")
+        for i in range(NUM_WORKERS)
+    ]
+    rng = np.random.Generator(np.random.SFC64(SEED))
+    agents = [CollaborationAgent(action_meanings, rng) for _ in range(NUM_WORKERS)]
     
     # Training parameters
     num_episodes = 15
     
-    logger.info(f"Starting collaboration training for {num_episodes} episodes")
+    logger.info(f"Starting collaboration training for {num_episodes} episodes on {NUM_WORKERS} workers")
     logger.info(f"Reward configuration: collaboration")
     
     # Track collaboration metrics
-    episode_rewards: List[float] = []
-    collaboration_scores: List[float] = []
+    reward_stats = RunningStats()
+    collaboration_stats = RunningStats()
+    recent_collaboration_scores: Deque[float] = deque(maxlen=3)
+    collaboration_scores: List[float] = []  # kept for the final improvement comparison
     
     try:
-        for episode in range(num_episodes):
-            logger.info(f"\n--- Episode {episode + 1}/{num_episodes} ---")
-            
-            # Reset agent state
-            agent.recent_actions.clear()
-            agent.comment_count = 0
-            agent.assignment_count = 0
-            
-            # Start episode
-            training_manager.start_episode(episode + 1)
+        # Start one episode per worker; finished workers pick up the next one
+        episodes_started = min(NUM_WORKERS, num_episodes)
+        for worker in range(episodes_started):
+            agents[worker].reset_episode()
+            training_managers[worker].start_episode(worker + 1)
+        
+        # Reset environments once; sub-environments autoreset from here on
+        observations, infos = env.reset()
+        logger.info(f"Episodes started")
+        
+        worker_rewards = np.zeros(NUM_WORKERS)
+        step_counts = np.zeros(NUM_WORKERS, dtype=np.int64)
+        collaboration_reward_totals = np.zeros(NUM_WORKERS)
+        active = np.arange(NUM_WORKERS) < num_episodes
+        
+        while active.any():
+            # Agents select actions
+            actions = np.array([
+                agent.select_action(observation, int(step_count))
+                for agent, observation, step_count in zip(
+                    agents, iterate(env.observation_space, observations), step_counts
+                )
+            ])
             
-            # Reset environment
-            observation, info = env.reset()
-            logger.info(f"Episode started")
+            # Update agents' action history
+            for worker, agent in enumerate(agents):
+                if active[worker]:
+                    agent.update_action_history(action_meanings[int(actions[worker])])
             
-            episode_reward = 0.0
-            step_count = 0
-            collaboration_reward_total = 0.0
+            # Execute actions
+            observations, rewards, terminated, truncated, infos = env.step(actions)
             
-            while True:
-                # Agent selects action
-                action = agent.select_action(observation, step_count)
-                action_name = env.get_action_meanings()[action]
+            for worker, observation in enumerate(iterate(env.observation_space, observations)):
+                if not active[worker]:
+                    continue
                 
-                # Update agent's action history
-                agent.update_action_history(action_name)
+                agent = agents[worker]
+                training_manager = training_managers[worker]
+                action = int(actions[worker])
+                action_name = action_meanings[action]
+                reward = float(rewards[worker])
+                info = unbatch_info(infos, worker)
+                done = terminated[worker] or truncated[worker]
                 
-                # Execute action
-                observation, reward, terminated, truncated, info = env.step(action)
+                # The observation of a finished worker already belongs to its next episode
+                if done:
+                    observation = info["final_obs"]
+                    info = info["final_info"]
                 
                 # Track collaboration rewards
-                if info.get("reward_components"):
-                    collab_reward = info["reward_components"].get("collaboration", 0.0)
-                    collaboration_reward_total += collab_reward
+                components = info.get("reward_components")
+                if components:
+                    collaboration_reward_totals[worker] += components["collaboration"]
                 
                 # Log step
                 training_manager.log_step(
-                    step_number=step_count,
+                    step_number=int(step_counts[worker]),
                     action=action,
                     action_name=action_name,
                     reward=reward,
@@ -209,55 +262,66 @@ def main():
                     info=info
                 )
                 
-                episode_reward += reward
-                step_count += 1
+                worker_rewards[worker] += reward
+                step_counts[worker] += 1
+                step_count = int(step_counts[worker])
                 
                 # Log collaboration actions
-                if action_name in agent.collaboration_actions:
-                    logger.info(f"Step {step_count}: COLLABORATION - {action_name} -> {reward:.3f}")
+                if action_name in agent.collaboration_actions and logger.isEnabledFor(logging.INFO):
+                    logger.info(f"[Worker {worker}] Step {step_count}: COLLABORATION - {action_name} -> {reward:.3f}")
                 
                 # Periodic progress report
                 if step_count % 25 == 0:
-                    logger.info(f"Step {step_count}: Comments: {agent.comment_count}, "
+                    logger.info(f"[Worker {worker}] Step {step_count}: Comments: {agent.comment_count}, "
                                f"Assignments: {agent.assignment_count}, "
-                               f"Collab Reward: {collaboration_reward_total:.2f}")
+                               f"Collab Reward: {collaboration_reward_totals[worker]:.2f}")
                 
                 # Check termination
-                if terminated or truncated:
-                    termination_reason = "terminated" if terminated else "truncated"
-                    logger.info(f"Episode ended: {termination_reason}")
-                    break
-            
-            # Calculate collaboration score
-            collaboration_score = collaboration_reward_total / max(1, step_count)
-            
-            # End episode
-            episode_summary = training_manager.end_episode(
-                final_reward=episode_reward,
-                episode_length=step_count,
-                termination_reason=termination_reason,
-                reward_calculator=env.reward_calculator
-            )
-            
-            # Track metrics
-            episode_rewards.append(episode_reward)
-            collaboration_scores.append(collaboration_score)
-            
-            # Print episode summary
-            logger.info(f"Episode {episode + 1} Summary:")
-            logger.info(f"  Total Reward: {episode_summary['episode_reward']:.2f}")
-            logger.info(f"  Collaboration Score: {collaboration_score:.3f}")
-            logger.info(f"  Comments Added: {agent.comment_count}")
-            logger.info(f"  Task Assignments: {agent.assignment_count}")
-            logger.info(f"  Collaboration Actions: {len([a for a in agent.recent_actions if a in agent.collaboration_actions])}")
-            
-            # Show improvement trend
-            if len(collaboration_scores) >= 3:
-                recent_collab_avg = np.mean(collaboration_scores[-3:])
-                logger.info(f"  Recent Collaboration Avg: {recent_collab_avg:.3f}")
-            
-            # Brief pause between episodes
-            time.sleep(0.5)
+                if done:
+                    termination_reason = "terminated" if terminated[worker] else "truncated"
+                    logger.info(f"[Worker {worker}] Episode ended: {termination_reason}")
+                    
+                    # Calculate collaboration score
+                    collaboration_score = collaboration_reward_totals[worker] / max(1, step_count)
+                    
+                    # End episode
+                    episode_summary = training_manager.end_episode(
+                        final_reward=float(worker_rewards[worker]),
+                        episode_length=step_count,
+                        termination_reason=termination_reason,
+                        episode_bonus=info.get("episode_bonus"),
+                        episode_statistics=info.get("episode_statistics"),
+                    )
+                    
+                    # Track metrics
+                    reward_stats.push(worker_rewards[worker])
+                    collaboration_stats.push(collaboration_score)
+                    recent_collaboration_scores.append(float(collaboration_score))
+                    collaboration_scores.append(float(collaboration_score))
+                    
+                    # Print episode summary
+                    logger.info(f"Episode {episode_summary['episode_number']} Summary (worker {worker}):")
+                    logger.info(f"  Total Reward: {episode_summary['episode_reward']:.2f}")
+                    logger.info(f"  Collaboration Score: {collaboration_score:.3f}")
+                    logger.info(f"  Comments Added: {agent.comment_count}")
+                    logger.info(f"  Task Assignments: {agent.assignment_count}")
+                    logger.info(f"  Collaboration Actions: {sum(1 for a in agent.recent_actions if a in agent.collaboration_actions)}")
+                    
+                    # Show improvement trend
+                    if len(recent_collaboration_scores) == 3:
+                        recent_collab_avg = sum(recent_collaboration_scores) / 3
+                        logger.info(f"  Recent Collaboration Avg: {recent_collab_avg:.3f}")
+                    
+                    # Roll over to the next episode
+                    worker_rewards[worker] = 0.0
+                    step_counts[worker] = 0
+                    collaboration_reward_totals[worker] = 0.0
+                    if episodes_started < num_episodes:
+                        episodes_started += 1
+                        agent.reset_episode()
+                        training_manager.start_episode(episodes_started)
+                    else:
+                        active[worker] = False
     
     except KeyboardInterrupt:
         logger.info("Training interrupted by user")
@@ -267,17 +331,19 @@ def main():
         raise
     
     finally:
-        # Save training summary
-        training_manager.save_training_summary()
+        # Save training summaries and stop the managers' background writers
+        for training_manager in training_managers:
+            training_manager.save_training_summary()
+            training_manager.close()
         
         # Calculate and display final metrics
-        if episode_rewards:
+        if reward_stats.count:
             logger.info("\n--- Final Collaboration Training Results ---")
-            logger.info(f"Episodes Completed: {len(episode_rewards)}")
-            logger.info(f"Average Reward: {np.mean(episode_rewards):.2f} ± {np.std(episode_rewards):.2f}")
-            logger.info(f"Average Collaboration Score: {np.mean(collaboration_scores):.3f}")
-            logger.info(f"Best Episode Reward: {np.max(episode_rewards):.2f}")
-            logger.info(f"Best Collaboration Score: {np.max(collaboration_scores):.3f}")
+            logger.info(f"Episodes Completed: {reward_stats.count}")
+            logger.info(f"Average Reward: {reward_stats.mean:.2f} ± {reward_stats.std:.2f}")
+            logger.info(f"Average Collaboration Score: {collaboration_stats.mean:.3f}")
+            logger.info(f"Best Episode Reward: {reward_stats.max:.2f}")
+            logger.info(f"Best Collaboration Score: {collaboration_stats.max:.3f}")
             
             # Analyze collaboration improvement
             if len(collaboration_scores) >= 6:
@@ -289,7 +355,8 @@ def main():
         # Close environment
         env.close()
         logger.info("Collaboration training completed successfully")
+        log_listener.stop()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -7,20 +7,31 @@ focusing on task completion speed and workflow optimization.
 """
 
 import logging
-import time
-from typing import Dict, Any, List
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
 
-import gymnasium as gym
 import numpy as np
+from gymnasium.vector.utils import iterate
 
-from asana_replica_rl_env import AsanaReplicaEnv, EnvironmentConfig, RewardConfig
+from asana_replica_rl_env import EnvironmentConfig, RewardConfig
+from asana_replica_rl_env.logging_utils import start_queue_logging
 from asana_replica_rl_env.training_manager import TrainingEpisodeManager
-from asana_replica_rl_env.reward_calculator import RewardScenarioManager
+from asana_replica_rl_env.reward_calculator import get_scenario_config
+from asana_replica_rl_env.stats import RunningStats
+from asana_replica_rl_env.vector import make_vec, unbatch_info
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Parallel rollout settings: each worker drives its own browser against its
+# own instance of the application so sub-environments don't share task state.
+NUM_WORKERS = 4
+BASE_PORT = 3000
+
+# Seed for the action-sampling generator shared by the agents
+SEED = 42
+
 
 class SimpleTaskCompletionAgent:
     """
@@ -29,31 +40,31 @@ class SimpleTaskCompletionAgent:
     This agent demonstrates a basic strategy for the efficiency training scenario.
     """
     
-    def __init__(self, action_meanings: Dict[int, str]):
+    def __init__(self, action_meanings: Dict[int, str], rng: Optional[np.random.Generator] = None):
         """Initialize the agent with action mappings."""
         self.action_meanings = action_meanings
         
         # Define action priorities for efficiency training
-        self.high_priority_actions = [
+        self.high_priority_actions = frozenset([
             "create_new_task",
             "change_task_status_completed",
             "set_task_assignee",
             "set_task_due_date",
             "edit_task_name",
-        ]
+        ])
         
-        self.medium_priority_actions = [
+        self.medium_priority_actions = frozenset([
             "create_new_project",
             "open_task_detail",
             "edit_task_description",
             "set_task_priority",
-        ]
+        ])
         
-        self.low_priority_actions = [
+        self.low_priority_actions = frozenset([
             "navigate_to_project_list",
             "navigate_to_project_board",
             "add_comment",
-        ]
+        ])
         
         # Build action priority mapping
         self.action_priorities = {}
@@ -66,6 +77,40 @@ class SimpleTaskCompletionAgent:
                 self.action_priorities[action_id] = 1
             else:
                 self.action_priorities[action_id] = 0
+        
+        # Precompute candidate action IDs for each phase of the episode
+        self._setup_ids = self._action_ids(
+            lambda name: name in {"create_new_project", "create_new_task", "navigate_to_projects"}
+        )
+        self._high_priority_ids = self._action_ids(lambda name: name in self.high_priority_actions)
+        self._completion_ids = self._action_ids(lambda name: "completed" in name or "finish" in name)
+        
+        # Fallback: priority-weighted selection over all actions
+        self._all_ids = np.array(list(action_meanings.keys()), dtype=np.int64)
+        fallback_weights = np.array(
+            [self.action_priorities[action_id] for action_id in self._all_ids], dtype=np.float64
+        )
+        self._fallback_weights = fallback_weights / np.sum(fallback_weights)
+        
+        # Actions are drawn in chunks from the (possibly shared) generator
+        self._rng = rng if rng is not None else np.random.default_rng()
+        self._sample_buf: Dict[str, List[int]] = {}
+    
+    def _action_ids(self, predicate: Callable[[str], bool]) -> np.ndarray:
+        """Return the IDs of all actions whose name satisfies the predicate."""
+        return np.array(
+            [action_id for action_id, action_name in self.action_meanings.items() if predicate(action_name)],
+            dtype=np.int64,
+        )
+    
+    def _sample(self, key: str, ids: np.ndarray, p: Optional[np.ndarray] = None, chunk: int = 256) -> int:
+        """Return the next pre-sampled action ID for ``key``, refilling its buffer when empty."""
+        buffer = self._sample_buf.get(key)
+        if not buffer:
+            buffer = self._rng.choice(ids, size=chunk, p=p).tolist()
+            buffer.reverse()
+            self._sample_buf[key] = buffer
+        return buffer.pop()
     
     def select_action(self, observation: Any, step_count: int) -> int:
         """
@@ -80,48 +125,28 @@ class SimpleTaskCompletionAgent:
         """
         # Early in episode, focus on setup actions
         if step_count < 10:
-            setup_actions = [
-                action_id for action_id, action_name in self.action_meanings.items()
-                if action_name in ["create_new_project", "create_new_task", "navigate_to_projects"]
-            ]
-            if setup_actions:
-                return np.random.choice(setup_actions)
+            if len(self._setup_ids):
+                return self._sample("setup", self._setup_ids)
         
         # Mid-episode, focus on task management
         elif step_count < 50:
-            task_actions = [
-                action_id for action_id, action_name in self.action_meanings.items()
-                if action_name in self.high_priority_actions
-            ]
-            if task_actions:
-                return np.random.choice(task_actions)
+            if len(self._high_priority_ids):
+                return self._sample("task", self._high_priority_ids)
         
         # Late in episode, focus on completion
         else:
-            completion_actions = [
-                action_id for action_id, action_name in self.action_meanings.items()
-                if "completed" in action_name or "finish" in action_name
-            ]
-            if completion_actions:
-                return np.random.choice(completion_actions)
+            if len(self._completion_ids):
+                return self._sample("completion", self._completion_ids)
         
         # Fallback: weighted random selection based on priorities
-        action_ids = list(self.action_meanings.keys())
-        weights = [self.action_priorities.get(action_id, 0.1) for action_id in action_ids]
-        
-        # Normalize weights
-        weights = np.array(weights)
-        weights = weights / np.sum(weights)
-        
-        return np.random.choice(action_ids, p=weights)
+        return self._sample("fallback", self._all_ids, self._fallback_weights)
 
 
 def main():
     """Run efficiency-focused training."""
     
     # Load efficiency reward configuration
-    scenario_manager = RewardScenarioManager()
-    reward_config = scenario_manager.get_scenario_config("efficiency-training")
+    reward_config = get_scenario_config("efficiency-training")
     
     # Configure environment
     config = EnvironmentConfig(
@@ -134,64 +159,104 @@ def main():
         debug_mode=True,
     )
     
-    # Create environment
-    env = AsanaReplicaEnv(config)
+    # Create vectorized environment (one browser per worker process)
+    base_urls = [f"http://localhost:{BASE_PORT + i}" for i in range(NUM_WORKERS)]
+    env = make_vec(
+        NUM_WORKERS,
+        config,
+        base_urls,
+        copy=True,  # fresh observation arrays per step (task counts are kept across steps)
+    )
+    action_meanings = env.call("get_action_meanings")[0]
+    
+    # Hand log output to a background thread now that the workers are forked
+    log_listener = start_queue_logging(log_file="./logs/efficiency_training/training.log")
     
-    # Create training manager
-    training_manager = TrainingEpisodeManager(config, log_dir="./logs/efficiency_training")
+    # Create one training manager per worker
+    training_managers = [
+        TrainingEpisodeManager(config, log_dir=f"./logs/efficiency_training/worker_{i}")
+        for i in range(NUM_WORKERS)
+    ]
     
     # Create agent
-    agent = SimpleTaskCompletionAgent(env.get_action_meanings())
+    rng = np.random.Generator(np.random.SFC64(SEED))
+    agent = SimpleTaskCompletionAgent(action_meanings, rng)
     
     # Training parameters
     num_episodes = 20
     
-    logger.info(f"Starting efficiency training for {num_episodes} episodes")
+    logger.info(f"Starting efficiency training for {num_episodes} episodes on {NUM_WORKERS} workers")
     logger.info(f"Reward configuration: efficiency-training")
-    logger.info(f"Action space: {env.action_space}")
+    logger.info(f"Action space: {env.single_action_space}")
     
     # Track performance metrics
-    episode_rewards: List[float] = []
-    episode_lengths: List[int] = []
-    task_completion_rates: List[float] = []
+    reward_stats = RunningStats()
+    length_stats = RunningStats()
+    completion_rate_stats = RunningStats()
+    recent_rewards: Deque[float] = deque(maxlen=5)
+    episode_rewards: List[float] = []  # kept for the final improvement comparison
     
     try:
-        for episode in range(num_episodes):
-            logger.info(f"\n--- Episode {episode + 1}/{num_episodes} ---")
-            
-            # Start episode
-            training_manager.start_episode(episode + 1)
-            
-            # Reset environment
-            observation, info = env.reset()
-            logger.info(f"Episode started. Initial state: {info}")
+        # Start one episode per worker; finished workers pick up the next one
+        episodes_started = min(NUM_WORKERS, num_episodes)
+        for worker in range(episodes_started):
+            training_managers[worker].start_episode(worker + 1)
+        
+        # Reset environments once; sub-environments autoreset from here on
+        observations, infos = env.reset()
+        logger.info(f"Episodes started. Initial state: {infos}")
+        
+        worker_rewards = np.zeros(NUM_WORKERS)
+        step_counts = np.zeros(NUM_WORKERS, dtype=np.int64)
+        initial_task_counts = [None] * NUM_WORKERS
+        current_task_counts = [None] * NUM_WORKERS
+        active = np.arange(NUM_WORKERS) < num_episodes
+        
+        # The observation layout is fixed by the config, so pick the task count extractor once
+        if config.observation_mode == "hybrid":
+            extract_task_counts = lambda batch: batch["structured"]["task_counts"]
+        elif config.observation_mode == "structured":
+            extract_task_counts = lambda batch: batch["task_counts"]
+        else:
+            extract_task_counts = lambda batch: np.zeros((NUM_WORKERS, 3), dtype=np.int32)
+        
+        while active.any():
+            actions = np.zeros(NUM_WORKERS, dtype=np.int64)
+            batch_task_counts = extract_task_counts(observations)
+            for worker, observation in enumerate(iterate(env.observation_space, observations)):
+                # Track task counts for completion rate; the vector env hands out a
+                # fresh observation batch every step, so rows can be kept without copying
+                task_counts = batch_task_counts[worker]
+                if active[worker]:
+                    current_task_counts[worker] = task_counts
+                    if initial_task_counts[worker] is None:
+                        initial_task_counts[worker] = task_counts
+                
+                # Agent selects action
+                actions[worker] = agent.select_action(observation, int(step_counts[worker]))
             
-            episode_reward = 0.0
-            step_count = 0
-            initial_task_counts = None
+            # Execute actions
+            observations, rewards, terminated, truncated, infos = env.step(actions)
             
-            while True:
-                # Extract task counts for completion tracking
-                if isinstance(observation, dict) and "structured" in observation:
-                    current_task_counts = observation["structured"]["task_counts"]
-                elif isinstance(observation, dict) and "task_counts" in observation:
-                    current_task_counts = observation["task_counts"]
-                else:
-                    current_task_counts = np.zeros(3)
+            for worker, observation in enumerate(iterate(env.observation_space, observations)):
+                if not active[worker]:
+                    continue
                 
-                if initial_task_counts is None:
-                    initial_task_counts = current_task_counts.copy()
-                
-                # Agent selects action
-                action = agent.select_action(observation, step_count)
-                action_name = env.get_action_meanings()[action]
+                training_manager = training_managers[worker]
+                action = int(actions[worker])
+                action_name = action_meanings[action]
+                reward = float(rewards[worker])
+                info = unbatch_info(infos, worker)
+                done = terminated[worker] or truncated[worker]
                 
-                # Execute action
-                observation, reward, terminated, truncated, info = env.step(action)
+                # The observation of a finished worker already belongs to its next episode
+                if done:
+                    observation = info["final_obs"]
+                    info = info["final_info"]
                 
                 # Log step
                 training_manager.log_step(
-                    step_number=step_count,
+                    step_number=int(step_counts[worker]),
                     action=action,
                     action_name=action_name,
                     reward=reward,
@@ -199,61 +264,72 @@ def main():
                     info=info
                 )
                 
-                episode_reward += reward
-                step_count += 1
+                worker_rewards[worker] += reward
+                step_counts[worker] += 1
+                step_count = int(step_counts[worker])
+                episode_reward = float(worker_rewards[worker])
                 
                 # Log progress every 20 steps
                 if step_count % 20 == 0:
-                    logger.info(f"Step {step_count}: Recent action: {action_name}, "
+                    logger.info(f"[Worker {worker}] Step {step_count}: Recent action: {action_name}, "
                                f"Reward: {reward:.3f}, Cumulative: {episode_reward:.3f}")
                     
-                    if info.get("reward_components"):
-                        components = info["reward_components"]
-                        logger.info(f"  Reward breakdown: completion={components.get('task_completion', 0):.2f}, "
-                                   f"creation={components.get('task_creation', 0):.2f}, "
-                                   f"efficiency={components.get('efficiency_bonus', 0):.2f}")
+                    components = info.get("reward_components")
+                    if components:
+                        logger.info(f"  Reward breakdown: completion={components['task_completion']:.2f}, "
+                                   f"creation={components['task_creation']:.2f}, "
+                                   f"efficiency={components['efficiency_bonus']:.2f}")
                 
                 # Check termination
-                if terminated or truncated:
-                    termination_reason = "terminated" if terminated else "truncated"
-                    logger.info(f"Episode ended: {termination_reason}")
-                    break
-            
-            # Calculate task completion rate
-            final_task_counts = current_task_counts
-            tasks_completed = final_task_counts[2] - initial_task_counts[2]  # Completed tasks
-            total_tasks = np.sum(final_task_counts)
-            completion_rate = tasks_completed / max(1, total_tasks) if total_tasks > 0 else 0.0
-            
-            # End episode
-            episode_summary = training_manager.end_episode(
-                final_reward=episode_reward,
-                episode_length=step_count,
-                termination_reason=termination_reason,
-                reward_calculator=env.reward_calculator
-            )
-            
-            # Track metrics
-            episode_rewards.append(episode_reward)
-            episode_lengths.append(step_count)
-            task_completion_rates.append(completion_rate)
-            
-            # Print episode summary
-            logger.info(f"Episode {episode + 1} Summary:")
-            logger.info(f"  Total Reward: {episode_summary['episode_reward']:.2f}")
-            logger.info(f"  Episode Length: {episode_summary['episode_length']}")
-            logger.info(f"  Tasks Completed: {tasks_completed}")
-            logger.info(f"  Completion Rate: {completion_rate:.2%}")
-            logger.info(f"  Efficiency Score: {episode_reward / step_count:.3f}")
-            
-            # Show improvement trend
-            if len(episode_rewards) >= 5:
-                recent_avg = np.mean(episode_rewards[-5:])
-                overall_avg = np.mean(episode_rewards)
-                logger.info(f"  Recent Avg Reward: {recent_avg:.2f} (Overall: {overall_avg:.2f})")
-            
-            # Brief pause between episodes
-            time.sleep(0.5)
+                if done:
+                    termination_reason = "terminated" if terminated[worker] else "truncated"
+                    logger.info(f"[Worker {worker}] Episode ended: {termination_reason}")
+                    
+                    # Calculate task completion rate
+                    final_task_counts = current_task_counts[worker]
+                    tasks_completed = final_task_counts[2] - initial_task_counts[worker][2]  # Completed tasks
+                    total_tasks = np.sum(final_task_counts)
+                    completion_rate = tasks_completed / max(1, total_tasks) if total_tasks > 0 else 0.0
+                    
+                    # End episode
+                    episode_summary = training_manager.end_episode(
+                        final_reward=episode_reward,
+                        episode_length=step_count,
+                        termination_reason=termination_reason,
+                        episode_bonus=info.get("episode_bonus"),
+                        episode_statistics=info.get("episode_statistics"),
+                    )
+                    
+                    # Track metrics
+                    reward_stats.push(episode_reward)
+                    length_stats.push(step_count)
+                    completion_rate_stats.push(completion_rate)
+                    recent_rewards.append(episode_reward)
+                    episode_rewards.append(episode_reward)
+                    
+                    # Print episode summary
+                    logger.info(f"Episode {episode_summary['episode_number']} Summary (worker {worker}):")
+                    logger.info(f"  Total Reward: {episode_summary['episode_reward']:.2f}")
+                    logger.info(f"  Episode Length: {episode_summary['episode_length']}")
+                    logger.info(f"  Tasks Completed: {tasks_completed}")
+                    logger.info(f"  Completion Rate: {completion_rate:.2%}")
+                    logger.info(f"  Efficiency Score: {episode_reward / step_count:.3f}")
+                    
+                    # Show improvement trend
+                    if len(recent_rewards) == 5:
+                        recent_avg = sum(recent_rewards) / 5
+                        overall_avg = reward_stats.mean
+                        logger.info(f"  Recent Avg Reward: {recent_avg:.2f} (Overall: {overall_avg:.2f})")
+                    
+                    # Roll over to the next episode
+                    worker_rewards[worker] = 0.0
+                    step_counts[worker] = 0
+                    initial_task_counts[worker] = None
+                    if episodes_started < num_episodes:
+                        episodes_started += 1
+                        training_manager.start_episode(episodes_started)
+                    else:
+                        active[worker] = False
     
     except KeyboardInterrupt:
         logger.info("Training interrupted by user")
@@ -263,17 +339,19 @@ def main():
         raise
     
     finally:
-        # Save training summary
-        training_manager.save_training_summary()
+        # Save training summaries and stop the managers' background writers
+        for training_manager in training_managers:
+            training_manager.save_training_summary()
+            training_manager.close()
         
         # Calculate and display final metrics
-        if episode_rewards:
+        if reward_stats.count:
             logger.info("\n--- Final Training Results ---")
-            logger.info(f"Episodes Completed: {len(episode_rewards)}")
-            logger.info(f"Average Reward: {np.mean(episode_rewards):.2f} ± {np.std(episode_rewards):.2f}")
-            logger.info(f"Best Episode Reward: {np.max(episode_rewards):.2f}")
-            logger.info(f"Average Episode Length: {np.mean(episode_lengths):.1f}")
-            logger.info(f"Average Task Completion Rate: {np.mean(task_completion_rates):.2%}")
+            logger.info(f"Episodes Completed: {reward_stats.count}")
+            logger.info(f"Average Reward: {reward_stats.mean:.2f} ± {reward_stats.std:.2f}")
+            logger.info(f"Best Episode Reward: {reward_stats.max:.2f}")
+            logger.info(f"Average Episode Length: {length_stats.mean:.1f}")
+            logger.info(f"Average Task Completion Rate: {completion_rate_stats.mean:.2%}")
             
             # Show improvement over time
             if len(episode_rewards) >= 10:
@@ -285,7 +363,8 @@ def main():
         # Close environment
         env.close()
         logger.info("Efficiency training completed successfully")
+        log_listener.stop()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,15 +1,45 @@
 """Asana Replica RL Environment package."""
 
-from .environment import AsanaReplicaEnv
-from .config import EnvironmentConfig, RewardConfig
-from .browser_automation import BrowserAutomation
-from .reward_calculator import RewardCalculator
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from .environment import AsanaReplicaEnv
+    from .config import EnvironmentConfig, RewardConfig
+    from .browser_automation import BrowserAutomation
+    from .reward_calculator import RewardCalculator
 
 __version__ = "0.1.0"
 __all__ = [
     "AsanaReplicaEnv",
-    "EnvironmentConfig", 
+    "EnvironmentConfig",
     "RewardConfig",
     "BrowserAutomation",
     "RewardCalculator",
-]
\ No newline at end of file
+]
+
+# Public names and the submodules they live in; imported on first access so that
+# importing a light submodule (e.g. the CLI) does not pull in selenium and gymnasium
+_LAZY_IMPORTS = {
+    "AsanaReplicaEnv": ".environment",
+    "EnvironmentConfig": ".config",
+    "RewardConfig": ".config",
+    "BrowserAutomation": ".browser_automation",
+    "RewardCalculator": ".reward_calculator",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Import a public name from its submodule on first access."""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    """List module attributes including the lazily imported names."""
+    return sorted(set(globals()) | set(__all__))
@@ -1,16 +1,24 @@
 """Action execution system for UI interactions."""
 
+import itertools
 import logging
 import time
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Callable, Dict, Any, List, Mapping, Optional
 from selenium.webdriver.common.by import By
 
-from .browser_automation import BrowserAutomation
+from .browser_automation import BrowserAutomation, Locator
 from .config import EnvironmentConfig
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=512)
+def _locator(css: str) -> Locator:
+    """Get the (shared) CSS locator tuple for a selector string."""
+    return (By.CSS_SELECTOR, css)
+
+
 class ActionExecutor:
     """Executes actions in the Asana replica application through browser automation."""
     
@@ -19,49 +27,100 @@ class ActionExecutor:
         self.browser = browser
         self.config = config
         
-        # Common selectors for UI elements (using data-testid attributes)
-        self.selectors = {
+        # Locators for UI elements (using data-testid attributes)
+        self.selectors: Dict[str, Locator] = {
             # Navigation
-            "dashboard_link": '[data-testid="nav-dashboard"]',
-            "projects_link": '[data-testid="nav-projects"]',
-            "workspace_selector": '[data-testid="workspace-selector"]',
+            "dashboard_link": _locator('[data-testid="nav-dashboard"]'),
+            "projects_link": _locator('[data-testid="nav-projects"]'),
+            "workspace_selector": _locator('[data-testid="workspace-selector"]'),
             
             # Project elements
-            "create_project_btn": '[data-testid="create-project-btn"]',
-            "project_card": '[data-testid="project-card"]',
-            "project_name_input": '[data-testid="project-name-input"]',
-            "project_description_input": '[data-testid="project-description-input"]',
+            "create_project_btn": _locator('[data-testid="create-project-btn"]'),
+            "project_card": _locator('[data-testid="project-card"]'),
+            "project_name_input": _locator('[data-testid="project-name-input"]'),
+            "project_description_input": _locator('[data-testid="project-description-input"]'),
+            "project_edit_btn": _locator('[data-testid="project-edit-btn"]'),
+            "project_settings": _locator('[data-testid="project-settings"]'),
+            "project_archive_btn": _locator('[data-testid="project-archive-btn"]'),
+            "project_color_picker": _locator('[data-testid="project-color-picker"]'),
+            "add_member_btn": _locator('[data-testid="add-member-btn"]'),
+            "remove_member_btn": _locator('[data-testid="remove-member-btn"]'),
+            "duplicate_project_btn": _locator('[data-testid="duplicate-project-btn"]'),
+            "delete_project_btn": _locator('[data-testid="delete-project-btn"]'),
+            "project_status_select": _locator('[data-testid="project-status-select"]'),
             
             # Task elements
-            "create_task_btn": '[data-testid="create-task-btn"]',
-            "task_card": '[data-testid="task-card"]',
-            "task_name_input": '[data-testid="task-name-input"]',
-            "task_description_input": '[data-testid="task-description-input"]',
-            "task_assignee_select": '[data-testid="task-assignee-select"]',
-            "task_due_date_input": '[data-testid="task-due-date-input"]',
-            "task_priority_select": '[data-testid="task-priority-select"]',
+            "create_task_btn": _locator('[data-testid="create-task-btn"]'),
+            "task_card": _locator('[data-testid="task-card"]'),
+            "task_name_input": _locator('[data-testid="task-name-input"]'),
+            "task_description_input": _locator('[data-testid="task-description-input"]'),
+            "task_assignee_select": _locator('[data-testid="task-assignee-select"]'),
+            "task_due_date_input": _locator('[data-testid="task-due-date-input"]'),
+            "task_priority_select": _locator('[data-testid="task-priority-select"]'),
+            "add_dependency_btn": _locator('[data-testid="add-dependency-btn"]'),
+            "remove_dependency_btn": _locator('[data-testid="remove-dependency-btn"]'),
+            "add_tag_btn": _locator('[data-testid="add-tag-btn"]'),
+            "delete_task_btn": _locator('[data-testid="delete-task-btn"]'),
+            "duplicate_task_btn": _locator('[data-testid="duplicate-task-btn"]'),
+            "create_subtask_btn": _locator('[data-testid="create-subtask-btn"]'),
+            "convert_to_project_btn": _locator('[data-testid="convert-to-project-btn"]'),
+            "follow_task_btn": _locator('[data-testid="follow-task-btn"]'),
+            "unfollow_task_btn": _locator('[data-testid="unfollow-task-btn"]'),
+            "attach_file_btn": _locator('[data-testid="attach-file-btn"]'),
             
             # Status columns (for Kanban board)
-            "todo_column": '[data-testid="status-column-todo"]',
-            "in_progress_column": '[data-testid="status-column-in-progress"]',
-            "completed_column": '[data-testid="status-column-completed"]',
+            "todo_column": _locator('[data-testid="status-column-todo"]'),
+            "in_progress_column": _locator('[data-testid="status-column-in-progress"]'),
+            "completed_column": _locator('[data-testid="status-column-completed"]'),
             
             # View switchers
-            "list_view_btn": '[data-testid="view-list"]',
-            "board_view_btn": '[data-testid="view-board"]',
-            "timeline_view_btn": '[data-testid="view-timeline"]',
-            "calendar_view_btn": '[data-testid="view-calendar"]',
+            "list_view_btn": _locator('[data-testid="view-list"]'),
+            "board_view_btn": _locator('[data-testid="view-board"]'),
+            "timeline_view_btn": _locator('[data-testid="view-timeline"]'),
+            "calendar_view_btn": _locator('[data-testid="view-calendar"]'),
             
             # Comments
-            "comment_input": '[data-testid="comment-input"]',
-            "comment_submit_btn": '[data-testid="comment-submit"]',
+            "comment_input": _locator('[data-testid="comment-input"]'),
+            "comment_submit_btn": _locator('[data-testid="comment-submit"]'),
+            "reply_comment_btn": _locator('[data-testid="reply-comment-btn"]'),
+            "edit_comment_btn": _locator('[data-testid="edit-comment-btn"]'),
+            "delete_comment_btn": _locator('[data-testid="delete-comment-btn"]'),
             
             # Filters and search
-            "search_input": '[data-testid="search-input"]',
-            "filter_assignee": '[data-testid="filter-assignee"]',
-            "filter_status": '[data-testid="filter-status"]',
-            "filter_due_date": '[data-testid="filter-due-date"]',
+            "search_input": _locator('[data-testid="search-input"]'),
+            "filter_assignee": _locator('[data-testid="filter-assignee"]'),
+            "filter_status": _locator('[data-testid="filter-status"]'),
+            "filter_due_date": _locator('[data-testid="filter-due-date"]'),
+            "sort_tasks_btn": _locator('[data-testid="sort-tasks-btn"]'),
         }
+        
+        # Bound action handlers, looked up once instead of per step
+        self._action_dispatch: Dict[str, Callable[[], bool]] = {
+            name[len("_action_"):]: getattr(self, name)
+            for name in dir(self)
+            if name.startswith("_action_")
+        }
+        self._action_by_id: List[Optional[Callable[[], bool]]] = []
+        
+        # Unique suffix for created names: session timestamp plus a counter
+        self._name_prefix = str(int(time.time()))
+        self._name_seq = itertools.count()
+    
+    def _unique_suffix(self) -> str:
+        """Get a suffix that is unique within this session for created items."""
+        return f"{self._name_prefix}_{next(self._name_seq)}"
+    
+    def bind_action_ids(self, action_mapping: Mapping[int, str]) -> None:
+        """
+        Index the action handlers by action id so dispatch is a list lookup.
+        
+        Args:
+            action_mapping: Mapping from action id to action name
+        """
+        size = max(action_mapping, default=-1) + 1
+        self._action_by_id = [None] * size
+        for action_id, action_name in action_mapping.items():
+            self._action_by_id[action_id] = self._action_dispatch.get(action_name)
     
     def execute_action(self, action_id: int, action_name: str) -> bool:
         """
@@ -75,17 +134,21 @@ class ActionExecutor:
             True if action was executed successfully, False otherwise
         """
         try:
-            # Map action name to execution method
-            action_method = getattr(self, f"_action_{action_name}", None)
+            # Map action id (or name, for unbound ids) to execution method
+            action_method = None
+            if 0 <= action_id < len(self._action_by_id):
+                action_method = self._action_by_id[action_id]
+            if action_method is None:
+                action_method = self._action_dispatch.get(action_name)
             
             if action_method is None:
                 logger.warning(f"No implementation for action: {action_name}")
                 return False
             
             # Execute the action with timeout
-            start_time = time.time()
+            start_time = time.monotonic()
             success = action_method()
-            execution_time = time.time() - start_time
+            execution_time = time.monotonic() - start_time
             
             if execution_time > self.config.action_timeout:
                 logger.warning(f"Action {action_name} took {execution_time:.2f}s (timeout: {self.config.action_timeout}s)")
@@ -136,12 +199,7 @@ class ActionExecutor:
     
     def _action_refresh_page(self) -> bool:
         """Refresh the current page."""
-        try:
-            self.browser.driver.refresh()
-            time.sleep(1.0)  # Wait for page to load
-            return True
-        except Exception:
-            return False
+        return self.browser.refresh_page()
     
     # Project actions
     def _action_create_new_project(self) -> bool:
@@ -155,20 +213,17 @@ class ActionExecutor:
             return False
         
         # Fill in project name
-        project_name = f"RL Project {int(time.time())}"
+        project_name = f"RL Project {self._unique_suffix()}"
         return self.browser.type_text(self.selectors["project_name_input"], project_name)
     
     def _action_open_project(self) -> bool:
         """Open the first available project."""
-        project_cards = self.browser.find_elements(self.selectors["project_card"])
-        if project_cards:
-            return self.browser.click_element(self.selectors["project_card"])
-        return False
+        return self.browser.click_first(self.selectors["project_card"])
     
     def _action_edit_project(self) -> bool:
         """Edit current project."""
         # Look for edit button or project settings
-        edit_selectors = ['[data-testid="project-edit-btn"]', '[data-testid="project-settings"]']
+        edit_selectors = [self.selectors["project_edit_btn"], self.selectors["project_settings"]]
         for selector in edit_selectors:
             if self.browser.click_element(selector):
                 return True
@@ -176,31 +231,31 @@ class ActionExecutor:
     
     def _action_archive_project(self) -> bool:
         """Archive current project."""
-        return self.browser.click_element('[data-testid="project-archive-btn"]')
+        return self.browser.click_element(self.selectors["project_archive_btn"])
     
     def _action_change_project_color(self) -> bool:
         """Change project color."""
-        return self.browser.click_element('[data-testid="project-color-picker"]')
+        return self.browser.click_element(self.selectors["project_color_picker"])
     
     def _action_add_project_member(self) -> bool:
         """Add member to project."""
-        return self.browser.click_element('[data-testid="add-member-btn"]')
+        return self.browser.click_element(self.selectors["add_member_btn"])
     
     def _action_remove_project_member(self) -> bool:
         """Remove member from project."""
-        return self.browser.click_element('[data-testid="remove-member-btn"]')
+        return self.browser.click_element(self.selectors["remove_member_btn"])
     
     def _action_duplicate_project(self) -> bool:
         """Duplicate current project."""
-        return self.browser.click_element('[data-testid="duplicate-project-btn"]')
+        return self.browser.click_element(self.selectors["duplicate_project_btn"])
     
     def _action_delete_project(self) -> bool:
         """Delete current project."""
-        return self.browser.click_element('[data-testid="delete-project-btn"]')
+        return self.browser.click_element(self.selectors["delete_project_btn"])
     
     def _action_set_project_status(self) -> bool:
         """Set project status."""
-        return self.browser.click_element('[data-testid="project-status-select"]')
+        return self.browser.click_element(self.selectors["project_status_select"])
     
     # Task actions
     def _action_create_new_task(self) -> bool:
@@ -214,20 +269,17 @@ class ActionExecutor:
             return False
         
         # Fill in task name
-        task_name = f"RL Task {int(time.time())}"
+        task_name = f"RL Task {self._unique_suffix()}"
         return self.browser.type_text(self.selectors["task_name_input"], task_name)
     
     def _action_open_task_detail(self) -> bool:
         """Open task detail modal."""
-        task_cards = self.browser.find_elements(self.selectors["task_card"])
-        if task_cards:
-            return self.browser.click_element(self.selectors["task_card"])
-        return False
+        return self.browser.click_first(self.selectors["task_card"])
     
     def _action_edit_task_name(self) -> bool:
         """Edit task name."""
         if self.browser.click_element(self.selectors["task_name_input"]):
-            new_name = f"Updated Task {int(time.time())}"
+            new_name = f"Updated Task {self._unique_suffix()}"
             return self.browser.type_text(self.selectors["task_name_input"], new_name, clear_first=True)
         return False
     
@@ -252,26 +304,20 @@ class ActionExecutor:
     
     def _action_change_task_status_todo(self) -> bool:
         """Move task to todo status."""
-        return self._move_task_to_column("todo")
+        return self._move_task_to_column(self.selectors["todo_column"])
     
     def _action_change_task_status_in_progress(self) -> bool:
         """Move task to in progress status."""
-        return self._move_task_to_column("in_progress")
+        return self._move_task_to_column(self.selectors["in_progress_column"])
     
     def _action_change_task_status_completed(self) -> bool:
         """Move task to completed status."""
-        return self._move_task_to_column("completed")
+        return self._move_task_to_column(self.selectors["completed_column"])
     
-    def _move_task_to_column(self, status: str) -> bool:
-        """Move a task to a specific status column."""
+    def _move_task_to_column(self, column_selector: Locator) -> bool:
+        """Move a task to the status column given by its locator."""
         # Find first available task
-        task_cards = self.browser.find_elements(self.selectors["task_card"])
-        if not task_cards:
-            return False
-        
-        # Get target column
-        column_selector = self.selectors.get(f"{status}_column")
-        if not column_selector:
+        if not self.browser.is_element_present(self.selectors["task_card"]):
             return False
         
         # Perform drag and drop
@@ -282,28 +328,28 @@ class ActionExecutor:
     
     def _action_add_task_dependency(self) -> bool:
         """Add task dependency."""
-        return self.browser.click_element('[data-testid="add-dependency-btn"]')
+        return self.browser.click_element(self.selectors["add_dependency_btn"])
     
     def _action_remove_task_dependency(self) -> bool:
         """Remove task dependency."""
-        return self.browser.click_element('[data-testid="remove-dependency-btn"]')
+        return self.browser.click_element(self.selectors["remove_dependency_btn"])
     
     def _action_add_task_tag(self) -> bool:
         """Add tag to task."""
-        return self.browser.click_element('[data-testid="add-tag-btn"]')
+        return self.browser.click_element(self.selectors["add_tag_btn"])
     
     def _action_delete_task(self) -> bool:
         """Delete task."""
-        return self.browser.click_element('[data-testid="delete-task-btn"]')
+        return self.browser.click_element(self.selectors["delete_task_btn"])
     
     def _action_duplicate_task(self) -> bool:
         """Duplicate task."""
-        return self.browser.click_element('[data-testid="duplicate-task-btn"]')
+        return self.browser.click_element(self.selectors["duplicate_task_btn"])
     
     # Collaboration actions
     def _action_add_comment(self) -> bool:
         """Add comment to task."""
-        comment_text = f"RL agent comment {int(time.time())}"
+        comment_text = f"RL agent comment {self._unique_suffix()}"
         
         # Type comment
         if not self.browser.type_text(self.selectors["comment_input"], comment_text):
@@ -314,40 +360,40 @@ class ActionExecutor:
     
     def _action_reply_to_comment(self) -> bool:
         """Reply to existing comment."""
-        return self.browser.click_element('[data-testid="reply-comment-btn"]')
+        return self.browser.click_element(self.selectors["reply_comment_btn"])
     
     def _action_edit_comment(self) -> bool:
         """Edit existing comment."""
-        return self.browser.click_element('[data-testid="edit-comment-btn"]')
+        return self.browser.click_element(self.selectors["edit_comment_btn"])
     
     def _action_delete_comment(self) -> bool:
         """Delete comment."""
-        return self.browser.click_element('[data-testid="delete-comment-btn"]')
+        return self.browser.click_element(self.selectors["delete_comment_btn"])
     
     def _action_mention_user(self) -> bool:
         """Mention user in comment."""
         # Type @ symbol to trigger mention
-        return self.browser.type_text(self.selectors["comment_input"], "@", clear_first=False)
+        return self.browser.type_text(self.selectors["comment_input"], "@", clear_first=False, use_keys=True)
     
     def _action_attach_file(self) -> bool:
         """Attach file to task."""
-        return self.browser.click_element('[data-testid="attach-file-btn"]')
+        return self.browser.click_element(self.selectors["attach_file_btn"])
     
     def _action_create_subtask(self) -> bool:
         """Create subtask."""
-        return self.browser.click_element('[data-testid="create-subtask-btn"]')
+        return self.browser.click_element(self.selectors["create_subtask_btn"])
     
     def _action_convert_to_project(self) -> bool:
         """Convert task to project."""
-        return self.browser.click_element('[data-testid="convert-to-project-btn"]')
+        return self.browser.click_element(self.selectors["convert_to_project_btn"])
     
     def _action_follow_task(self) -> bool:
         """Follow task for notifications."""
-        return self.browser.click_element('[data-testid="follow-task-btn"]')
+        return self.browser.click_element(self.selectors["follow_task_btn"])
     
     def _action_unfollow_task(self) -> bool:
         """Unfollow task."""
-        return self.browser.click_element('[data-testid="unfollow-task-btn"]')
+        return self.browser.click_element(self.selectors["unfollow_task_btn"])
     
     # View and filter actions
     def _action_filter_by_assignee(self) -> bool:
@@ -364,7 +410,7 @@ class ActionExecutor:
     
     def _action_sort_tasks(self) -> bool:
         """Sort tasks."""
-        return self.browser.click_element('[data-testid="sort-tasks-btn"]')
+        return self.browser.click_element(self.selectors["sort_tasks_btn"])
     
     def _action_search_tasks(self) -> bool:
         """Search tasks."""
@@ -1,8 +1,13 @@
 """Browser automation utilities using Selenium WebDriver."""
 
+import atexit
+import base64
+import os
+import shutil
 import time
 import logging
-from typing import Optional, Dict, Any, List, Tuple
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Tuple, Union
 from pathlib import Path
 
 from selenium import webdriver
@@ -15,32 +20,132 @@ from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.firefox.service import Service as FirefoxService
 from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.firefox.options import Options as FirefoxOptions
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    TimeoutException,
+    WebDriverException,
+)
 from webdriver_manager.chrome import ChromeDriverManager
 from webdriver_manager.firefox import GeckoDriverManager
+import cv2
 import numpy as np
 from PIL import Image
-import io
 
 from .config import EnvironmentConfig
 
 logger = logging.getLogger(__name__)
 
+# Decode flag producing RGB directly (OpenCV 4.10+); older versions decode BGR and convert
+_IMREAD_COLOR_RGB: Optional[int] = getattr(cv2, "IMREAD_COLOR_RGB", None)
+
+# A (By strategy, value) pair; selectors may be given either as this or as a plain string
+Locator = Tuple[str, str]
+Selector = Union[str, Locator]
+
+
+@lru_cache(maxsize=None)
+def _chrome_driver_path() -> str:
+    """Resolve chromedriver through webdriver-manager once per process."""
+    return ChromeDriverManager().install()
+
+
+@lru_cache(maxsize=None)
+def _gecko_driver_path() -> str:
+    """Resolve geckodriver through webdriver-manager once per process."""
+    return GeckoDriverManager().install()
+
 
 class BrowserAutomation:
     """Browser automation utilities for interacting with the Asana replica application."""
     
+    # Seconds between condition checks in waits (selenium's default is 0.5)
+    _poll_frequency = 0.1
+    
+    # Idle drivers kept alive for reuse, keyed by (browser, headless)
+    _pool: Dict[Tuple[str, bool], List[webdriver.Remote]] = {}
+    
+    # Persistent Chrome profile directories: in use by a live driver (by id) or free for reuse
+    _profile_dirs: Dict[int, str] = {}
+    _free_profile_dirs: List[str] = []
+    
+    # Checks that `el` is enabled and rendered and scrolls it into view, returning why not if it
+    # cannot be clicked; the click itself is a native WebDriver click (see _native_click)
+    _prepare_click_el_js = """
+        if (el.disabled) return 'disabled';
+        const rect = el.getBoundingClientRect();
+        if (rect.width === 0 || rect.height === 0) return 'hidden';
+        el.scrollIntoView({block: 'center'});
+    """
+    # ... for the element passed as arguments[0]; returns "ok" when it can be clicked
+    _prepare_click_js = "const el = arguments[0];" + _prepare_click_el_js + "return 'ok';"
+    # ... for the first element matching the CSS selector arguments[0]; returns the element itself
+    _prepare_click_first_js = (
+        "const el = document.querySelector(arguments[0]); if (!el) return 'missing';" + _prepare_click_el_js + "return el;"
+    )
+    
+    # Scrolls the window by (arguments[0], arguments[1]) pixels
+    _scroll_js = "window.scrollBy(arguments[0], arguments[1]);"
+    _scroll_directions: Dict[str, Tuple[int, int]] = {
+        "down": (0, 1),
+        "up": (0, -1),
+        "left": (-1, 0),
+        "right": (1, 0),
+    }
+    
+    # Drags arguments[0] onto arguments[1] by dispatching the HTML5 drag and drop events,
+    # then reports whether the dragged card shows up in the target within arguments[2] ms
+    _html5_dnd_js = """
+        const [source, target, timeoutMs, done] = arguments;
+        const dataTransfer = new DataTransfer();
+        const fire = (el, type) => el.dispatchEvent(
+            new DragEvent(type, {bubbles: true, cancelable: true, dataTransfer})
+        );
+        // React applies the state set by a handler after it returns, so the drop
+        // handler only sees the dragged card if the page gets a turn in between
+        const nextTask = () => new Promise((resolve) => setTimeout(resolve, 0));
+        // The card is re-rendered in its new column, so look for it by its test id
+        const testId = source.getAttribute('data-testid');
+        const moved = () => testId
+            ? target.querySelector(`[data-testid="${CSS.escape(testId)}"]`) !== null
+            : target.contains(source);
+        (async () => {
+            fire(source, 'dragstart');
+            await nextTask();
+            fire(target, 'dragenter');
+            fire(target, 'dragover');
+            await nextTask();
+            fire(target, 'drop');
+            fire(source, 'dragend');
+            const deadline = performance.now() + timeoutMs;
+            while (!moved() && performance.now() < deadline) {
+                await new Promise((resolve) => setTimeout(resolve, 50));
+            }
+            done(moved());
+        })().catch(() => done(false));
+    """
+    
     def __init__(self, config: EnvironmentConfig):
         """Initialize browser automation with configuration."""
         self.config = config
         self.driver: Optional[webdriver.Remote] = None
         self.wait: Optional[WebDriverWait] = None
         self.action_chains: Optional[ActionChains] = None
+        self._wait_cache: Dict[float, WebDriverWait] = {}
+        
+        # Handles of background tabs opened by open_spare_tabs, oldest first
+        self._spare_tabs: List[str] = []
+        
+        # Resize target for screenshots, reused across steps
+        self._screenshot_dst = np.empty((config.screenshot_height, config.screenshot_width, 3), dtype=np.uint8)
         
     def start_browser(self) -> None:
         """Start the browser with configured options."""
         try:
-            if self.config.browser == "chrome":
+            pooled = self._pool.get(self._pool_key())
+            if pooled:
+                self.driver = pooled.pop()
+                logger.debug(f"Reusing pooled {self.config.browser} browser")
+            elif self.config.browser == "chrome":
                 self._start_chrome()
             elif self.config.browser == "firefox":
                 self._start_firefox()
@@ -48,7 +153,8 @@ class BrowserAutomation:
                 raise ValueError(f"Unsupported browser: {self.config.browser}")
                 
             # Set up WebDriverWait and ActionChains
-            self.wait = WebDriverWait(self.driver, self.config.action_timeout)
+            self.wait = WebDriverWait(self.driver, self.config.action_timeout, poll_frequency=self._poll_frequency)
+            self._wait_cache = {self.config.action_timeout: self.wait}
             self.action_chains = ActionChains(self.driver)
             
             # Set window size
@@ -65,22 +171,63 @@ class BrowserAutomation:
         options = ChromeOptions()
         
         if self.config.headless:
-            options.add_argument("--headless")
+            options.add_argument("--headless=new")
         
         # Add common Chrome options for automation
         options.add_argument("--no-sandbox")
         options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-gpu")
+        if self.config.gpu_rasterization:
+            options.add_argument("--enable-gpu-rasterization")
+            options.add_argument("--enable-zero-copy")
+            options.add_argument("--ignore-gpu-blocklist")
+        else:
+            options.add_argument("--disable-gpu")
         options.add_argument("--disable-web-security")
         options.add_argument("--allow-running-insecure-content")
         options.add_argument("--disable-extensions")
         options.add_argument("--disable-plugins")
         options.add_argument("--disable-images")  # Faster loading
         
+        # get()/refresh() return once the page's load event has fired
+        options.page_load_strategy = "normal"
+        
+        # Keep the HTTP and code caches of a previous browser in this process
+        profile_dir = None
+        if self.config.chrome_profile_dir:
+            profile_dir = self._acquire_profile_dir()
+            options.add_argument(f"--user-data-dir={profile_dir}")
+        
         # Set up Chrome service
-        service = ChromeService(ChromeDriverManager().install())
+        service = ChromeService(self.config.driver_path or _chrome_driver_path())
+        
+        try:
+            self.driver = webdriver.Chrome(service=service, options=options)
+        except Exception:
+            if profile_dir:
+                self._free_profile_dirs.append(profile_dir)
+            raise
         
-        self.driver = webdriver.Chrome(service=service, options=options)
+        if profile_dir:
+            self._profile_dirs[id(self.driver)] = profile_dir
+    
+    def _acquire_profile_dir(self) -> str:
+        """Get a Chrome profile directory that no live browser is using."""
+        if self._free_profile_dirs:
+            return self._free_profile_dirs.pop()
+        
+        # Chrome locks its profile, so every concurrent browser needs its own
+        index = len(self._profile_dirs)
+        return str(Path(self.config.chrome_profile_dir) / f"rl_chrome_{os.getpid()}_{index}")
+    
+    @classmethod
+    def _quit_driver(cls, driver: webdriver.Remote) -> None:
+        """Quit a driver and free its profile directory for the next browser."""
+        try:
+            driver.quit()
+        finally:
+            profile_dir = cls._profile_dirs.pop(id(driver), None)
+            if profile_dir:
+                cls._free_profile_dirs.append(profile_dir)
     
     def _start_firefox(self) -> None:
         """Start Firefox browser with options."""
@@ -94,41 +241,170 @@ class BrowserAutomation:
         options.set_preference("media.volume_scale", "0.0")
         
         # Set up Firefox service
-        service = FirefoxService(GeckoDriverManager().install())
+        service = FirefoxService(self.config.driver_path or _gecko_driver_path())
         
         self.driver = webdriver.Firefox(service=service, options=options)
     
     def close_browser(self) -> None:
-        """Close the browser and clean up resources."""
+        """Close the browser, or return it to the pool when pooling is enabled."""
         if self.driver:
             try:
-                self.driver.quit()
-                logger.info("Browser closed successfully")
+                if self._release_to_pool():
+                    logger.info("Browser returned to pool")
+                else:
+                    self._quit_driver(self.driver)
+                    logger.info("Browser closed successfully")
             except Exception as e:
                 logger.error(f"Error closing browser: {e}")
             finally:
                 self.driver = None
                 self.wait = None
                 self.action_chains = None
+                self._wait_cache = {}
+                self._spare_tabs = []
+    
+    def _pool_key(self) -> Tuple[str, bool]:
+        """Get the pool key for drivers compatible with this configuration."""
+        return (self.config.browser, self.config.headless)
+    
+    def _release_to_pool(self) -> bool:
+        """Clear session state and park the driver in the pool if there is room."""
+        pooled = self._pool.setdefault(self._pool_key(), [])
+        if len(pooled) >= self.config.browser_pool_size:
+            return False
+        
+        try:
+            self.close_spare_tabs()
+            self.driver.delete_all_cookies()
+            self.driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        except WebDriverException as e:
+            logger.debug(f"Could not reset browser session, closing it instead: {e}")
+            return False
+        
+        pooled.append(self.driver)
+        return True
+    
+    @classmethod
+    def shutdown_pool(cls) -> None:
+        """Quit every pooled browser and remove the now unused profile directories."""
+        for drivers in cls._pool.values():
+            while drivers:
+                driver = drivers.pop()
+                try:
+                    cls._quit_driver(driver)
+                except Exception as e:
+                    logger.error(f"Error closing pooled browser: {e}")
+        
+        while cls._free_profile_dirs:
+            shutil.rmtree(cls._free_profile_dirs.pop(), ignore_errors=True)
     
     def navigate_to_url(self, url: str) -> bool:
         """Navigate to a specific URL."""
         try:
             self.driver.get(url)
-            # Wait for page to load
-            self.wait.until(lambda driver: driver.execute_script("return document.readyState") == "complete")
+            self._wait_for_page_load()
             logger.debug(f"Navigated to: {url}")
             return True
         except Exception as e:
             logger.error(f"Failed to navigate to {url}: {e}")
             return False
     
-    def find_element(self, selector: str, by: By = By.CSS_SELECTOR, timeout: Optional[float] = None) -> Optional[Any]:
+    def refresh_page(self) -> bool:
+        """Reload the current page."""
+        try:
+            self.driver.refresh()
+            self._wait_for_page_load()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to refresh page: {e}")
+            return False
+    
+    def open_spare_tabs(self, url: str, count: int) -> None:
+        """Open background tabs on a URL until `count` spare tabs exist."""
+        try:
+            while len(self._spare_tabs) < count:
+                known_handles = set(self.driver.window_handles)
+                # window.open returns immediately, so the tab loads while the current one is in use
+                self.driver.execute_script("window.open(arguments[0], '_blank');", url)
+                new_handles = [handle for handle in self.driver.window_handles if handle not in known_handles]
+                if not new_handles:
+                    logger.debug(f"Browser did not open a spare tab for {url}")
+                    return
+                self._spare_tabs.append(new_handles[0])
+        except Exception as e:
+            logger.error(f"Error opening spare tabs: {e}")
+    
+    def switch_to_spare_tab(self) -> bool:
+        """Close the current tab and continue in the oldest spare tab, once it has loaded."""
+        if not self._spare_tabs:
+            return False
+        
+        try:
+            tab = self._spare_tabs.pop(0)
+            self.driver.close()
+            self.driver.switch_to.window(tab)
+            self.wait.until(lambda driver: driver.execute_script("return document.readyState") == "complete")
+            return True
+        except Exception as e:
+            logger.error(f"Error switching to spare tab: {e}")
+            # Leave the driver attached to some open tab so the caller can navigate instead
+            try:
+                self.driver.switch_to.window(self.driver.window_handles[0])
+            except Exception:
+                pass
+            self._spare_tabs = [tab for tab in self._spare_tabs if tab in self.driver.window_handles]
+            return False
+    
+    def close_spare_tabs(self) -> None:
+        """Close all spare tabs and return to the current one."""
+        if not self._spare_tabs:
+            return
+        
+        try:
+            current = self.driver.current_window_handle
+            for tab in self._spare_tabs:
+                self.driver.switch_to.window(tab)
+                self.driver.close()
+            self._spare_tabs = []
+            self.driver.switch_to.window(current)
+        except Exception as e:
+            logger.error(f"Error closing spare tabs: {e}")
+            # Forget the tabs and leave the driver attached to some open tab
+            self._spare_tabs = []
+            try:
+                self.driver.switch_to.window(self.driver.window_handles[0])
+            except Exception:
+                pass
+    
+    def _wait_for_page_load(self) -> None:
+        """Wait for the page to finish loading after get() or refresh()."""
+        if self.config.browser == "chrome":
+            # Chrome runs with the "normal" page load strategy, so the driver
+            # call has already blocked until the load event
+            return
+        
+        self.wait.until(lambda driver: driver.execute_script("return document.readyState") == "complete")
+    
+    @staticmethod
+    def _to_locator(selector: Selector, by: str) -> Locator:
+        """Get the locator for a selector given either as a string or a prebuilt locator."""
+        if isinstance(selector, tuple):
+            return selector
+        return (by, selector)
+    
+    def _get_wait(self, timeout: Optional[float] = None) -> WebDriverWait:
+        """Get the shared WebDriverWait for a timeout (default: the action timeout)."""
+        wait_time = timeout or self.config.action_timeout
+        wait = self._wait_cache.get(wait_time)
+        if wait is None:
+            wait = self._wait_cache[wait_time] = WebDriverWait(self.driver, wait_time, poll_frequency=self._poll_frequency)
+        return wait
+    
+    def find_element(self, selector: Selector, by: By = By.CSS_SELECTOR, timeout: Optional[float] = None) -> Optional[Any]:
         """Find an element using the specified selector."""
         try:
-            wait_time = timeout or self.config.action_timeout
-            wait = WebDriverWait(self.driver, wait_time)
-            element = wait.until(EC.presence_of_element_located((by, selector)))
+            wait = self._get_wait(timeout)
+            element = wait.until(EC.presence_of_element_located(self._to_locator(selector, by)))
             return element
         except TimeoutException:
             logger.debug(f"Element not found: {selector}")
@@ -137,41 +413,99 @@ class BrowserAutomation:
             logger.error(f"Error finding element {selector}: {e}")
             return None
     
-    def find_elements(self, selector: str, by: By = By.CSS_SELECTOR) -> List[Any]:
+    def find_elements(self, selector: Selector, by: By = By.CSS_SELECTOR) -> List[Any]:
         """Find multiple elements using the specified selector."""
         try:
-            elements = self.driver.find_elements(by, selector)
+            elements = self.driver.find_elements(*self._to_locator(selector, by))
             return elements
         except Exception as e:
             logger.error(f"Error finding elements {selector}: {e}")
             return []
     
-    def click_element(self, selector: str, by: By = By.CSS_SELECTOR) -> bool:
+    def click_element(self, selector: Selector, by: By = By.CSS_SELECTOR) -> bool:
         """Click an element."""
         try:
             element = self.find_element(selector, by)
-            if element and element.is_enabled() and element.is_displayed():
-                # Scroll element into view
-                self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
-                time.sleep(0.1)  # Brief pause for scroll
-                element.click()
+            if not element:
+                logger.debug(f"Element not clickable: {selector}")
+                return False
+            
+            # Check and scroll in the page with a single round-trip, then click natively
+            result = self.driver.execute_script(self._prepare_click_js, element)
+            if result == "ok":
+                self._native_click(element)
                 logger.debug(f"Clicked element: {selector}")
                 return True
             else:
-                logger.debug(f"Element not clickable: {selector}")
+                logger.debug(f"Element not clickable ({result}): {selector}")
+                return False
+        except Exception as e:
+            logger.error(f"Error clicking element {selector}: {e}")
+            return False
+    
+    def click_first(self, selector: Selector, by: By = By.CSS_SELECTOR) -> bool:
+        """Click the first element matching a selector if there is one, without waiting for it."""
+        try:
+            by, value = self._to_locator(selector, by)
+            if by == By.CSS_SELECTOR:
+                # Finds, checks and scrolls in one round-trip; the element comes back if it can be clicked
+                result = self.driver.execute_script(self._prepare_click_first_js, value)
+            else:
+                elements = self.driver.find_elements(by, value)
+                result = self.driver.execute_script(self._prepare_click_js, elements[0]) if elements else "missing"
+                if result == "ok":
+                    result = elements[0]
+            
+            if isinstance(result, str) or result is None:
+                logger.debug(f"Element not clickable ({result}): {selector}")
                 return False
+            
+            self._native_click(result)
+            logger.debug(f"Clicked element: {selector}")
+            return True
         except Exception as e:
             logger.error(f"Error clicking element {selector}: {e}")
             return False
     
-    def type_text(self, selector: str, text: str, by: By = By.CSS_SELECTOR, clear_first: bool = True) -> bool:
-        """Type text into an input element."""
+    def _native_click(self, element: Any) -> None:
+        """
+        Click an element with WebDriver's native click.
+        
+        Unlike a script el.click(), this fires the full pointer and mouse event
+        sequence (the app's menus open on pointerdown) and checks that the element
+        is interactable. Only if another element would receive the click is it
+        dispatched on the element with a script instead.
+        """
+        try:
+            element.click()
+        except ElementClickInterceptedException:
+            self.driver.execute_script("arguments[0].click();", element)
+    
+    def type_text(
+        self,
+        selector: Selector,
+        text: str,
+        by: By = By.CSS_SELECTOR,
+        clear_first: bool = True,
+        use_keys: bool = False,
+    ) -> bool:
+        """
+        Type text into an input element.
+        
+        On Chrome the text is inserted with a single CDP command, which fires
+        input events but no key events; pass use_keys=True where the page
+        reacts to keystrokes (e.g. mention autocomplete).
+        """
         try:
             element = self.find_element(selector, by)
             if element:
                 if clear_first:
                     element.clear()
-                element.send_keys(text)
+                if use_keys or self.config.browser != "chrome":
+                    element.send_keys(text)
+                else:
+                    self.driver.execute_script("arguments[0].focus();", element)
+                    self.driver.execute_cdp_cmd("Input.insertText", {"text": text})
                 logger.debug(f"Typed text into {selector}: {text}")
                 return True
             return False
@@ -179,16 +513,22 @@ class BrowserAutomation:
             logger.error(f"Error typing text into {selector}: {e}")
             return False
     
-    def drag_and_drop(self, source_selector: str, target_selector: str, by: By = By.CSS_SELECTOR) -> bool:
+    def drag_and_drop(self, source_selector: Selector, target_selector: Selector, by: By = By.CSS_SELECTOR) -> bool:
         """Perform drag and drop operation."""
         try:
             source = self.find_element(source_selector, by)
             target = self.find_element(target_selector, by)
             
             if source and target:
-                self.action_chains.drag_and_drop(source, target).perform()
-                logger.debug(f"Dragged {source_selector} to {target_selector}")
-                return True
+                # The board uses HTML5 drag and drop, which synthetic pointer
+                # actions do not trigger; dispatch the events in one command
+                moved = self.driver.execute_async_script(
+                    self._html5_dnd_js, source, target, self.config.action_timeout * 1000
+                )
+                if moved:
+                    logger.debug(f"Dragged {source_selector} to {target_selector}")
+                    return True
+                logger.debug(f"Dropped {source_selector} on {target_selector}, but it did not move there")
             return False
         except Exception as e:
             logger.error(f"Error in drag and drop: {e}")
@@ -197,17 +537,13 @@ class BrowserAutomation:
     def scroll_page(self, direction: str = "down", pixels: int = 300) -> bool:
         """Scroll the page in the specified direction."""
         try:
-            if direction == "down":
-                self.driver.execute_script(f"window.scrollBy(0, {pixels});")
-            elif direction == "up":
-                self.driver.execute_script(f"window.scrollBy(0, -{pixels});")
-            elif direction == "left":
-                self.driver.execute_script(f"window.scrollBy(-{pixels}, 0);")
-            elif direction == "right":
-                self.driver.execute_script(f"window.scrollBy({pixels}, 0);")
-            else:
+            unit = self._scroll_directions.get(direction)
+            if unit is None:
                 return False
             
+            # Constant script source so the browser can reuse the compiled script
+            self.driver.execute_script(self._scroll_js, unit[0] * pixels, unit[1] * pixels)
+            
             logger.debug(f"Scrolled {direction} by {pixels} pixels")
             return True
         except Exception as e:
@@ -217,23 +553,34 @@ class BrowserAutomation:
     def get_page_screenshot(self) -> Optional[np.ndarray]:
         """Take a screenshot of the current page."""
         try:
-            # Take screenshot as PNG bytes
-            screenshot_bytes = self.driver.get_screenshot_as_png()
-            
-            # Convert to PIL Image
-            image = Image.open(io.BytesIO(screenshot_bytes))
+            screenshot_bytes = self._capture_screenshot_bytes()
+            height, width = self._screenshot_dst.shape[:2]
             
-            # Resize if needed
-            if (image.width != self.config.screenshot_width or 
-                image.height != self.config.screenshot_height):
-                image = image.resize((self.config.screenshot_width, self.config.screenshot_height))
-            
-            # Convert to numpy array
-            screenshot_array = np.array(image)
+            if _IMREAD_COLOR_RGB is not None:
+                # Decode straight to RGB, saving a full-frame colour conversion
+                screenshot_array = cv2.imdecode(np.frombuffer(screenshot_bytes, np.uint8), _IMREAD_COLOR_RGB)
+                if screenshot_array is None:
+                    raise ValueError("Could not decode screenshot")
+                
+                # The resize output is returned to the caller, so it gets a fresh array
+                if screenshot_array.shape[:2] != (height, width):
+                    screenshot_array = cv2.resize(screenshot_array, (width, height), interpolation=cv2.INTER_AREA)
+            else:
+                # Decode to a BGR array
+                image = cv2.imdecode(np.frombuffer(screenshot_bytes, np.uint8), cv2.IMREAD_COLOR)
+                if image is None:
+                    raise ValueError("Could not decode screenshot")
+                
+                # Resize into the reused buffer if needed
+                if image.shape[:2] != (height, width):
+                    image = cv2.resize(image, (width, height), dst=self._screenshot_dst, interpolation=cv2.INTER_AREA)
+                
+                # Convert to the RGB array returned to the caller
+                screenshot_array = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
             
             # Save screenshot if debugging
             if self.config.save_screenshots:
-                self._save_debug_screenshot(image)
+                self._save_debug_screenshot(screenshot_array)
             
             return screenshot_array
             
@@ -241,7 +588,20 @@ class BrowserAutomation:
             logger.error(f"Error taking screenshot: {e}")
             return None
     
-    def _save_debug_screenshot(self, image: Image.Image) -> None:
+    def _capture_screenshot_bytes(self) -> bytes:
+        """Capture the viewport as encoded image bytes."""
+        if self.config.browser == "chrome":
+            # JPEG is much cheaper to encode, transfer and decode than PNG
+            result = self.driver.execute_cdp_cmd("Page.captureScreenshot", {
+                "format": "jpeg",
+                "quality": self.config.screenshot_jpeg_quality,
+                "captureBeyondViewport": False,
+            })
+            return base64.b64decode(result["data"])
+        
+        return self.driver.get_screenshot_as_png()
+    
+    def _save_debug_screenshot(self, image: np.ndarray) -> None:
         """Save screenshot for debugging purposes."""
         try:
             screenshot_dir = Path(self.config.screenshot_dir)
@@ -251,7 +611,7 @@ class BrowserAutomation:
             filename = f"screenshot_{timestamp}.png"
             filepath = screenshot_dir / filename
             
-            image.save(filepath)
+            Image.fromarray(image).save(filepath)
             logger.debug(f"Saved debug screenshot: {filepath}")
             
         except Exception as e:
@@ -265,20 +625,19 @@ class BrowserAutomation:
             logger.error(f"Error getting page source: {e}")
             return ""
     
-    def execute_javascript(self, script: str) -> Any:
-        """Execute JavaScript code in the browser."""
+    def execute_javascript(self, script: str, *args: Any) -> Any:
+        """Execute JavaScript code in the browser, passing args as arguments[0], arguments[1], ..."""
         try:
-            return self.driver.execute_script(script)
+            return self.driver.execute_script(script, *args)
         except Exception as e:
             logger.error(f"Error executing JavaScript: {e}")
             return None
     
-    def wait_for_element(self, selector: str, by: By = By.CSS_SELECTOR, timeout: Optional[float] = None) -> bool:
+    def wait_for_element(self, selector: Selector, by: By = By.CSS_SELECTOR, timeout: Optional[float] = None) -> bool:
         """Wait for an element to be present and visible."""
         try:
-            wait_time = timeout or self.config.action_timeout
-            wait = WebDriverWait(self.driver, wait_time)
-            wait.until(EC.visibility_of_element_located((by, selector)))
+            wait = self._get_wait(timeout)
+            wait.until(EC.visibility_of_element_located(self._to_locator(selector, by)))
             return True
         except TimeoutException:
             return False
@@ -286,7 +645,18 @@ class BrowserAutomation:
             logger.error(f"Error waiting for element {selector}: {e}")
             return False
     
-    def get_element_text(self, selector: str, by: By = By.CSS_SELECTOR) -> Optional[str]:
+    def wait_for_url_change(self, url: str, timeout: Optional[float] = None) -> bool:
+        """Wait until the browser has left the given URL."""
+        try:
+            self._get_wait(timeout).until(EC.url_changes(url))
+            return True
+        except TimeoutException:
+            return False
+        except Exception as e:
+            logger.error(f"Error waiting for URL change from {url}: {e}")
+            return False
+    
+    def get_element_text(self, selector: Selector, by: By = By.CSS_SELECTOR) -> Optional[str]:
         """Get text content of an element."""
         try:
             element = self.find_element(selector, by)
@@ -297,7 +667,7 @@ class BrowserAutomation:
             logger.error(f"Error getting element text {selector}: {e}")
             return None
     
-    def get_element_attribute(self, selector: str, attribute: str, by: By = By.CSS_SELECTOR) -> Optional[str]:
+    def get_element_attribute(self, selector: Selector, attribute: str, by: By = By.CSS_SELECTOR) -> Optional[str]:
         """Get attribute value of an element."""
         try:
             element = self.find_element(selector, by)
@@ -308,21 +678,36 @@ class BrowserAutomation:
             logger.error(f"Error getting element attribute {selector}.{attribute}: {e}")
             return None
     
-    def is_element_present(self, selector: str, by: By = By.CSS_SELECTOR) -> bool:
+    def is_element_present(self, selector: Selector, by: By = By.CSS_SELECTOR) -> bool:
         """Check if an element is present on the page."""
         try:
-            element = self.driver.find_element(by, selector)
-            return element is not None
-        except NoSuchElementException:
-            return False
+            by, value = self._to_locator(selector, by)
+            if by == By.CSS_SELECTOR:
+                # One script call instead of a NoSuchElementException round-trip on a miss
+                return bool(self.driver.execute_script("return !!document.querySelector(arguments[0]);", value))
+            return len(self.driver.find_elements(by, value)) > 0
         except Exception as e:
             logger.error(f"Error checking element presence {selector}: {e}")
             return False
     
+    def count_elements(self, selector: Selector, by: By = By.CSS_SELECTOR) -> int:
+        """Count the elements matching a selector without fetching element references."""
+        try:
+            by, value = self._to_locator(selector, by)
+            if by == By.CSS_SELECTOR:
+                return int(self.driver.execute_script("return document.querySelectorAll(arguments[0]).length;", value))
+            return len(self.driver.find_elements(by, value))
+        except Exception as e:
+            logger.error(f"Error counting elements {selector}: {e}")
+            return 0
+    
     def get_current_url(self) -> str:
         """Get the current page URL."""
         try:
             return self.driver.current_url
         except Exception as e:
             logger.error(f"Error getting current URL: {e}")
-            return ""
\ No newline at end of file
+            return ""
+
+
+atexit.register(BrowserAutomation.shutdown_pool)
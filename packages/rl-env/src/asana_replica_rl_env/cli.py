@@ -6,24 +6,32 @@ This CLI provides easy access to environment testing, training, and configuratio
 """
 
 import argparse
-import json
 import logging
+import os
 import sys
 from pathlib import Path
 from typing import Dict, Any, Optional
 
-from .environment import AsanaReplicaEnv
-from .config import EnvironmentConfig, RewardConfig
-from .reward_calculator import RewardScenarioManager
-from .training_manager import TrainingEpisodeManager
+# The environment stack (selenium, gymnasium, pydantic) is imported inside the
+# commands that need it, so --help and argument errors return immediately
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Action id ranges listed by the "actions" command, by category
+ACTION_CATEGORIES = (
+    ("Navigation", range(0, 10)),
+    ("Project Management", range(10, 20)),
+    ("Task Management", range(20, 35)),
+    ("Collaboration", range(35, 45)),
+    ("View & Filter", range(45, 50)),
+)
+
 
 def test_environment(args: argparse.Namespace) -> None:
     """Test the environment with basic functionality."""
+    from .config import EnvironmentConfig
+    from .environment import AsanaReplicaEnv
+    
     logger.info("Testing Asana Replica RL Environment")
     
     # Create configuration
@@ -38,6 +46,7 @@ def test_environment(args: argparse.Namespace) -> None:
     
     # Create environment
     env = AsanaReplicaEnv(config)
+    action_meanings = env.get_action_meanings()
     
     try:
         logger.info("Initializing environment...")
@@ -48,14 +57,15 @@ def test_environment(args: argparse.Namespace) -> None:
         logger.info("Testing random actions...")
         for i in range(min(10, args.max_steps)):
             action = env.action_space.sample()
-            action_name = env.get_action_meanings()[action]
+            action_name = action_meanings[action]
             
-            logger.info(f"Step {i+1}: Executing {action_name}")
+            logger.info("Step %d: Executing %s", i + 1, action_name)
             observation, reward, terminated, truncated, info = env.step(action)
             
-            logger.info(f"  Reward: {reward:.3f}")
-            if info.get("reward_components"):
-                logger.info(f"  Reward breakdown: {info['reward_components']}")
+            logger.info("  Reward: %.3f", reward)
+            components = info.get("reward_components")
+            if components:
+                logger.info("  Reward breakdown: %s", components)
             
             if terminated or truncated:
                 logger.info(f"  Episode ended: {'terminated' if terminated else 'truncated'}")
@@ -73,11 +83,15 @@ def test_environment(args: argparse.Namespace) -> None:
 
 def run_training(args: argparse.Namespace) -> None:
     """Run training with specified configuration."""
+    from .config import EnvironmentConfig
+    from .environment import AsanaReplicaEnv
+    from .reward_calculator import get_scenario_config
+    from .training_manager import TrainingEpisodeManager
+    
     logger.info(f"Starting training with scenario: {args.scenario}")
     
     # Load reward configuration
-    scenario_manager = RewardScenarioManager()
-    reward_config = scenario_manager.get_scenario_config(args.scenario)
+    reward_config = get_scenario_config(args.scenario)
     
     # Create environment configuration
     config = EnvironmentConfig(
@@ -93,6 +107,7 @@ def run_training(args: argparse.Namespace) -> None:
     # Create environment and training manager
     env = AsanaReplicaEnv(config)
     training_manager = TrainingEpisodeManager(config, log_dir=args.log_dir)
+    action_meanings = env.get_action_meanings()
     
     try:
         # Load previous training history if requested
@@ -110,13 +125,12 @@ def run_training(args: argparse.Namespace) -> None:
             # Reset environment
             observation, info = env.reset()
             
-            episode_reward = 0.0
             step_count = 0
             
             while True:
                 # Random action (replace with your RL algorithm)
                 action = env.action_space.sample()
-                action_name = env.get_action_meanings()[action]
+                action_name = action_meanings[action]
                 
                 # Execute action
                 observation, reward, terminated, truncated, info = env.step(action)
@@ -131,16 +145,16 @@ def run_training(args: argparse.Namespace) -> None:
                     info=info
                 )
                 
-                episode_reward += reward
                 step_count += 1
                 
-                if step_count % 20 == 0:
-                    logger.info(f"Step {step_count}: {action_name} -> {reward:.3f}")
+                if step_count % 20 == 0 and logger.isEnabledFor(logging.INFO):
+                    logger.info("Step %d: %s -> %.3f", step_count, action_name, reward)
                 
                 if terminated or truncated:
                     break
             
             # End episode
+            episode_reward = training_manager.get_episode_reward()
             episode_summary = training_manager.end_episode(
                 final_reward=episode_reward,
                 episode_length=step_count,
@@ -154,12 +168,11 @@ def run_training(args: argparse.Namespace) -> None:
         training_manager.save_training_summary()
         metrics = training_manager.get_performance_metrics()
         
-        logger.info("\n--- Training Summary ---")
-        for key, value in metrics.items():
-            if isinstance(value, float):
-                logger.info(f"{key}: {value:.3f}")
-            else:
-                logger.info(f"{key}: {value}")
+        summary_lines = [
+            f"{key}: {value:.3f}" if isinstance(value, float) else f"{key}: {value}"
+            for key, value in metrics.items()
+        ]
+        logger.info("\n--- Training Summary ---\n" + "\n".join(summary_lines))
         
     except KeyboardInterrupt:
         logger.info("Training interrupted by user")
@@ -169,11 +182,15 @@ def run_training(args: argparse.Namespace) -> None:
         sys.exit(1)
     
     finally:
+        training_manager.close()
         env.close()
 
 
 def list_actions(args: argparse.Namespace) -> None:
     """List all available actions."""
+    from .config import EnvironmentConfig
+    from .environment import AsanaReplicaEnv
+    
     config = EnvironmentConfig()
     env = AsanaReplicaEnv(config)
     
@@ -182,16 +199,7 @@ def list_actions(args: argparse.Namespace) -> None:
     print("\nAvailable Actions:")
     print("=" * 50)
     
-    # Group actions by category
-    categories = {
-        "Navigation": [0, 1, 2, 3, 4, 5, 6, 7, 8, 9],
-        "Project Management": [10, 11, 12, 13, 14, 15, 16, 17, 18, 19],
-        "Task Management": [20, 21, 22, 23, 24, 25, 26, 27, 28, 29, 30, 31, 32, 33, 34],
-        "Collaboration": [35, 36, 37, 38, 39, 40, 41, 42, 43, 44],
-        "View & Filter": [45, 46, 47, 48, 49],
-    }
-    
-    for category, action_ids in categories.items():
+    for category, action_ids in ACTION_CATEGORIES:
         print(f"\n{category}:")
         print("-" * len(category))
         for action_id in action_ids:
@@ -203,6 +211,8 @@ def list_actions(args: argparse.Namespace) -> None:
 
 def create_config(args: argparse.Namespace) -> None:
     """Create a configuration file."""
+    from .config import EnvironmentConfig
+    
     config = EnvironmentConfig(
         base_url=args.url,
         browser=args.browser,
@@ -211,23 +221,36 @@ def create_config(args: argparse.Namespace) -> None:
         max_episode_steps=args.max_steps,
     )
     
-    config_dict = config.dict() if hasattr(config, 'dict') else {
-        "base_url": config.base_url,
-        "browser": config.browser,
-        "headless": config.headless,
-        "observation_mode": config.observation_mode,
-        "max_episode_steps": config.max_episode_steps,
-    }
-    
     output_file = Path(args.output)
-    with open(output_file, 'w') as f:
-        json.dump(config_dict, f, indent=2)
+    # Write next to the target and rename, so an existing file is never left half-written
+    tmp_file = output_file.with_name(output_file.name + ".tmp")
+    try:
+        tmp_file.write_text(config.model_dump_json(indent=2))
+        os.replace(tmp_file, output_file)
+    except Exception:
+        tmp_file.unlink(missing_ok=True)
+        raise
     
     logger.info(f"Configuration saved to {output_file}")
 
 
-def main() -> None:
-    """Main CLI entry point."""
+def _add_environment_arguments(
+    parser: argparse.ArgumentParser,
+    observation_mode: str,
+    max_steps: int,
+    max_steps_help: str = "Maximum steps per episode",
+) -> None:
+    """Add the environment options shared by the test, train and config commands."""
+    parser.add_argument("--url", default="http://localhost:3000", help="Application URL")
+    parser.add_argument("--browser", choices=["chrome", "firefox"], default="chrome", help="Browser type")
+    parser.add_argument("--headless", action="store_true", help="Run browser in headless mode")
+    parser.add_argument("--observation-mode", choices=["visual", "structured", "hybrid"],
+                        default=observation_mode, help="Observation mode")
+    parser.add_argument("--max-steps", type=int, default=max_steps, help=max_steps_help)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for the CLI."""
     parser = argparse.ArgumentParser(
         description="Asana Replica RL Environment CLI",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -255,24 +278,15 @@ Examples:
     
     # Test command
     test_parser = subparsers.add_parser("test", help="Test environment functionality")
-    test_parser.add_argument("--url", default="http://localhost:3000", help="Application URL")
-    test_parser.add_argument("--browser", choices=["chrome", "firefox"], default="chrome", help="Browser type")
-    test_parser.add_argument("--headless", action="store_true", help="Run browser in headless mode")
-    test_parser.add_argument("--observation-mode", choices=["visual", "structured", "hybrid"], 
-                           default="hybrid", help="Observation mode")
-    test_parser.add_argument("--max-steps", type=int, default=50, help="Maximum steps for test")
+    _add_environment_arguments(test_parser, observation_mode="hybrid", max_steps=50,
+                               max_steps_help="Maximum steps for test")
     
     # Train command
     train_parser = subparsers.add_parser("train", help="Run training")
     train_parser.add_argument("--scenario", choices=["efficiency-training", "collaboration", "project-creation"],
                             default="efficiency-training", help="Training scenario")
     train_parser.add_argument("--episodes", type=int, default=10, help="Number of episodes")
-    train_parser.add_argument("--url", default="http://localhost:3000", help="Application URL")
-    train_parser.add_argument("--browser", choices=["chrome", "firefox"], default="chrome", help="Browser type")
-    train_parser.add_argument("--headless", action="store_true", help="Run browser in headless mode")
-    train_parser.add_argument("--observation-mode", choices=["visual", "structured", "hybrid"],
-                            default="structured", help="Observation mode")
-    train_parser.add_argument("--max-steps", type=int, default=200, help="Maximum steps per episode")
+    _add_environment_arguments(train_parser, observation_mode="structured", max_steps=200)
     train_parser.add_argument("--log-dir", default="./training_logs", help="Directory for training logs")
     train_parser.add_argument("--resume", action="store_true", help="Resume from previous training")
     
@@ -282,19 +296,23 @@ Examples:
     # Config command
     config_parser = subparsers.add_parser("config", help="Create configuration file")
     config_parser.add_argument("--output", default="env_config.json", help="Output configuration file")
-    config_parser.add_argument("--url", default="http://localhost:3000", help="Application URL")
-    config_parser.add_argument("--browser", choices=["chrome", "firefox"], default="chrome", help="Browser type")
-    config_parser.add_argument("--headless", action="store_true", help="Run browser in headless mode")
-    config_parser.add_argument("--observation-mode", choices=["visual", "structured", "hybrid"],
-                             default="hybrid", help="Observation mode")
-    config_parser.add_argument("--max-steps", type=int, default=1000, help="Maximum steps per episode")
+    _add_environment_arguments(config_parser, observation_mode="hybrid", max_steps=1000)
+    
+    return parser
+
+
+def main() -> None:
+    """Main CLI entry point."""
+    parser = build_parser()
     
     # Parse arguments
     args = parser.parse_args()
     
-    # Set logging level
-    if args.debug:
-        logging.getLogger().setLevel(logging.DEBUG)
+    # Set up logging (here rather than at import, so importing the module leaves logging alone)
+    logging.basicConfig(
+        level=logging.DEBUG if args.debug else logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+    )
     
     # Execute command
     if args.command == "test":
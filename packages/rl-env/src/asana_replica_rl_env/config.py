@@ -1,5 +1,7 @@
 """Configuration classes for the Asana Replica RL Environment."""
 
+import os
+from functools import lru_cache
 from typing import Dict, Any, Optional, Literal
 from pydantic import BaseModel, Field, validator
 
@@ -31,6 +33,9 @@ class RewardConfig(BaseModel):
     
     # Time-based modifiers
     deadline_bonus_multiplier: float = Field(default=1.5, description="Multiplier for meeting deadlines")
+    deadline_seconds: float = Field(
+        default=300.0, description="Episode time within which task completions earn the deadline bonus"
+    )
     overdue_penalty_multiplier: float = Field(default=0.5, description="Penalty multiplier for overdue tasks")
 
 
@@ -48,6 +53,23 @@ class EnvironmentConfig(BaseModel):
     headless: bool = Field(default=True, description="Run browser in headless mode")
     window_width: int = Field(default=1920, description="Browser window width")
     window_height: int = Field(default=1080, description="Browser window height")
+    driver_path: Optional[str] = Field(
+        default=None, description="Path to the chromedriver/geckodriver binary (None resolves it with webdriver-manager)"
+    )
+    gpu_rasterization: bool = Field(
+        default=False, description="Let Chrome rasterize on the GPU (opt-in; by default --disable-gpu is passed)"
+    )
+    chrome_profile_dir: Optional[str] = Field(
+        default=None,
+        description="Directory (e.g. /dev/shm) for persistent Chrome profiles reused by later browsers in the process",
+    )
+    browser_pool_size: int = Field(
+        default=0, description="Idle browsers kept for reuse by later environments in this process (0 disables)"
+    )
+    preload_reset_tab: bool = Field(
+        default=False,
+        description="Load the dashboard in a background tab when an episode ends, so the next reset() switches tabs instead of navigating",
+    )
     
     # Environment settings
     observation_mode: Literal["visual", "structured", "hybrid"] = Field(
@@ -55,6 +77,9 @@ class EnvironmentConfig(BaseModel):
     )
     max_episode_steps: int = Field(default=1000, description="Maximum steps per episode")
     action_timeout: float = Field(default=10.0, description="Timeout for actions in seconds")
+    include_url_in_info: bool = Field(
+        default=False, description="Add the browser's current URL to reset and step info (one extra WebDriver call)"
+    )
     
     # Reward settings
     reward_config: RewardConfig = Field(default_factory=RewardConfig, description="Reward configuration")
@@ -63,11 +88,20 @@ class EnvironmentConfig(BaseModel):
     # Observation settings
     screenshot_width: int = Field(default=800, description="Screenshot width for visual observations")
     screenshot_height: int = Field(default=600, description="Screenshot height for visual observations")
+    screenshot_jpeg_quality: int = Field(
+        default=70, ge=1, le=100, description="JPEG quality for Chrome screenshots (captured via CDP instead of PNG)"
+    )
     
     # Logging and debugging
     debug_mode: bool = Field(default=False, description="Enable debug logging")
     save_screenshots: bool = Field(default=False, description="Save screenshots for debugging")
     screenshot_dir: str = Field(default="./screenshots", description="Directory to save screenshots")
+    save_step_details: bool = Field(
+        default=False, description="Include the step records in each episodes.jsonl record (steps.jsonl always has them)"
+    )
+    max_logged_steps: int = Field(
+        default=1000, description="Step records kept per episode in episodes.jsonl (sampled beyond this; steps.jsonl keeps all)"
+    )
     
     @validator('base_url')
     def validate_base_url(cls, v: str) -> str:
@@ -90,8 +124,14 @@ class EnvironmentConfig(BaseModel):
     
     @classmethod
     def load_reward_config(cls, config_file: str) -> RewardConfig:
-        """Load reward configuration from JSON file."""
-        import json
-        with open(config_file, 'r') as f:
-            config_data = json.load(f)
-        return RewardConfig(**config_data)
\ No newline at end of file
+        """Load reward configuration from JSON file, reusing the parse while the file is unchanged."""
+        path = os.path.abspath(config_file)
+        # Copy the cached parse so changes made by one caller do not leak into the next load
+        return _load_reward_config(path, os.stat(path).st_mtime_ns).model_copy()
+
+
+@lru_cache(maxsize=32)
+def _load_reward_config(path: str, mtime_ns: int) -> RewardConfig:
+    """Parse a reward config file; the mtime is part of the cache key only."""
+    with open(path, 'rb') as f:
+        return RewardConfig.model_validate_json(f.read())
\ No newline at end of file
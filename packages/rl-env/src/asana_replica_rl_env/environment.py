@@ -2,19 +2,41 @@
 
 import logging
 import time
-from typing import Dict, Any, Tuple, Optional, Union
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Dict, Any, Tuple, Optional, Union
 import numpy as np
 import gymnasium as gym
 from gymnasium import spaces
 
 from .config import EnvironmentConfig
-from .browser_automation import BrowserAutomation
 from .reward_calculator import RewardCalculator
-from .action_executor import ActionExecutor
-from .state_observer import StateObserver
+
+# The browser-facing components pull in selenium; they are imported when the
+# first episode starts, so building an env (e.g. AsyncVectorEnv's space probe) stays cheap
+if TYPE_CHECKING:
+    from .browser_automation import BrowserAutomation
+    from .action_executor import ActionExecutor
+    from .state_observer import StateObserver
 
 logger = logging.getLogger(__name__)
 
+# Login form and landing page selectors
+_LOGIN_EMAIL_SELECTOR = 'input[type="email"]'
+_LOGIN_PASSWORD_SELECTOR = 'input[type="password"]'
+_LOGIN_SUBMIT_SELECTOR = 'button[type="submit"]'
+_DASHBOARD_SELECTOR = '[data-testid="dashboard"]'
+
+
+def _structured_observation_space() -> spaces.Dict:
+    """Build the space of the DOM-based structured features."""
+    return spaces.Dict({
+        "task_counts": spaces.Box(low=0, high=1000, shape=(3,), dtype=np.int32),  # todo, in_progress, completed
+        "project_count": spaces.Box(low=0, high=100, shape=(1,), dtype=np.int32),
+        "current_view": spaces.Discrete(5),  # dashboard, list, board, timeline, calendar
+        "user_position": spaces.Box(low=0, high=1, shape=(2,), dtype=np.float32),  # normalized x, y
+        "page_elements": spaces.Box(low=0, high=1, shape=(20,), dtype=np.uint8),  # element visibility flags
+    })
+
 
 class AsanaReplicaEnv(gym.Env):
     """
@@ -46,11 +68,11 @@ class AsanaReplicaEnv(gym.Env):
         else:
             self.config = config
         
-        # Initialize components
-        self.browser = BrowserAutomation(self.config)
-        self.reward_calculator = RewardCalculator(self.config.reward_config)
-        self.action_executor = ActionExecutor(self.browser, self.config)
-        self.state_observer = StateObserver(self.browser, self.config)
+        # Initialize components (browser-facing ones on first use, see _ensure_components)
+        self.browser: Optional["BrowserAutomation"] = None
+        self.reward_calculator = RewardCalculator(self.config.reward_config, action_timeout=self.config.action_timeout)
+        self.action_executor: Optional["ActionExecutor"] = None
+        self.state_observer: Optional["StateObserver"] = None
         
         # Environment state
         self.current_step = 0
@@ -59,6 +81,12 @@ class AsanaReplicaEnv(gym.Env):
         self.is_logged_in = False
         self.current_project_id: Optional[str] = None
         
+        # Screenshot from the latest observation, reused by render("rgb_array")
+        self._render_frame: Optional[np.ndarray] = None
+        
+        # Screenshot array shape shared by the observation space and default observations
+        self._visual_shape = (self.config.screenshot_height, self.config.screenshot_width, 3)
+        
         # Define action and observation spaces
         self._setup_action_space()
         self._setup_observation_space()
@@ -71,68 +99,85 @@ class AsanaReplicaEnv(gym.Env):
         # Actions are mapped to specific UI interactions
         self.action_space = spaces.Discrete(50)  # 50 different actions
         
-        # Action mapping (will be used by ActionExecutor)
-        self.action_mapping = {
+        # Action names indexed by action id (will be used by ActionExecutor)
+        self._action_names = (
             # Navigation actions (0-9)
-            0: "navigate_to_dashboard",
-            1: "navigate_to_projects",
-            2: "navigate_to_project_list",
-            3: "navigate_to_project_board",
-            4: "navigate_to_project_timeline",
-            5: "navigate_to_project_calendar",
-            6: "switch_workspace",
-            7: "scroll_up",
-            8: "scroll_down",
-            9: "refresh_page",
+            "navigate_to_dashboard",
+            "navigate_to_projects",
+            "navigate_to_project_list",
+            "navigate_to_project_board",
+            "navigate_to_project_timeline",
+            "navigate_to_project_calendar",
+            "switch_workspace",
+            "scroll_up",
+            "scroll_down",
+            "refresh_page",
             
             # Project actions (10-19)
-            10: "create_new_project",
-            11: "open_project",
-            12: "edit_project",
-            13: "archive_project",
-            14: "change_project_color",
-            15: "add_project_member",
-            16: "remove_project_member",
-            17: "duplicate_project",
-            18: "delete_project",
-            19: "set_project_status",
+            "create_new_project",
+            "open_project",
+            "edit_project",
+            "archive_project",
+            "change_project_color",
+            "add_project_member",
+            "remove_project_member",
+            "duplicate_project",
+            "delete_project",
+            "set_project_status",
             
             # Task actions (20-34)
-            20: "create_new_task",
-            21: "open_task_detail",
-            22: "edit_task_name",
-            23: "edit_task_description",
-            24: "set_task_assignee",
-            25: "set_task_due_date",
-            26: "set_task_priority",
-            27: "change_task_status_todo",
-            28: "change_task_status_in_progress",
-            29: "change_task_status_completed",
-            30: "add_task_dependency",
-            31: "remove_task_dependency",
-            32: "add_task_tag",
-            33: "delete_task",
-            34: "duplicate_task",
+            "create_new_task",
+            "open_task_detail",
+            "edit_task_name",
+            "edit_task_description",
+            "set_task_assignee",
+            "set_task_due_date",
+            "set_task_priority",
+            "change_task_status_todo",
+            "change_task_status_in_progress",
+            "change_task_status_completed",
+            "add_task_dependency",
+            "remove_task_dependency",
+            "add_task_tag",
+            "delete_task",
+            "duplicate_task",
             
             # Collaboration actions (35-44)
-            35: "add_comment",
-            36: "reply_to_comment",
-            37: "edit_comment",
-            38: "delete_comment",
-            39: "mention_user",
-            40: "attach_file",
-            41: "create_subtask",
-            42: "convert_to_project",
-            43: "follow_task",
-            44: "unfollow_task",
+            "add_comment",
+            "reply_to_comment",
+            "edit_comment",
+            "delete_comment",
+            "mention_user",
+            "attach_file",
+            "create_subtask",
+            "convert_to_project",
+            "follow_task",
+            "unfollow_task",
             
             # View and filter actions (45-49)
-            45: "filter_by_assignee",
-            46: "filter_by_status",
-            47: "filter_by_due_date",
-            48: "sort_tasks",
-            49: "search_tasks",
-        }
+            "filter_by_assignee",
+            "filter_by_status",
+            "filter_by_due_date",
+            "sort_tasks",
+            "search_tasks",
+        )
+        # Read-only id -> name view kept for get_action_meanings and the executor
+        self.action_mapping = MappingProxyType(dict(enumerate(self._action_names)))
+        self._n_actions = int(self.action_space.n)
+    
+    def _ensure_components(self) -> None:
+        """Create the browser, action executor and state observer if not done yet."""
+        if self.browser is not None:
+            return
+        
+        from .browser_automation import BrowserAutomation
+        from .action_executor import ActionExecutor
+        from .state_observer import StateObserver
+        
+        self.browser = BrowserAutomation(self.config)
+        self.action_executor = ActionExecutor(self.browser, self.config)
+        self.action_executor.bind_action_ids(self.action_mapping)
+        self.state_observer = StateObserver(self.browser, self.config)
     
     def _setup_observation_space(self) -> None:
         """Set up the observation space for the environment."""
@@ -141,35 +186,25 @@ class AsanaReplicaEnv(gym.Env):
             self.observation_space = spaces.Box(
                 low=0,
                 high=255,
-                shape=(self.config.screenshot_height, self.config.screenshot_width, 3),
+                shape=self._visual_shape,
                 dtype=np.uint8
             )
         elif self.config.observation_mode == "structured":
             # Structured observations: DOM-based features
-            self.observation_space = spaces.Dict({
-                "task_counts": spaces.Box(low=0, high=1000, shape=(3,), dtype=np.int32),  # todo, in_progress, completed
-                "project_count": spaces.Box(low=0, high=100, shape=(1,), dtype=np.int32),
-                "current_view": spaces.Discrete(5),  # dashboard, list, board, timeline, calendar
-                "user_position": spaces.Box(low=0, high=1, shape=(2,), dtype=np.float32),  # normalized x, y
-                "page_elements": spaces.Box(low=0, high=1, shape=(20,), dtype=np.float32),  # element visibility flags
-            })
+            self.observation_space = _structured_observation_space()
         else:  # hybrid mode
             # Combination of visual and structured observations
             self.observation_space = spaces.Dict({
                 "visual": spaces.Box(
                     low=0,
                     high=255,
-                    shape=(self.config.screenshot_height, self.config.screenshot_width, 3),
+                    shape=self._visual_shape,
                     dtype=np.uint8
                 ),
-                "structured": spaces.Dict({
-                    "task_counts": spaces.Box(low=0, high=1000, shape=(3,), dtype=np.int32),
-                    "project_count": spaces.Box(low=0, high=100, shape=(1,), dtype=np.int32),
-                    "current_view": spaces.Discrete(5),
-                    "user_position": spaces.Box(low=0, high=1, shape=(2,), dtype=np.float32),
-                    "page_elements": spaces.Box(low=0, high=1, shape=(20,), dtype=np.float32),
-                })
+                "structured": _structured_observation_space(),
             })
+        
+        self._build_default_observations()
     
     def reset(self, seed: Optional[int] = None, options: Optional[Dict[str, Any]] = None) -> Tuple[Any, Dict[str, Any]]:
         """
@@ -188,28 +223,42 @@ class AsanaReplicaEnv(gym.Env):
         
         # Reset environment state
         self.current_step = 0
-        self.episode_start_time = time.time()
+        self.episode_start_time = time.monotonic()
         self.last_action_time = self.episode_start_time
+        self._render_frame = None
         
         try:
             # Start browser if not already started
+            self._ensure_components()
+            self.state_observer.invalidate()
             if self.browser.driver is None:
                 self.browser.start_browser()
             
-            # Navigate to application
-            success = self.browser.navigate_to_url(self.config.base_url)
-            if not success:
-                raise RuntimeError(f"Failed to navigate to {self.config.base_url}")
-            
-            # Login if required
-            if self.config.login_required and not self.is_logged_in:
+            dashboard_url = f"{self.config.base_url}/dashboard"
+            if self.is_logged_in or not self.config.login_required:
+                # Warm browser with a live session: a pre-loaded tab or a single navigation starts the episode
+                if not self.browser.switch_to_spare_tab() and not self.browser.navigate_to_url(dashboard_url):
+                    raise RuntimeError(f"Failed to navigate to {dashboard_url}")
+                
+                # Log in again only if the session did not survive (we were sent to the login page)
+                if self.config.login_required and "/login" in (self.browser.get_current_url() or ""):
+                    logger.info("Session expired, logging in again")
+                    self.is_logged_in = False
+                    if not self._perform_login():
+                        self.browser.navigate_to_url(dashboard_url)
+            else:
+                # Navigate to application
+                success = self.browser.navigate_to_url(self.config.base_url)
+                if not success:
+                    raise RuntimeError(f"Failed to navigate to {self.config.base_url}")
+                
+                # Login and navigate to dashboard
                 self._perform_login()
-            
-            # Navigate to dashboard
-            self.browser.navigate_to_url(f"{self.config.base_url}/dashboard")
+                self.browser.navigate_to_url(dashboard_url)
             
             # Get initial observation
             observation = self.state_observer.get_observation()
+            self._remember_render_frame(observation)
             
             # Reset reward calculator
             self.reward_calculator.reset()
@@ -218,8 +267,9 @@ class AsanaReplicaEnv(gym.Env):
                 "episode_step": self.current_step,
                 "episode_time": 0.0,
                 "logged_in": self.is_logged_in,
-                "current_url": self.browser.get_current_url(),
             }
+            if self.config.include_url_in_info:
+                info["current_url"] = self.browser.get_current_url()
             
             logger.info("Environment reset successfully")
             return observation, info
@@ -241,12 +291,17 @@ class AsanaReplicaEnv(gym.Env):
         Returns:
             Tuple of (observation, reward, terminated, truncated, info)
         """
+        self._ensure_components()
+        self.state_observer.invalidate()  # the page may change from here on
         self.current_step += 1
-        current_time = time.time()
-        step_start_time = current_time
+        step_start_time = time.monotonic()
+        self._render_frame = None
+        
+        # A tab pre-loaded for reset() would miss the changes this step makes, so drop it if the episode goes on
+        self.browser.close_spare_tabs()
         
-        # Validate action
-        if not self.action_space.contains(action):
+        # Validate action (a plain range test; Discrete.contains is slow for a per-step check)
+        if not (isinstance(action, (int, np.integer)) and 0 <= action < self._n_actions):
             logger.warning(f"Invalid action: {action}")
             observation = self.state_observer.get_observation()
             reward = self.config.reward_config.invalid_action_penalty
@@ -258,7 +313,7 @@ class AsanaReplicaEnv(gym.Env):
             return observation, reward, False, False, info
         
         # Get action name
-        action_name = self.action_mapping.get(action, f"unknown_action_{action}")
+        action_name = self._action_names[action]
         logger.debug(f"Executing action {action}: {action_name}")
         
         try:
@@ -267,31 +322,44 @@ class AsanaReplicaEnv(gym.Env):
             
             # Get new observation
             observation = self.state_observer.get_observation()
+            self._remember_render_frame(observation)
+            
+            # One clock sample after the action serves the reward, truncation and info
+            now = time.monotonic()
             
             # Calculate reward
             reward = self.reward_calculator.calculate_reward(
                 action_name=action_name,
                 action_success=action_success,
                 observation=observation,
-                step_time=current_time - step_start_time
+                step_time=now - step_start_time
             )
             
-            # Check termination conditions
-            terminated = self._check_terminated()
-            truncated = self._check_truncated()
+            # Check termination conditions (the URL is read once and shared with the info below)
+            current_url = self.browser.get_current_url()
+            terminated = self._check_terminated(current_url)
+            truncated = self._check_truncated(now)
             
             # Update timing
-            self.last_action_time = current_time
+            self.last_action_time = step_start_time
             
             # Prepare info
             info = {
                 "episode_step": self.current_step,
-                "episode_time": current_time - self.episode_start_time,
+                "episode_time": now - self.episode_start_time,
                 "action_name": action_name,
                 "action_success": action_success,
-                "reward_components": self.reward_calculator.get_last_reward_breakdown(),
-                "current_url": self.browser.get_current_url(),
+                # A new breakdown dict is built each step and never mutated afterwards, so no copy is needed
+                "reward_components": self.reward_calculator.last_reward_breakdown,
             }
+            if self.config.include_url_in_info:
+                info["current_url"] = current_url
+            
+            if terminated or truncated:
+                self._add_episode_end_info(info)
+                # The application will not change before the next reset(), so its tab can load now
+                if self.config.preload_reset_tab:
+                    self.browser.open_spare_tabs(f"{self.config.base_url}/dashboard", 1)
             
             return observation, reward, terminated, truncated, info
             
@@ -306,6 +374,7 @@ class AsanaReplicaEnv(gym.Env):
                 "episode_step": self.current_step,
                 "action_name": action_name,
             }
+            self._add_episode_end_info(info)
             
             return observation, reward, True, False, info
     
@@ -319,19 +388,28 @@ class AsanaReplicaEnv(gym.Env):
         Returns:
             RGB array if mode is "rgb_array", None otherwise
         """
+        self._ensure_components()
         if mode == "rgb_array":
-            screenshot = self.browser.get_page_screenshot()
-            return screenshot
+            # Reuse the frame the last step already captured
+            if self._render_frame is None:
+                self._render_frame = self.browser.get_page_screenshot()
+            return self._render_frame
         elif mode == "human":
             # For human mode, we could open a window showing the browser
-            # For now, just take a screenshot and save it
-            screenshot = self.browser.get_page_screenshot()
-            if screenshot is not None and self.config.save_screenshots:
-                self.browser._save_debug_screenshot(screenshot)
+            # For now, just take a screenshot, which the browser saves when save_screenshots is on
+            if self.config.save_screenshots:
+                self.browser.get_page_screenshot()
             return None
         else:
             raise ValueError(f"Unsupported render mode: {mode}")
     
+    def _remember_render_frame(self, observation: Any) -> None:
+        """Keep the screenshot contained in an observation for render()."""
+        if self.config.observation_mode == "visual":
+            self._render_frame = observation
+        elif self.config.observation_mode == "hybrid":
+            self._render_frame = observation.get("visual")
+    
     def close(self) -> None:
         """Close the environment and clean up resources."""
         logger.info("Closing environment")
@@ -350,29 +428,30 @@ class AsanaReplicaEnv(gym.Env):
                 return False
             
             # Wait for login form
-            if not self.browser.wait_for_element('input[type="email"]', timeout=5.0):
+            if not self.browser.wait_for_element(_LOGIN_EMAIL_SELECTOR, timeout=5.0):
                 logger.error("Login form not found")
                 return False
             
             # Fill in credentials
-            email_success = self.browser.type_text('input[type="email"]', self.config.test_user_email)
-            password_success = self.browser.type_text('input[type="password"]', self.config.test_user_password)
+            email_success = self.browser.type_text(_LOGIN_EMAIL_SELECTOR, self.config.test_user_email)
+            password_success = self.browser.type_text(_LOGIN_PASSWORD_SELECTOR, self.config.test_user_password)
             
             if not (email_success and password_success):
                 logger.error("Failed to enter login credentials")
                 return False
             
             # Submit form
-            submit_success = self.browser.click_element('button[type="submit"]')
+            submit_success = self.browser.click_element(_LOGIN_SUBMIT_SELECTOR)
             if not submit_success:
                 logger.error("Failed to click login button")
                 return False
             
-            # Wait for redirect to dashboard
-            time.sleep(2.0)  # Give time for login to process
+            # Wait for the redirect away from the login page
+            if not self.browser.wait_for_url_change(login_url, timeout=5.0):
+                logger.debug("Still on login page after submitting credentials")
             
             # Check if we're logged in by looking for dashboard elements
-            if self.browser.wait_for_element('[data-testid="dashboard"]', timeout=10.0):
+            if self.browser.wait_for_element(_DASHBOARD_SELECTOR, timeout=10.0):
                 self.is_logged_in = True
                 logger.info("Login successful")
                 return True
@@ -384,12 +463,13 @@ class AsanaReplicaEnv(gym.Env):
             logger.error(f"Error during login: {e}")
             return False
     
-    def _check_terminated(self) -> bool:
-        """Check if the episode should be terminated."""
+    def _check_terminated(self, current_url: Optional[str] = None) -> bool:
+        """Check if the episode should be terminated, optionally using an already fetched URL."""
         # Episode terminates if we encounter a critical error
         # or if the browser becomes unresponsive
         try:
-            current_url = self.browser.get_current_url()
+            if current_url is None:
+                current_url = self.browser.get_current_url()
             if not current_url or "error" in current_url.lower():
                 return True
         except Exception:
@@ -397,57 +477,72 @@ class AsanaReplicaEnv(gym.Env):
         
         return False
     
-    def _check_truncated(self) -> bool:
-        """Check if the episode should be truncated."""
+    def _check_truncated(self, now: Optional[float] = None) -> bool:
+        """Check if the episode should be truncated, optionally at an already sampled monotonic time."""
         # Episode truncates if we exceed max steps or time limit
         if self.current_step >= self.config.max_episode_steps:
             return True
         
         # Optional: Add time-based truncation
-        episode_time = time.time() - self.episode_start_time
+        episode_time = (now if now is not None else time.monotonic()) - self.episode_start_time
         max_episode_time = self.config.max_episode_steps * 10.0  # 10 seconds per step max
         if episode_time > max_episode_time:
             return True
         
         return False
     
+    def _add_episode_end_info(self, info: Dict[str, Any]) -> None:
+        """Attach end-of-episode reward statistics to the step info.
+        
+        Vectorized callers cannot reach the reward calculator living in the
+        worker process, so the episode summary travels with the final info.
+        """
+        info["episode_bonus"] = self.reward_calculator.calculate_episode_bonus()
+        info["episode_statistics"] = self.reward_calculator.get_episode_statistics()
+    
+    def _build_default_observations(self) -> None:
+        """Pre-allocate the read-only zero observations returned on error paths."""
+        self._default_visual = np.zeros(self._visual_shape, dtype=np.uint8)
+        self._default_structured = {
+            "task_counts": np.zeros(3, dtype=np.int32),
+            "project_count": np.zeros(1, dtype=np.int32),
+            "current_view": 0,
+            "user_position": np.zeros(2, dtype=np.float32),
+            "page_elements": np.zeros(20, dtype=np.uint8),
+        }
+        
+        # Shared between calls, so make accidental in-place writes fail loudly
+        self._default_visual.setflags(write=False)
+        for value in self._default_structured.values():
+            if isinstance(value, np.ndarray):
+                value.setflags(write=False)
+    
     def _get_default_observation(self) -> Any:
         """Get a default observation when errors occur."""
+        # The arrays are shared and read-only; only the dicts around them are fresh
         if self.config.observation_mode == "visual":
             # Return black image
-            return np.zeros((self.config.screenshot_height, self.config.screenshot_width, 3), dtype=np.uint8)
+            return self._default_visual
         elif self.config.observation_mode == "structured":
             # Return zero values for all structured features
-            return {
-                "task_counts": np.zeros(3, dtype=np.int32),
-                "project_count": np.zeros(1, dtype=np.int32),
-                "current_view": 0,
-                "user_position": np.zeros(2, dtype=np.float32),
-                "page_elements": np.zeros(20, dtype=np.float32),
-            }
+            return dict(self._default_structured)
         else:  # hybrid
             return {
-                "visual": np.zeros((self.config.screenshot_height, self.config.screenshot_width, 3), dtype=np.uint8),
-                "structured": {
-                    "task_counts": np.zeros(3, dtype=np.int32),
-                    "project_count": np.zeros(1, dtype=np.int32),
-                    "current_view": 0,
-                    "user_position": np.zeros(2, dtype=np.float32),
-                    "page_elements": np.zeros(20, dtype=np.float32),
-                }
+                "visual": self._default_visual,
+                "structured": dict(self._default_structured),
             }
     
     def get_action_meanings(self) -> Dict[int, str]:
         """Get human-readable meanings for all actions."""
-        return self.action_mapping.copy()
+        return dict(self.action_mapping)
     
     def get_current_state_info(self) -> Dict[str, Any]:
         """Get detailed information about current environment state."""
         return {
             "current_step": self.current_step,
-            "episode_time": time.time() - self.episode_start_time if self.episode_start_time > 0 else 0,
+            "episode_time": time.monotonic() - self.episode_start_time if self.episode_start_time > 0 else 0,
             "is_logged_in": self.is_logged_in,
-            "current_url": self.browser.get_current_url() if self.browser.driver else None,
-            "browser_active": self.browser.driver is not None,
+            "current_url": self.browser.get_current_url() if self.browser and self.browser.driver else None,
+            "browser_active": self.browser is not None and self.browser.driver is not None,
             "current_project_id": self.current_project_id,
         }
\ No newline at end of file
@@ -0,0 +1,42 @@
+"""Logging helpers for long-running training loops."""
+
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from typing import Optional
+
+
+def start_queue_logging(log_file: Optional[str] = None) -> QueueListener:
+    """
+    Move the root logger's handlers behind a background queue listener.
+    
+    Logging calls on the step loop then only enqueue the record; formatting
+    and stream/file writes happen on the listener thread. Call this after any
+    worker processes have been started, since forked workers inherit the root
+    handlers but not the listener thread.
+    
+    Args:
+        log_file: Optional file that additionally receives every record
+    
+    Returns:
+        The started listener; call ``stop()`` on shutdown to flush it
+    """
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    for handler in handlers:
+        root.removeHandler(handler)
+    
+    if log_file:
+        Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+        file_handler = logging.FileHandler(log_file)
+        if handlers:
+            file_handler.setFormatter(handlers[0].formatter)
+        handlers.append(file_handler)
+    
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    root.addHandler(QueueHandler(log_queue))
+    
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
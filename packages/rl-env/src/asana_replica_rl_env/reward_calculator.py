@@ -2,26 +2,92 @@
 
 import logging
 import time
-from typing import Dict, Any, List, Optional, Union
+from collections import OrderedDict, deque
+from types import MappingProxyType
+from typing import Deque, Dict, Any, Optional, Tuple, Union
 import numpy as np
 
 from .config import RewardConfig
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of state transitions kept in the reward cache
+REWARD_CACHE_SIZE = 4096
+
+# Read-only defaults for observations missing structured features (shared, never written)
+_ZERO_TASK_COUNTS = np.zeros(3, dtype=np.int32)
+_ZERO_PROJECT_COUNT = np.zeros(1, dtype=np.int32)
+_ZERO_TASK_COUNTS.setflags(write=False)
+_ZERO_PROJECT_COUNT.setflags(write=False)
+
+# Base reward for successful actions; other actions get a small default positive reward
+_BASE_ACTION_REWARDS = MappingProxyType({
+    # High-value actions
+    "create_new_task": 0.5,
+    "create_new_project": 1.0,
+    "change_task_status_completed": 0.8,
+    "add_comment": 0.3,
+    
+    # Medium-value actions
+    "edit_task_name": 0.2,
+    "edit_task_description": 0.2,
+    "set_task_assignee": 0.3,
+    "set_task_due_date": 0.3,
+    "set_task_priority": 0.2,
+    
+    # Low-value actions
+    "navigate_to_project_list": 0.1,
+    "navigate_to_project_board": 0.1,
+    "scroll_up": 0.05,
+    "scroll_down": 0.05,
+    
+    # Neutral actions
+    "refresh_page": 0.0,
+})
+_DEFAULT_ACTION_REWARD = 0.1
+
+# Actions earning the project organization bonus
+_ORGANIZATION_ACTIONS = frozenset({
+    "edit_project", "change_project_color", "add_project_member",
+    "set_project_status", "archive_project",
+})
+
+# Actions counted towards the excessive navigation penalty
+_NAVIGATION_ACTIONS = frozenset({"scroll_up", "scroll_down", "refresh_page", "navigate_to_dashboard"})
+
+# Three-action workflows earning the efficiency bonus
+_EFFICIENT_SEQUENCES = frozenset({
+    ("create_new_task", "set_task_assignee", "set_task_due_date"),
+    ("create_new_project", "create_new_task", "set_task_assignee"),
+    ("open_task_detail", "edit_task_description", "add_comment"),
+})
+
 
 class RewardCalculator:
     """Calculates rewards for RL agent actions based on configurable scenarios."""
     
-    def __init__(self, reward_config: RewardConfig):
-        """Initialize reward calculator with configuration."""
+    def __init__(self, reward_config: RewardConfig, action_timeout: float = 10.0):
+        """
+        Initialize reward calculator with configuration.
+        
+        Args:
+            reward_config: Reward values and multipliers
+            action_timeout: Step time in seconds above which the timeout penalty applies
+                (the environment's action timeout)
+        """
         self.config = reward_config
+        self.action_timeout = action_timeout
         
         # Track state for reward calculation
-        self.previous_task_counts = np.zeros(3, dtype=np.int32)  # [todo, in_progress, completed]
+        # Task counts are kept as plain ints; numpy dispatch costs more than the math on three values
+        self.previous_task_counts: Tuple[int, ...] = (0, 0, 0)  # (todo, in_progress, completed)
         self.previous_project_count = 0
-        self.action_history: List[Dict[str, Any]] = []
-        self.episode_start_time = time.time()
+        self.action_history: Deque[Dict[str, Any]] = deque(maxlen=20)  # only recent actions are kept
+        self._last_three_actions: Tuple[str, ...] = ()  # names of the last three actions, oldest first
+        self._recent_navigation: Deque[bool] = deque(maxlen=5)  # whether each of the last five actions navigated
+        self._recent_navigation_count = 0
+        self.episode_start_time = time.monotonic()
+        self._deadline_time = self.episode_start_time + self.config.deadline_seconds
         self.last_reward_breakdown: Dict[str, float] = {}
         
         # Performance tracking
@@ -32,15 +98,36 @@ class RewardCalculator:
         self.invalid_actions_count = 0
         self.total_actions_count = 0
         
+        # Collaboration rewards depend on the config only, so build the table once
+        self._collaboration_rewards = {
+            "add_comment": self.config.comment_creation_reward,
+            "reply_to_comment": self.config.comment_creation_reward * 0.8,
+            "mention_user": self.config.team_interaction_bonus,
+            "add_project_member": self.config.team_interaction_bonus,
+            "set_task_assignee": self.config.team_interaction_bonus * 0.5,
+        }
+        
+        # Cache of transition-only reward components (kept across episodes)
+        self._reward_cache: "OrderedDict[Tuple[Any, ...], Tuple[Dict[str, float], Dict[str, int]]]" = OrderedDict()
+        self.reward_cache_hits = 0
+        self.reward_cache_misses = 0
+        
+        # Whether per-step debug logging is on (rechecked each episode)
+        self._debug = logger.isEnabledFor(logging.DEBUG)
+        
         logger.info("RewardCalculator initialized")
     
     def reset(self) -> None:
         """Reset reward calculator for new episode."""
-        self.previous_task_counts = np.zeros(3, dtype=np.int32)
+        self.previous_task_counts = (0, 0, 0)
         self.previous_project_count = 0
         self.action_history.clear()
-        self.episode_start_time = time.time()
-        self.last_reward_breakdown.clear()
+        self._last_three_actions = ()
+        self._recent_navigation.clear()
+        self._recent_navigation_count = 0
+        self.episode_start_time = time.monotonic()
+        self._deadline_time = self.episode_start_time + self.config.deadline_seconds
+        self.last_reward_breakdown = {}
         
         # Reset performance tracking
         self.tasks_completed_this_episode = 0
@@ -50,6 +137,7 @@ class RewardCalculator:
         self.invalid_actions_count = 0
         self.total_actions_count = 0
         
+        self._debug = logger.isEnabledFor(logging.DEBUG)
         logger.debug("RewardCalculator reset for new episode")
     
     def calculate_reward(
@@ -72,6 +160,7 @@ class RewardCalculator:
             Calculated reward value
         """
         self.total_actions_count += 1
+        now = time.monotonic()  # one clock read shared by the deadline check and the history entry
         
         # Initialize reward components
         reward_components = {
@@ -85,160 +174,145 @@ class RewardCalculator:
         }
         
         # Extract current state from observation
-        current_state = self._extract_state_from_observation(observation)
+        task_counts, project_count = self._extract_task_and_project(observation)
+        
+        # Calculate the action and state-transition rewards (cached)
+        state_rewards, state_changes = self._get_state_rewards(task_counts, project_count, action_name, action_success)
+        reward_components.update(state_rewards)
         
-        # Calculate base action reward/penalty
         if not action_success:
-            reward_components["penalty"] += self.config.invalid_action_penalty
             self.invalid_actions_count += 1
-        else:
-            reward_components["base_action"] += self._calculate_base_action_reward(action_name)
-        
-        # Calculate task-related rewards
-        task_rewards = self._calculate_task_rewards(current_state, action_name)
-        reward_components.update(task_rewards)
+        if action_name == "add_comment":
+            self.comments_added_this_episode += 1
+        self.tasks_created_this_episode += state_changes["tasks_created"]
+        self.projects_created_this_episode += state_changes["projects_created"]
         
-        # Calculate project-related rewards
-        project_rewards = self._calculate_project_rewards(current_state, action_name)
-        reward_components.update(project_rewards)
+        if state_changes["tasks_completed"] > 0:
+            self.tasks_completed_this_episode += state_changes["tasks_completed"]
+            
+            # Bonus for completing tasks quickly
+            if now < self._deadline_time:
+                reward_components["task_completion"] *= self.config.deadline_bonus_multiplier
         
         # Calculate efficiency bonuses
         efficiency_bonus = self._calculate_efficiency_bonus(action_name, step_time)
         reward_components["efficiency_bonus"] += efficiency_bonus
         
-        # Calculate collaboration rewards
-        collaboration_reward = self._calculate_collaboration_reward(action_name)
-        reward_components["collaboration"] += collaboration_reward
-        
         # Calculate time-based penalties
         time_penalty = self._calculate_time_penalty(step_time)
         reward_components["penalty"] += time_penalty
         
         # Update state tracking
-        self._update_state_tracking(current_state, action_name, action_success)
+        self._update_state_tracking(task_counts, project_count, action_name, action_success, now)
         
         # Calculate total reward
         total_reward = sum(reward_components.values())
         
-        # Store reward breakdown for debugging
-        self.last_reward_breakdown = reward_components.copy()
-        self.last_reward_breakdown["total"] = total_reward
+        if self._debug:
+            logger.debug("Reward for %s: %.3f (components: %s)", action_name, total_reward, reward_components)
         
-        logger.debug(f"Reward for {action_name}: {total_reward:.3f} (components: {reward_components})")
+        # Store reward breakdown for debugging (the components dict is fresh each step, so no copy)
+        reward_components["total"] = total_reward
+        self.last_reward_breakdown = reward_components
         
         return total_reward
     
-    def _extract_state_from_observation(self, observation: Union[np.ndarray, Dict[str, Any]]) -> Dict[str, Any]:
-        """Extract relevant state information from observation."""
-        if isinstance(observation, dict):
-            if "structured" in observation:
-                # Hybrid observation
-                structured = observation["structured"]
-                return {
-                    "task_counts": structured.get("task_counts", np.zeros(3, dtype=np.int32)),
-                    "project_count": structured.get("project_count", np.zeros(1, dtype=np.int32))[0],
-                    "current_view": structured.get("current_view", 0),
-                    "page_elements": structured.get("page_elements", np.zeros(20, dtype=np.float32)),
-                }
-            else:
-                # Pure structured observation
-                return {
-                    "task_counts": observation.get("task_counts", np.zeros(3, dtype=np.int32)),
-                    "project_count": observation.get("project_count", np.zeros(1, dtype=np.int32))[0],
-                    "current_view": observation.get("current_view", 0),
-                    "page_elements": observation.get("page_elements", np.zeros(20, dtype=np.float32)),
-                }
-        else:
-            # Visual observation - return default state
-            return {
-                "task_counts": np.zeros(3, dtype=np.int32),
-                "project_count": 0,
-                "current_view": 0,
-                "page_elements": np.zeros(20, dtype=np.float32),
-            }
-    
-    def _calculate_base_action_reward(self, action_name: str) -> float:
-        """Calculate base reward for successful actions."""
-        # Different actions have different base values
-        action_rewards = {
-            # High-value actions
-            "create_new_task": 0.5,
-            "create_new_project": 1.0,
-            "change_task_status_completed": 0.8,
-            "add_comment": 0.3,
-            
-            # Medium-value actions
-            "edit_task_name": 0.2,
-            "edit_task_description": 0.2,
-            "set_task_assignee": 0.3,
-            "set_task_due_date": 0.3,
-            "set_task_priority": 0.2,
-            
-            # Low-value actions
-            "navigate_to_project_list": 0.1,
-            "navigate_to_project_board": 0.1,
-            "scroll_up": 0.05,
-            "scroll_down": 0.05,
-            
-            # Neutral actions
-            "refresh_page": 0.0,
-        }
+    def _get_state_rewards(
+        self,
+        task_counts: Tuple[int, ...],
+        project_count: int,
+        action_name: str,
+        action_success: bool
+    ) -> Tuple[Dict[str, float], Dict[str, int]]:
+        """
+        Get the reward components that depend only on the action and state transition.
         
-        return action_rewards.get(action_name, 0.1)  # Default small positive reward
-    
-    def _calculate_task_rewards(self, current_state: Dict[str, Any], action_name: str) -> Dict[str, float]:
-        """Calculate task-related rewards."""
-        rewards = {"task_completion": 0.0, "task_creation": 0.0}
+        Results are cached on the previous/current task and project counts plus
+        the action, so repeated transitions skip the reward math. Time- and
+        history-dependent terms are not part of this and are computed per step.
         
-        current_task_counts = current_state["task_counts"]
+        Returns:
+            Tuple of reward components and task/project count changes
+        """
+        key = (
+            self.previous_task_counts,
+            self.previous_project_count,
+            task_counts,
+            project_count,
+            action_name,
+            action_success,
+        )
         
-        # Check for task completion (increase in completed tasks)
-        completed_diff = current_task_counts[2] - self.previous_task_counts[2]
-        if completed_diff > 0:
-            rewards["task_completion"] = completed_diff * self.config.task_completion_reward
-            self.tasks_completed_this_episode += completed_diff
-            
-            # Bonus for completing tasks quickly
-            episode_time = time.time() - self.episode_start_time
-            if episode_time < 300:  # 5 minutes
-                rewards["task_completion"] *= self.config.deadline_bonus_multiplier
+        cached = self._reward_cache.get(key)
+        if cached is not None:
+            self.reward_cache_hits += 1
+            self._reward_cache.move_to_end(key)
+            return cached
         
-        # Check for task creation (increase in total tasks)
-        total_current = np.sum(current_task_counts)
-        total_previous = np.sum(self.previous_task_counts)
-        tasks_created = total_current - total_previous
+        self.reward_cache_misses += 1
+        result = self._calculate_state_rewards(task_counts, project_count, action_name, action_success)
+        self._reward_cache[key] = result
+        if len(self._reward_cache) > REWARD_CACHE_SIZE:
+            self._reward_cache.popitem(last=False)
         
-        if tasks_created > 0:
-            rewards["task_creation"] = tasks_created * self.config.task_creation_reward
-            self.tasks_created_this_episode += tasks_created
+        return result
+    
+    def _calculate_state_rewards(
+        self,
+        task_counts: Tuple[int, ...],
+        project_count: int,
+        action_name: str,
+        action_success: bool
+    ) -> Tuple[Dict[str, float], Dict[str, int]]:
+        """Calculate action and state-transition rewards without touching episode counters."""
+        config = self.config
+        previous_task_counts = self.previous_task_counts
+        tasks_completed = max(0, task_counts[2] - previous_task_counts[2])
+        tasks_created = max(0, sum(task_counts) - sum(previous_task_counts))
+        projects_created = max(0, project_count - self.previous_project_count)
+        state_changes = {
+            "tasks_completed": tasks_completed,
+            "tasks_created": tasks_created,
+            "projects_created": projects_created,
+        }
+        
+        # Calculate base action reward/penalty
+        rewards = {"base_action": 0.0, "penalty": 0.0}
+        if not action_success:
+            rewards["penalty"] = config.invalid_action_penalty
+        else:
+            # Different actions have different base values
+            rewards["base_action"] = _BASE_ACTION_REWARDS.get(action_name, _DEFAULT_ACTION_REWARD)
+        
+        # Reward task completion (increase in completed tasks) and creation (increase in total tasks)
+        rewards["task_completion"] = tasks_completed * config.task_completion_reward if tasks_completed > 0 else 0.0
+        task_creation = tasks_created * config.task_creation_reward if tasks_created > 0 else 0.0
         
         # Bonus for task assignment actions
         if action_name == "set_task_assignee":
-            rewards["task_creation"] += self.config.task_assignment_reward
+            task_creation += config.task_assignment_reward
+        rewards["task_creation"] = task_creation
+        
+        # Reward project creation, plus a bonus for project organization actions
+        project_management = projects_created * config.project_creation_reward if projects_created > 0 else 0.0
+        if action_name in _ORGANIZATION_ACTIONS:
+            project_management += config.project_organization_reward
+        rewards["project_management"] = project_management
+        
+        rewards["collaboration"] = self._collaboration_rewards.get(action_name, 0.0)
         
-        return rewards
+        return rewards, state_changes
     
-    def _calculate_project_rewards(self, current_state: Dict[str, Any], action_name: str) -> Dict[str, float]:
-        """Calculate project-related rewards."""
-        rewards = {"project_management": 0.0}
-        
-        current_project_count = current_state["project_count"]
-        
-        # Check for project creation
-        projects_created = current_project_count - self.previous_project_count
-        if projects_created > 0:
-            rewards["project_management"] = projects_created * self.config.project_creation_reward
-            self.projects_created_this_episode += projects_created
-        
-        # Bonus for project organization actions
-        organization_actions = [
-            "edit_project", "change_project_color", "add_project_member",
-            "set_project_status", "archive_project"
-        ]
-        if action_name in organization_actions:
-            rewards["project_management"] += self.config.project_organization_reward
-        
-        return rewards
+    def _extract_task_and_project(self, observation: Union[np.ndarray, Dict[str, Any]]) -> Tuple[Tuple[int, ...], int]:
+        """Extract the task counts and project count the rewards depend on from an observation."""
+        if isinstance(observation, dict):
+            # Hybrid observations nest the structured features
+            structured = observation.get("structured", observation)
+            task_counts = tuple(np.asarray(structured.get("task_counts", _ZERO_TASK_COUNTS)).tolist())
+            return task_counts, int(structured.get("project_count", _ZERO_PROJECT_COUNT)[0])
+        
+        # Visual observation - return default state
+        return (0, 0, 0), 0
     
     def _calculate_efficiency_bonus(self, action_name: str, step_time: float) -> float:
         """Calculate efficiency-based bonuses."""
@@ -248,77 +322,57 @@ class RewardCalculator:
         if step_time < 2.0:  # Action completed in under 2 seconds
             bonus += self.config.quick_action_bonus
         
-        # Workflow efficiency bonus
-        if len(self.action_history) >= 3:
-            recent_actions = [entry["action_name"] for entry in self.action_history[-3:]]
-            
-            # Bonus for efficient workflows
-            efficient_sequences = [
-                ["create_new_task", "set_task_assignee", "set_task_due_date"],
-                ["create_new_project", "create_new_task", "set_task_assignee"],
-                ["open_task_detail", "edit_task_description", "add_comment"],
-            ]
-            
-            for sequence in efficient_sequences:
-                if recent_actions == sequence:
-                    bonus += self.config.workflow_efficiency_multiplier
-                    break
+        # Workflow efficiency bonus for the last three actions
+        if self._last_three_actions in _EFFICIENT_SEQUENCES:
+            bonus += self.config.workflow_efficiency_multiplier
         
         return bonus
     
-    def _calculate_collaboration_reward(self, action_name: str) -> float:
-        """Calculate collaboration-related rewards."""
-        collaboration_actions = {
-            "add_comment": self.config.comment_creation_reward,
-            "reply_to_comment": self.config.comment_creation_reward * 0.8,
-            "mention_user": self.config.team_interaction_bonus,
-            "add_project_member": self.config.team_interaction_bonus,
-            "set_task_assignee": self.config.team_interaction_bonus * 0.5,
-        }
-        
-        reward = collaboration_actions.get(action_name, 0.0)
-        
-        if action_name == "add_comment":
-            self.comments_added_this_episode += 1
-        
-        return reward
-    
     def _calculate_time_penalty(self, step_time: float) -> float:
         """Calculate time-based penalties."""
         penalty = 0.0
         
         # Timeout penalty
-        if step_time > self.config.action_timeout:
+        if step_time > self.action_timeout:
             penalty += self.config.timeout_penalty
         
         # Navigation penalty for excessive scrolling/navigation
-        navigation_actions = ["scroll_up", "scroll_down", "refresh_page", "navigate_to_dashboard"]
-        recent_navigation = sum(1 for entry in self.action_history[-5:] 
-                              if entry["action_name"] in navigation_actions)
+        recent_navigation = self._recent_navigation_count
         
         if recent_navigation > 3:  # More than 3 navigation actions in last 5 steps
             penalty += self.config.navigation_penalty * (recent_navigation - 3)
         
         return penalty
     
-    def _update_state_tracking(self, current_state: Dict[str, Any], action_name: str, action_success: bool) -> None:
-        """Update internal state tracking."""
+    def _update_state_tracking(
+        self,
+        task_counts: Tuple[int, ...],
+        project_count: int,
+        action_name: str,
+        action_success: bool,
+        timestamp: float
+    ) -> None:
+        """Update internal state tracking, recording the action at the given monotonic time."""
         # Update previous state
-        self.previous_task_counts = current_state["task_counts"].copy()
-        self.previous_project_count = current_state["project_count"]
+        self.previous_task_counts = task_counts
+        self.previous_project_count = project_count
         
         # Add to action history
         action_entry = {
             "action_name": action_name,
             "success": action_success,
-            "timestamp": time.time(),
+            "timestamp": timestamp,
             "step_number": self.total_actions_count,
         }
-        self.action_history.append(action_entry)
-        
-        # Keep only recent history (last 20 actions)
-        if len(self.action_history) > 20:
-            self.action_history = self.action_history[-20:]
+        self.action_history.append(action_entry)  # the deque drops entries beyond the last 20
+        self._last_three_actions = self._last_three_actions[-2:] + (action_name,)
+        
+        # Slide the five-action navigation window, keeping its count up to date
+        is_navigation = action_name in _NAVIGATION_ACTIONS
+        if len(self._recent_navigation) == self._recent_navigation.maxlen:
+            self._recent_navigation_count -= self._recent_navigation[0]
+        self._recent_navigation.append(is_navigation)
+        self._recent_navigation_count += is_navigation
     
     def get_last_reward_breakdown(self) -> Dict[str, float]:
         """Get detailed breakdown of the last calculated reward."""
@@ -326,7 +380,7 @@ class RewardCalculator:
     
     def get_episode_statistics(self) -> Dict[str, Any]:
         """Get statistics for the current episode."""
-        episode_time = time.time() - self.episode_start_time
+        episode_time = time.monotonic() - self.episode_start_time
         success_rate = (self.total_actions_count - self.invalid_actions_count) / max(1, self.total_actions_count)
         
         return {
@@ -338,7 +392,10 @@ class RewardCalculator:
             "tasks_created": self.tasks_created_this_episode,
             "projects_created": self.projects_created_this_episode,
             "comments_added": self.comments_added_this_episode,
-            "actions_per_minute": self.total_actions_count / max(1, episode_time / 60),
+            # Episodes shorter than a minute count as one minute
+            "actions_per_minute": self.total_actions_count * 60.0 / max(60.0, episode_time),
+            "reward_cache_hits": self.reward_cache_hits,
+            "reward_cache_misses": self.reward_cache_misses,
         }
     
     def calculate_episode_bonus(self) -> float:
@@ -371,19 +428,25 @@ class RewardScenarioManager:
     
     def __init__(self):
         """Initialize scenario manager."""
-        self.scenarios = {
-            "efficiency-training": self._create_efficiency_scenario(),
-            "collaboration": self._create_collaboration_scenario(),
-            "project-creation": self._create_project_creation_scenario(),
+        # Scenario configs are built on first request, so unused scenarios cost nothing
+        self._scenario_factories = {
+            "efficiency-training": self._create_efficiency_scenario,
+            "collaboration": self._create_collaboration_scenario,
+            "project-creation": self._create_project_creation_scenario,
         }
+        self.scenarios: Dict[str, RewardConfig] = {}
     
     def get_scenario_config(self, scenario_name: str) -> RewardConfig:
-        """Get reward configuration for a specific scenario."""
-        if scenario_name in self.scenarios:
-            return self.scenarios[scenario_name]
-        else:
-            logger.warning(f"Unknown scenario: {scenario_name}, using default")
-            return RewardConfig()
+        """Get reward configuration for a specific scenario, as a copy the caller may modify."""
+        config = self.scenarios.get(scenario_name)
+        if config is None:
+            factory = self._scenario_factories.get(scenario_name)
+            if factory is None:
+                logger.warning(f"Unknown scenario: {scenario_name}, using default")
+                return RewardConfig()
+            config = self.scenarios[scenario_name] = factory()
+        
+        return config.model_copy()
     
     def _create_efficiency_scenario(self) -> RewardConfig:
         """Create reward configuration focused on efficiency and speed."""
@@ -418,4 +481,13 @@ class RewardScenarioManager:
             task_completion_reward=6.0,  # Lower completion reward
             workflow_efficiency_multiplier=1.5,
             invalid_action_penalty=-1.5,
-        )
\ No newline at end of file
+        )
+
+
+# Shared manager behind get_scenario_config
+_scenario_manager = RewardScenarioManager()
+
+
+def get_scenario_config(scenario_name: str) -> RewardConfig:
+    """Get reward configuration for a scenario."""
+    return _scenario_manager.get_scenario_config(scenario_name)
@@ -1,8 +1,10 @@
 """State observation system for extracting environment state."""
 
+import json
 import logging
 import re
-from typing import Dict, Any, List, Optional, Union
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional, Tuple, Union
 import numpy as np
 from selenium.webdriver.common.by import By
 
@@ -11,6 +13,149 @@ from .config import EnvironmentConfig
 
 logger = logging.getLogger(__name__)
 
+# Body of the page function that counts the matches of every state selector and reads the
+# scroll metrics and page status; it is preceded by "const selectors = [[key, css], ...];" and
+# "const taskCards = {key, selector, statuses: [[status, key], ...]};"
+_STATE_SNAPSHOT_BODY = """
+const counts = {};
+for (const [key, selector] of selectors) {
+    counts[key] = document.querySelectorAll(selector).length;
+}
+
+// Task cards are walked once and tallied by status, instead of one query per status
+const cards = document.querySelectorAll(taskCards.selector);
+const statusKeys = new Map(taskCards.statuses);
+counts[taskCards.key] = cards.length;
+for (const key of statusKeys.values()) {
+    counts[key] = 0;
+}
+for (const card of cards) {
+    const key = statusKeys.get(card.getAttribute("data-status"));
+    if (key !== undefined) {
+        counts[key] += 1;
+    }
+}
+return {
+    counts: counts,
+    scroll: [window.pageXOffset, window.pageYOffset, document.body.scrollWidth, document.body.scrollHeight],
+    title: document.title,
+    ready_state: document.readyState,
+};
+"""
+
+# The snapshot function is installed on the page once and then called by name, so each step
+# sends a short script; a page load drops it, and the call script then returns null
+_STATE_SNAPSHOT_FUNCTION = "window.__asanaRlStateSnapshot"
+_CALL_STATE_SNAPSHOT_SCRIPT = (
+    f"return typeof {_STATE_SNAPSHOT_FUNCTION} === 'function' ? {_STATE_SNAPSHOT_FUNCTION}() : null;"
+)
+
+# Task card data-status values and the state selector keys counting them; these keys are
+# tallied from the "all_tasks" cards rather than queried one by one
+_TASK_STATUS_KEYS = (
+    ("todo", "todo_tasks"),
+    ("in_progress", "in_progress_tasks"),
+    ("completed", "completed_tasks"),
+)
+
+# Generic error and loading indicators, counted in the snapshot alongside the state selectors
+_STATUS_SELECTORS = {
+    "_error_class": ".error",
+    "_alert_role": '[role="alert"]',
+    "_loading_class": ".loading",
+    "_spinner_class": ".spinner",
+}
+_ERROR_KEYS = ("error_message", "_error_class", "_alert_role")
+_LOADING_KEYS = ("loading_spinner", "_loading_class", "_spinner_class")
+
+# Selectors for extracting state information, by state key
+_STATE_SELECTORS: Mapping[str, str] = MappingProxyType({
+    # Task counting
+    "todo_tasks": '[data-testid="task-card"][data-status="todo"]',
+    "in_progress_tasks": '[data-testid="task-card"][data-status="in_progress"]',
+    "completed_tasks": '[data-testid="task-card"][data-status="completed"]',
+    "all_tasks": '[data-testid="task-card"]',
+    
+    # Project counting
+    "project_cards": '[data-testid="project-card"]',
+    
+    # View detection
+    "list_view_active": '[data-testid="view-list"].active',
+    "board_view_active": '[data-testid="view-board"].active',
+    "timeline_view_active": '[data-testid="view-timeline"].active',
+    "calendar_view_active": '[data-testid="view-calendar"].active',
+    "dashboard_view": '[data-testid="dashboard"]',
+    
+    # UI elements visibility
+    "create_task_btn": '[data-testid="create-task-btn"]',
+    "create_project_btn": '[data-testid="create-project-btn"]',
+    "search_input": '[data-testid="search-input"]',
+    "filter_buttons": '[data-testid^="filter-"]',
+    "task_detail_modal": '[data-testid="task-detail-modal"]',
+    "project_settings": '[data-testid="project-settings"]',
+    "user_menu": '[data-testid="user-menu"]',
+    "workspace_selector": '[data-testid="workspace-selector"]',
+    "notification_bell": '[data-testid="notification-bell"]',
+    "sidebar": '[data-testid="sidebar"]',
+    
+    # Content indicators
+    "loading_spinner": '[data-testid="loading"]',
+    "error_message": '[data-testid="error"]',
+    "empty_state": '[data-testid="empty-state"]',
+    "success_message": '[data-testid="success"]',
+})
+
+
+def _build_install_state_script(state_selectors: Mapping[str, str]) -> str:
+    """Build the script that installs the snapshot function for the given selectors and calls it."""
+    task_card_keys = {"all_tasks"} | {key for _, key in _TASK_STATUS_KEYS}
+    snapshot_selectors = [
+        (key, selector) for key, selector in state_selectors.items() if key not in task_card_keys
+    ] + list(_STATUS_SELECTORS.items())
+    task_cards = {"key": "all_tasks", "selector": state_selectors["all_tasks"], "statuses": _TASK_STATUS_KEYS}
+    selectors_json = json.dumps(snapshot_selectors, separators=(",", ":"))
+    task_cards_json = json.dumps(task_cards, separators=(",", ":"))
+    return (
+        f"{_STATE_SNAPSHOT_FUNCTION} = function () {{\nconst selectors = {selectors_json};\n"
+        f"const taskCards = {task_cards_json};\n{_STATE_SNAPSHOT_BODY}}};\nreturn {_STATE_SNAPSHOT_FUNCTION}();"
+    )
+
+
+# Built once at import: the selectors never change, so every observer sends the same script
+_INSTALL_STATE_SNAPSHOT_SCRIPT = _build_install_state_script(_STATE_SELECTORS)
+
+# Returns the listed attributes (arguments[1]) of every element matching a selector (arguments[0])
+_ELEMENT_ATTRIBUTES_SCRIPT = """
+const names = arguments[1];
+return Array.from(document.querySelectorAll(arguments[0]), (el) => names.map((name) => el.getAttribute(name)));
+"""
+
+# Card attributes read by extract_task_details and extract_project_details, in result order
+_TASK_ATTRIBUTES = ("data-task-name", "data-status", "data-priority", "data-assignee", "data-due-date")
+_PROJECT_ATTRIBUTES = ("data-project-name", "data-status", "data-color", "data-task-count")
+
+# State selector keys reported by the page element flags, followed by the filter buttons
+_VISIBILITY_KEYS = (
+    "create_task_btn",
+    "create_project_btn",
+    "search_input",
+    "task_detail_modal",
+    "project_settings",
+    "user_menu",
+    "workspace_selector",
+    "notification_bell",
+    "sidebar",
+    "loading_spinner",
+    "error_message",
+    "empty_state",
+    "success_message",
+)
+_MAX_FILTER_FLAGS = 7
+_PAGE_ELEMENT_FLAGS = 20
+
+# Snapshot used when the page could not be queried
+_EMPTY_STATE_SNAPSHOT: Dict[str, Any] = {"counts": {}, "scroll": [0, 0, 1, 1], "title": "", "ready_state": None}
+
 
 class StateObserver:
     """Observes and extracts state information from the Asana replica application."""
@@ -20,42 +165,40 @@ class StateObserver:
         self.browser = browser
         self.config = config
         
-        # Selectors for extracting state information
-        self.state_selectors = {
-            # Task counting
-            "todo_tasks": '[data-testid="task-card"][data-status="todo"]',
-            "in_progress_tasks": '[data-testid="task-card"][data-status="in_progress"]',
-            "completed_tasks": '[data-testid="task-card"][data-status="completed"]',
-            "all_tasks": '[data-testid="task-card"]',
-            
-            # Project counting
-            "project_cards": '[data-testid="project-card"]',
-            
-            # View detection
-            "list_view_active": '[data-testid="view-list"].active',
-            "board_view_active": '[data-testid="view-board"].active',
-            "timeline_view_active": '[data-testid="view-timeline"].active',
-            "calendar_view_active": '[data-testid="view-calendar"].active',
-            "dashboard_view": '[data-testid="dashboard"]',
-            
-            # UI elements visibility
-            "create_task_btn": '[data-testid="create-task-btn"]',
-            "create_project_btn": '[data-testid="create-project-btn"]',
-            "search_input": '[data-testid="search-input"]',
-            "filter_buttons": '[data-testid^="filter-"]',
-            "task_detail_modal": '[data-testid="task-detail-modal"]',
-            "project_settings": '[data-testid="project-settings"]',
-            "user_menu": '[data-testid="user-menu"]',
-            "workspace_selector": '[data-testid="workspace-selector"]',
-            "notification_bell": '[data-testid="notification-bell"]',
-            "sidebar": '[data-testid="sidebar"]',
-            
-            # Content indicators
-            "loading_spinner": '[data-testid="loading"]',
-            "error_message": '[data-testid="error"]',
-            "empty_state": '[data-testid="empty-state"]',
-            "success_message": '[data-testid="success"]',
+        # Read-only black frame returned whenever no screenshot is available
+        self._blank_screenshot = np.zeros((config.screenshot_height, config.screenshot_width, 3), dtype=np.uint8)
+        self._blank_screenshot.setflags(write=False)
+        
+        # Read-only zero features shared by the default observations
+        self._default_structured = {
+            "task_counts": np.zeros(3, dtype=np.int32),
+            "project_count": np.zeros(1, dtype=np.int32),
+            "current_view": 0,
+            "user_position": np.zeros(2, dtype=np.float32),
+            "page_elements": np.zeros(20, dtype=np.uint8),
         }
+        for value in self._default_structured.values():
+            if isinstance(value, np.ndarray):
+                value.setflags(write=False)
+        
+        # Selectors for extracting state information (shared, read-only)
+        self.state_selectors = _STATE_SELECTORS
+        
+        # Script installing the snapshot function (with the selectors embedded) and calling it
+        self._install_state_script = _INSTALL_STATE_SNAPSHOT_SCRIPT
+        
+        # Page state snapshot, reused until invalidate() is called
+        self._state_epoch = 0
+        self._snapshot_epoch = -1
+        self._state_snapshot: Optional[Dict[str, Any]] = None
+        
+        # Observation builder for the configured mode, chosen once instead of on every step
+        if config.observation_mode == "visual":
+            self._observe = self._get_visual_observation
+        elif config.observation_mode == "structured":
+            self._observe = self._get_structured_observation
+        else:  # hybrid
+            self._observe = self._get_hybrid_observation
     
     def get_observation(self) -> Union[np.ndarray, Dict[str, Any]]:
         """
@@ -65,12 +208,7 @@ class StateObserver:
             Observation in the format specified by observation_mode
         """
         try:
-            if self.config.observation_mode == "visual":
-                return self._get_visual_observation()
-            elif self.config.observation_mode == "structured":
-                return self._get_structured_observation()
-            else:  # hybrid
-                return self._get_hybrid_observation()
+            return self._observe()
                 
         except Exception as e:
             logger.error(f"Error getting observation: {e}")
@@ -83,31 +221,64 @@ class StateObserver:
             return screenshot
         else:
             # Return black image as fallback
-            return np.zeros((self.config.screenshot_height, self.config.screenshot_width, 3), dtype=np.uint8)
+            return self._blank_screenshot
     
     def _get_structured_observation(self) -> Dict[str, Any]:
         """Get structured observation (DOM-based features)."""
+        snapshot = self._get_state_snapshot()
+        counts = snapshot["counts"]
         return {
-            "task_counts": self._get_task_counts(),
-            "project_count": self._get_project_count(),
-            "current_view": self._get_current_view(),
-            "user_position": self._get_user_position(),
-            "page_elements": self._get_page_elements_visibility(),
+            "task_counts": self._get_task_counts(counts),
+            "project_count": self._get_project_count(counts),
+            "current_view": self._get_current_view(counts),
+            "user_position": self._get_user_position(snapshot["scroll"]),
+            "page_elements": self._get_page_elements_visibility(counts),
         }
     
+    def invalidate(self) -> None:
+        """Mark the page state as changed, so the next observation queries the browser again."""
+        self._state_epoch += 1
+    
+    def _get_state_snapshot(self) -> Dict[str, Any]:
+        """
+        Query the page for all state selectors in a single browser round-trip.
+        
+        The snapshot is cached until invalidate() is called, so observation and
+        state-info calls made for the same page state share one query.
+        
+        Returns:
+            Dict with "counts" (matches per state selector key), "scroll"
+            ([scroll_x, scroll_y, page_width, page_height]), "title" and "ready_state"
+        """
+        if self._snapshot_epoch == self._state_epoch:
+            return self._state_snapshot
+        
+        snapshot = self.browser.execute_javascript(_CALL_STATE_SNAPSHOT_SCRIPT)
+        if not isinstance(snapshot, dict):
+            # First query since the page loaded: install the function, which also takes the snapshot
+            snapshot = self.browser.execute_javascript(self._install_state_script)
+        if not isinstance(snapshot, dict):
+            # Not cached, so the next call retries the query
+            return _EMPTY_STATE_SNAPSHOT
+        
+        self._state_snapshot = snapshot
+        self._snapshot_epoch = self._state_epoch
+        return snapshot
+    
     def _get_hybrid_observation(self) -> Dict[str, Any]:
         """Get hybrid observation (visual + structured)."""
+        # One command after the other: a WebDriver session must not be driven from two threads
         return {
             "visual": self._get_visual_observation(),
             "structured": self._get_structured_observation(),
         }
     
-    def _get_task_counts(self) -> np.ndarray:
+    def _get_task_counts(self, counts: Dict[str, int]) -> np.ndarray:
         """Get counts of tasks by status."""
         try:
-            todo_count = len(self.browser.find_elements(self.state_selectors["todo_tasks"]))
-            in_progress_count = len(self.browser.find_elements(self.state_selectors["in_progress_tasks"]))
-            completed_count = len(self.browser.find_elements(self.state_selectors["completed_tasks"]))
+            todo_count = counts.get("todo_tasks", 0)
+            in_progress_count = counts.get("in_progress_tasks", 0)
+            completed_count = counts.get("completed_tasks", 0)
             
             return np.array([todo_count, in_progress_count, completed_count], dtype=np.int32)
             
@@ -115,29 +286,29 @@ class StateObserver:
             logger.error(f"Error getting task counts: {e}")
             return np.zeros(3, dtype=np.int32)
     
-    def _get_project_count(self) -> np.ndarray:
+    def _get_project_count(self, counts: Dict[str, int]) -> np.ndarray:
         """Get count of projects."""
         try:
-            project_count = len(self.browser.find_elements(self.state_selectors["project_cards"]))
+            project_count = counts.get("project_cards", 0)
             return np.array([project_count], dtype=np.int32)
             
         except Exception as e:
             logger.error(f"Error getting project count: {e}")
             return np.zeros(1, dtype=np.int32)
     
-    def _get_current_view(self) -> int:
+    def _get_current_view(self, counts: Dict[str, int]) -> int:
         """Get current view mode as integer."""
         try:
             # Check which view is active
-            if self.browser.is_element_present(self.state_selectors["dashboard_view"]):
+            if counts.get("dashboard_view"):
                 return 0  # dashboard
-            elif self.browser.is_element_present(self.state_selectors["list_view_active"]):
+            elif counts.get("list_view_active"):
                 return 1  # list
-            elif self.browser.is_element_present(self.state_selectors["board_view_active"]):
+            elif counts.get("board_view_active"):
                 return 2  # board
-            elif self.browser.is_element_present(self.state_selectors["timeline_view_active"]):
+            elif counts.get("timeline_view_active"):
                 return 3  # timeline
-            elif self.browser.is_element_present(self.state_selectors["calendar_view_active"]):
+            elif counts.get("calendar_view_active"):
                 return 4  # calendar
             else:
                 return 0  # default to dashboard
@@ -146,16 +317,14 @@ class StateObserver:
             logger.error(f"Error getting current view: {e}")
             return 0
     
-    def _get_user_position(self) -> np.ndarray:
+    def _get_user_position(self, scroll: List[float]) -> np.ndarray:
         """Get normalized user position on page (scroll position)."""
         try:
-            # Get scroll position
-            scroll_x = self.browser.execute_javascript("return window.pageXOffset;") or 0
-            scroll_y = self.browser.execute_javascript("return window.pageYOffset;") or 0
-            
-            # Get page dimensions
-            page_width = self.browser.execute_javascript("return document.body.scrollWidth;") or 1
-            page_height = self.browser.execute_javascript("return document.body.scrollHeight;") or 1
+            # Scroll position and page dimensions
+            scroll_x = scroll[0] or 0
+            scroll_y = scroll[1] or 0
+            page_width = scroll[2] or 1
+            page_height = scroll[3] or 1
             
             # Normalize to [0, 1]
             normalized_x = min(1.0, max(0.0, scroll_x / page_width))
@@ -167,102 +336,56 @@ class StateObserver:
             logger.error(f"Error getting user position: {e}")
             return np.zeros(2, dtype=np.float32)
     
-    def _get_page_elements_visibility(self) -> np.ndarray:
+    def _get_page_elements_visibility(self, counts: Dict[str, int]) -> np.ndarray:
         """Get visibility flags for important page elements."""
         try:
-            # Define elements to check (20 elements total)
-            elements_to_check = [
-                "create_task_btn",
-                "create_project_btn", 
-                "search_input",
-                "task_detail_modal",
-                "project_settings",
-                "user_menu",
-                "workspace_selector",
-                "notification_bell",
-                "sidebar",
-                "loading_spinner",
-                "error_message",
-                "empty_state",
-                "success_message",
-            ]
-            
-            # Add filter buttons (up to 7 more elements)
-            filter_elements = self.browser.find_elements(self.state_selectors["filter_buttons"])
-            for i, _ in enumerate(filter_elements[:7]):
-                elements_to_check.append(f"filter_button_{i}")
+            # Fixed elements first, then one flag per filter button (up to 7), zero-padded to 20
+            visibility_flags = np.zeros(_PAGE_ELEMENT_FLAGS, dtype=np.uint8)
+            for i, element_key in enumerate(_VISIBILITY_KEYS):
+                if counts.get(element_key):
+                    visibility_flags[i] = 1
             
-            # Pad to exactly 20 elements
-            while len(elements_to_check) < 20:
-                elements_to_check.append("placeholder")
+            filter_count = min(counts.get("filter_buttons", 0), _MAX_FILTER_FLAGS)
+            visibility_flags[len(_VISIBILITY_KEYS):len(_VISIBILITY_KEYS) + filter_count] = 1
             
-            # Check visibility for each element
-            visibility_flags = []
-            for element_key in elements_to_check:
-                if element_key.startswith("filter_button_"):
-                    # Special handling for filter buttons
-                    idx = int(element_key.split("_")[-1])
-                    if idx < len(filter_elements):
-                        visibility_flags.append(1.0)
-                    else:
-                        visibility_flags.append(0.0)
-                elif element_key == "placeholder":
-                    visibility_flags.append(0.0)
-                else:
-                    selector = self.state_selectors.get(element_key)
-                    if selector and self.browser.is_element_present(selector):
-                        visibility_flags.append(1.0)
-                    else:
-                        visibility_flags.append(0.0)
-            
-            return np.array(visibility_flags[:20], dtype=np.float32)
+            return visibility_flags
             
         except Exception as e:
             logger.error(f"Error getting page elements visibility: {e}")
-            return np.zeros(20, dtype=np.float32)
+            return np.zeros(20, dtype=np.uint8)
     
     def _get_default_observation(self) -> Union[np.ndarray, Dict[str, Any]]:
         """Get default observation when errors occur."""
+        # The arrays are shared and read-only; only the dicts around them are fresh
         if self.config.observation_mode == "visual":
-            return np.zeros((self.config.screenshot_height, self.config.screenshot_width, 3), dtype=np.uint8)
+            return self._blank_screenshot
         elif self.config.observation_mode == "structured":
-            return {
-                "task_counts": np.zeros(3, dtype=np.int32),
-                "project_count": np.zeros(1, dtype=np.int32),
-                "current_view": 0,
-                "user_position": np.zeros(2, dtype=np.float32),
-                "page_elements": np.zeros(20, dtype=np.float32),
-            }
+            return dict(self._default_structured)
         else:  # hybrid
             return {
-                "visual": np.zeros((self.config.screenshot_height, self.config.screenshot_width, 3), dtype=np.uint8),
-                "structured": {
-                    "task_counts": np.zeros(3, dtype=np.int32),
-                    "project_count": np.zeros(1, dtype=np.int32),
-                    "current_view": 0,
-                    "user_position": np.zeros(2, dtype=np.float32),
-                    "page_elements": np.zeros(20, dtype=np.float32),
-                }
+                "visual": self._blank_screenshot,
+                "structured": dict(self._default_structured),
             }
     
     def get_detailed_state_info(self) -> Dict[str, Any]:
         """Get detailed state information for debugging and analysis."""
         try:
             current_url = self.browser.get_current_url()
-            page_title = self.browser.execute_javascript("return document.title;") or ""
+            snapshot = self._get_state_snapshot()
+            counts = snapshot["counts"]
             
             # Extract additional state information
             state_info = {
                 "url": current_url,
-                "page_title": page_title,
-                "task_counts": self._get_task_counts().tolist(),
-                "project_count": self._get_project_count().tolist(),
-                "current_view": self._get_current_view(),
-                "scroll_position": self._get_user_position().tolist(),
-                "visible_elements": self._get_visible_element_names(),
-                "page_load_state": self.browser.execute_javascript("return document.readyState;"),
-                "has_errors": self._check_for_errors(),
-                "is_loading": self._check_if_loading(),
+                "page_title": snapshot["title"] or "",
+                "task_counts": self._get_task_counts(counts).tolist(),
+                "project_count": self._get_project_count(counts).tolist(),
+                "current_view": self._get_current_view(counts),
+                "scroll_position": self._get_user_position(snapshot["scroll"]).tolist(),
+                "visible_elements": self._get_visible_element_names(counts),
+                "page_load_state": snapshot["ready_state"],
+                "has_errors": self._check_for_errors(counts),
+                "is_loading": self._check_if_loading(counts),
             }
             
             return state_info
@@ -271,70 +394,39 @@ class StateObserver:
             logger.error(f"Error getting detailed state info: {e}")
             return {"error": str(e)}
     
-    def _get_visible_element_names(self) -> List[str]:
+    def _get_visible_element_names(self, counts: Dict[str, int]) -> List[str]:
         """Get names of currently visible elements."""
-        visible_elements = []
-        
-        for element_name, selector in self.state_selectors.items():
-            if self.browser.is_element_present(selector):
-                visible_elements.append(element_name)
-        
-        return visible_elements
+        return [element_name for element_name in self.state_selectors if counts.get(element_name)]
     
-    def _check_for_errors(self) -> bool:
+    def _check_for_errors(self, counts: Dict[str, int]) -> bool:
         """Check if there are any error messages on the page."""
-        error_selectors = [
-            self.state_selectors["error_message"],
-            '[data-testid="error"]',
-            '.error',
-            '[role="alert"]',
-        ]
-        
-        for selector in error_selectors:
-            if self.browser.is_element_present(selector):
-                return True
-        
-        return False
+        return any(counts.get(key) for key in _ERROR_KEYS)
     
-    def _check_if_loading(self) -> bool:
+    def _check_if_loading(self, counts: Dict[str, int]) -> bool:
         """Check if the page is currently loading."""
-        loading_selectors = [
-            self.state_selectors["loading_spinner"],
-            '[data-testid="loading"]',
-            '.loading',
-            '.spinner',
-        ]
-        
-        for selector in loading_selectors:
-            if self.browser.is_element_present(selector):
-                return True
-        
-        return False
+        return any(counts.get(key) for key in _LOADING_KEYS)
+    
+    def _get_elements_attributes(self, selector: str, attributes: Tuple[str, ...]) -> List[List[Optional[str]]]:
+        """Read the given attributes of every element matching a selector in one browser round-trip."""
+        rows = self.browser.execute_javascript(_ELEMENT_ATTRIBUTES_SCRIPT, selector, list(attributes))
+        return rows if isinstance(rows, list) else []
     
     def extract_task_details(self) -> List[Dict[str, Any]]:
         """Extract detailed information about visible tasks."""
         try:
-            tasks = []
-            task_elements = self.browser.find_elements(self.state_selectors["all_tasks"])
-            
-            for i, task_element in enumerate(task_elements):
-                try:
-                    task_info = {
-                        "index": i,
-                        "name": self.browser.get_element_attribute(f'{self.state_selectors["all_tasks"]}:nth-child({i+1})', "data-task-name") or "",
-                        "status": self.browser.get_element_attribute(f'{self.state_selectors["all_tasks"]}:nth-child({i+1})', "data-status") or "",
-                        "priority": self.browser.get_element_attribute(f'{self.state_selectors["all_tasks"]}:nth-child({i+1})', "data-priority") or "",
-                        "assignee": self.browser.get_element_attribute(f'{self.state_selectors["all_tasks"]}:nth-child({i+1})', "data-assignee") or "",
-                        "due_date": self.browser.get_element_attribute(f'{self.state_selectors["all_tasks"]}:nth-child({i+1})', "data-due-date") or "",
-                        "is_visible": True,
-                    }
-                    tasks.append(task_info)
-                    
-                except Exception as e:
-                    logger.debug(f"Error extracting task {i} details: {e}")
-                    continue
-            
-            return tasks
+            rows = self._get_elements_attributes(self.state_selectors["all_tasks"], _TASK_ATTRIBUTES)
+            return [
+                {
+                    "index": i,
+                    "name": name or "",
+                    "status": status or "",
+                    "priority": priority or "",
+                    "assignee": assignee or "",
+                    "due_date": due_date or "",
+                    "is_visible": True,
+                }
+                for i, (name, status, priority, assignee, due_date) in enumerate(rows)
+            ]
             
         except Exception as e:
             logger.error(f"Error extracting task details: {e}")
@@ -343,27 +435,19 @@ class StateObserver:
     def extract_project_details(self) -> List[Dict[str, Any]]:
         """Extract detailed information about visible projects."""
         try:
-            projects = []
-            project_elements = self.browser.find_elements(self.state_selectors["project_cards"])
-            
-            for i, project_element in enumerate(project_elements):
-                try:
-                    project_info = {
-                        "index": i,
-                        "name": self.browser.get_element_attribute(f'{self.state_selectors["project_cards"]}:nth-child({i+1})', "data-project-name") or "",
-                        "status": self.browser.get_element_attribute(f'{self.state_selectors["project_cards"]}:nth-child({i+1})', "data-status") or "",
-                        "color": self.browser.get_element_attribute(f'{self.state_selectors["project_cards"]}:nth-child({i+1})', "data-color") or "",
-                        "task_count": self.browser.get_element_attribute(f'{self.state_selectors["project_cards"]}:nth-child({i+1})', "data-task-count") or "0",
-                        "is_visible": True,
-                    }
-                    projects.append(project_info)
-                    
-                except Exception as e:
-                    logger.debug(f"Error extracting project {i} details: {e}")
-                    continue
-            
-            return projects
+            rows = self._get_elements_attributes(self.state_selectors["project_cards"], _PROJECT_ATTRIBUTES)
+            return [
+                {
+                    "index": i,
+                    "name": name or "",
+                    "status": status or "",
+                    "color": color or "",
+                    "task_count": task_count or "0",
+                    "is_visible": True,
+                }
+                for i, (name, status, color, task_count) in enumerate(rows)
+            ]
             
         except Exception as e:
             logger.error(f"Error extracting project details: {e}")
-            return []
\ No newline at end of file
+            return []
@@ -0,0 +1,38 @@
+"""Streaming statistics helpers for training metrics."""
+
+import math
+
+
+class RunningStats:
+    """Running mean, standard deviation and extremes of a stream of values."""
+    
+    def __init__(self):
+        """Initialize empty statistics."""
+        self.count = 0
+        self.mean = 0.0
+        self.max = float('-inf')
+        self.min = float('inf')
+        self._m2 = 0.0
+    
+    def push(self, value: float) -> None:
+        """Add a value using Welford's online update."""
+        value = float(value)
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        
+        if value > self.max:
+            self.max = value
+        if value < self.min:
+            self.min = value
+    
+    @property
+    def variance(self) -> float:
+        """Population variance of the values seen so far."""
+        return self._m2 / self.count if self.count else 0.0
+    
+    @property
+    def std(self) -> float:
+        """Population standard deviation of the values seen so far."""
+        return math.sqrt(self.variance)
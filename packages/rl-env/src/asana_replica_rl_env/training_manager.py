@@ -2,9 +2,13 @@
 
 import logging
 import json
+import queue
+import random
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Union
+from typing import Callable, Dict, Any, List, Optional, Union
 import numpy as np
 
 from .config import EnvironmentConfig
@@ -12,6 +16,135 @@ from .reward_calculator import RewardCalculator
 
 logger = logging.getLogger(__name__)
 
+# Per-step numeric record kept in a preallocated array for each episode
+STEP_RECORD_DTYPE = np.dtype([("step", np.int32), ("action", np.int32), ("reward", np.float64)])
+
+# Number of most recent episodes kept for the running averages and trends
+_HISTORY_LENGTH = 100
+
+# Queued after the last record to stop the step logger's writer thread
+_STOP_LOGGING = object()
+
+
+def _json_default(value: Any) -> Any:
+    """Convert the numpy values the json module cannot encode (used as json.dumps' default hook)."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class AsyncStepLogger:
+    """Appends step records to a JSON Lines file from a background thread."""
+    
+    def __init__(self, log_file: Path, default: Callable[[Any], Any] = _json_default, batch_size: int = 128):
+        """
+        Initialize the step logger and start its writer thread.
+        
+        Args:
+            log_file: File the records are appended to
+            default: Converts values json cannot encode (passed to json.dumps)
+            batch_size: Maximum number of records written per file append
+        """
+        self.log_file = log_file
+        self.default = default
+        self.batch_size = batch_size
+        
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._drain, name="AsyncStepLogger", daemon=True)
+        self._thread.start()
+    
+    def log(self, record: Dict[str, Any]) -> None:
+        """Queue a record for writing without blocking."""
+        self._queue.put_nowait(record)
+    
+    def flush(self) -> None:
+        """Block until every queued record has been written."""
+        self._queue.join()
+    
+    def close(self) -> None:
+        """Write the records queued so far, then stop the writer thread and wait for it to exit."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP_LOGGING)
+            self._thread.join()
+    
+    def _drain(self) -> None:
+        """Write queued records in batches until the stop sentinel is reached."""
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size and batch[-1] is not _STOP_LOGGING:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            stopping = batch[-1] is _STOP_LOGGING
+            records = batch[:-1] if stopping else batch
+            try:
+                if records:
+                    lines = "".join(json.dumps(record, default=self.default) + "\n" for record in records)
+                    with open(self.log_file, 'a') as f:
+                        f.write(lines)
+            except Exception as e:
+                logger.error(f"Error writing step records: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            
+            if stopping:
+                return
+
+
+class RollingHistory:
+    """Keeps the most recent values of a per-episode statistic in a preallocated array."""
+    
+    def __init__(self, capacity: int = 100, dtype: Any = np.float64):
+        """
+        Initialize an empty history.
+        
+        Args:
+            capacity: Number of most recent values kept
+            dtype: Numpy dtype of the stored values
+        """
+        self.capacity = capacity
+        # Twice the capacity, so the kept values are always one contiguous slice and
+        # the buffer only has to be shifted back once every `capacity` appends
+        self._buffer = np.empty(2 * capacity, dtype=dtype)
+        self._start = 0
+        self._end = 0
+    
+    def __len__(self) -> int:
+        return self._end - self._start
+    
+    def append(self, value: Union[float, int]) -> None:
+        """Add a value, dropping the oldest one once the history is full."""
+        if self._end == len(self._buffer):
+            kept = self.capacity - 1
+            self._buffer[:kept] = self._buffer[self._end - kept:self._end]
+            self._start, self._end = 0, kept
+        
+        self._buffer[self._end] = value
+        self._end += 1
+        if self._end - self._start > self.capacity:
+            self._start += 1
+    
+    def extend(self, values: List[Union[float, int]]) -> None:
+        """Add several values in order."""
+        for value in values:
+            self.append(value)
+    
+    def recent(self, count: Optional[int] = None) -> np.ndarray:
+        """Return a read-only view of the last `count` values (all kept values by default), oldest first."""
+        start = self._start if count is None else max(self._start, self._end - count)
+        view = self._buffer[start:self._end]
+        view.flags.writeable = False
+        return view
+    
+    def tolist(self) -> List[Union[float, int]]:
+        """Return the kept values as a list of Python numbers."""
+        return self._buffer[self._start:self._end].tolist()
+
 
 class TrainingEpisodeManager:
     """Manages training episodes, logging, and performance tracking."""
@@ -19,15 +152,22 @@ class TrainingEpisodeManager:
     def __init__(self, config: EnvironmentConfig, log_dir: str = "./training_logs"):
         """Initialize training episode manager."""
         self.config = config
+        # Dumped once; the same dict is recorded in every episode file and the summary
+        self._config_data = config.dict() if hasattr(config, 'dict') else str(config)
         self.log_dir = Path(log_dir)
-        self.log_dir.mkdir(exist_ok=True)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
         
         # Episode tracking
         self.current_episode = 0
         self.episode_data: Dict[str, Any] = {}
-        self.episode_rewards: List[float] = []
+        self.step_records = np.zeros(max(1, config.max_episode_steps), dtype=STEP_RECORD_DTYPE)
+        self.step_count = 0
         self.episode_actions: List[Dict[str, Any]] = []
+        self.save_step_details = config.save_step_details
+        self.max_logged_steps = config.max_logged_steps
+        self._step_sampler = random.Random()
         self.episode_start_time = 0.0
+        self._episode_start_monotonic = 0.0
         
         # Performance metrics
         self.total_episodes = 0
@@ -37,9 +177,21 @@ class TrainingEpisodeManager:
         self.worst_episode_reward = float('inf')
         
         # Running averages
-        self.reward_history: List[float] = []
-        self.episode_length_history: List[int] = []
-        self.success_rate_history: List[float] = []
+        self.reward_history = RollingHistory(_HISTORY_LENGTH)
+        self.episode_length_history = RollingHistory(_HISTORY_LENGTH, dtype=np.int64)
+        self.success_rate_history = RollingHistory(_HISTORY_LENGTH)
+        
+        # Reward cache counters as last reported by the reward calculator
+        self.reward_cache_hits = 0
+        self.reward_cache_misses = 0
+        
+        # Whether per-step debug logging is on (rechecked each episode)
+        self._debug = logger.isEnabledFor(logging.DEBUG)
+        
+        # Step records and episode files are written to disk off the step loop
+        self.step_logger = AsyncStepLogger(self.log_dir / "steps.jsonl")
+        self._episode_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="EpisodeWriter")
+        self._pending_episode_saves: List[Future] = []
         
         logger.info(f"TrainingEpisodeManager initialized, logs will be saved to {self.log_dir}")
     
@@ -51,13 +203,15 @@ class TrainingEpisodeManager:
             self.current_episode += 1
         
         self.episode_start_time = time.time()
+        self._episode_start_monotonic = time.monotonic()
         self.episode_data = {
             "episode_number": self.current_episode,
             "start_time": self.episode_start_time,
-            "config": self.config.dict() if hasattr(self.config, 'dict') else str(self.config),
+            "config": self._config_data,
         }
-        self.episode_rewards.clear()
-        self.episode_actions.clear()
+        self.step_count = 0
+        self.episode_actions = []  # the previous list may still be waiting to be saved
+        self._debug = logger.isEnabledFor(logging.DEBUG)
         
         logger.info(f"Started episode {self.current_episode}")
     
@@ -72,6 +226,7 @@ class TrainingEpisodeManager:
     ) -> None:
         """Log information for a single step."""
         step_data = {
+            "episode": self.current_episode,
             "step": step_number,
             "action": action,
             "action_name": action_name,
@@ -95,28 +250,60 @@ class TrainingEpisodeManager:
             else:
                 step_data["observation_type"] = "unknown"
         
-        self.episode_rewards.append(reward)
-        self.episode_actions.append(step_data)
+        # Record the numeric step data, growing the buffer if the episode runs long
+        if self.step_count == len(self.step_records):
+            self.step_records = np.concatenate([self.step_records, np.zeros_like(self.step_records)])
+        self.step_records[self.step_count] = (step_number, action, reward)
+        self.step_count += 1
         
-        logger.debug(f"Episode {self.current_episode}, Step {step_number}: {action_name} -> {reward:.3f}")
+        # Keep a bounded, uniform (reservoir) sample of the step records for the
+        # episode file; steps.jsonl still receives every record
+        if self.save_step_details:
+            if len(self.episode_actions) < self.max_logged_steps:
+                self.episode_actions.append(step_data)
+            else:
+                slot = self._step_sampler.randrange(self.step_count)
+                if slot < self.max_logged_steps:
+                    self.episode_actions[slot] = step_data
+        self.step_logger.log(step_data)
+        
+        if self._debug:
+            logger.debug("Episode %d, Step %d: %s -> %.3f", self.current_episode, step_number, action_name, reward)
+    
+    def get_episode_reward(self) -> float:
+        """Get the sum of the step rewards logged so far in the current episode."""
+        return float(self.step_records["reward"][:self.step_count].sum())
     
     def end_episode(
         self,
         final_reward: float,
         episode_length: int,
         termination_reason: str,
-        reward_calculator: Optional[RewardCalculator] = None
+        reward_calculator: Optional[RewardCalculator] = None,
+        episode_bonus: Optional[float] = None,
+        episode_statistics: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        """End the current episode and calculate statistics."""
+        """
+        End the current episode and calculate statistics.
+        
+        The reward statistics come from ``reward_calculator`` when given;
+        otherwise ``episode_bonus`` and ``episode_statistics`` (as reported in
+        the final step info of a vectorized environment) are used.
+        """
+        # Wait for this episode's step records to reach disk
+        self.step_logger.flush()
+        
         episode_end_time = time.time()
-        episode_duration = episode_end_time - self.episode_start_time
-        total_episode_reward = sum(self.episode_rewards)
+        # Measured on the monotonic clock, so wall-clock adjustments do not skew it
+        episode_duration = time.monotonic() - self._episode_start_monotonic
+        total_episode_reward = self.get_episode_reward()
         
         # Calculate episode bonus if reward calculator is available
-        episode_bonus = 0.0
         if reward_calculator:
             episode_bonus = reward_calculator.calculate_episode_bonus()
-            total_episode_reward += episode_bonus
+            episode_statistics = reward_calculator.get_episode_statistics()
+        episode_bonus = float(episode_bonus or 0.0)
+        total_episode_reward += episode_bonus
         
         # Update episode data
         self.episode_data.update({
@@ -127,10 +314,17 @@ class TrainingEpisodeManager:
             "episode_bonus": episode_bonus,
             "average_reward": total_episode_reward / max(1, episode_length),
             "termination_reason": termination_reason,
-            "actions": self.episode_actions,
-            "reward_breakdown": reward_calculator.get_episode_statistics() if reward_calculator else {},
+            "steps_logged": self.step_count,
+            "reward_breakdown": episode_statistics or {},
         })
         
+        if self.save_step_details:
+            # Put a sampled episode's step records back in step order
+            if len(self.episode_actions) < self.step_count:
+                self.episode_actions.sort(key=lambda step_data: step_data["step"])
+            self.episode_data["actions"] = self.episode_actions
+            self.episode_data["steps_sampled"] = len(self.episode_actions)
+        
         # Update global statistics
         self.total_episodes += 1
         self.total_steps += episode_length
@@ -145,18 +339,16 @@ class TrainingEpisodeManager:
         self.reward_history.append(total_episode_reward)
         self.episode_length_history.append(episode_length)
         
-        if reward_calculator:
-            stats = reward_calculator.get_episode_statistics()
-            self.success_rate_history.append(stats.get("success_rate", 0.0))
-        
-        # Keep only recent history (last 100 episodes)
-        if len(self.reward_history) > 100:
-            self.reward_history = self.reward_history[-100:]
-            self.episode_length_history = self.episode_length_history[-100:]
-            self.success_rate_history = self.success_rate_history[-100:]
+        if episode_statistics:
+            self.success_rate_history.append(float(episode_statistics.get("success_rate", 0.0)))
+            self.reward_cache_hits = int(episode_statistics.get("reward_cache_hits", self.reward_cache_hits))
+            self.reward_cache_misses = int(episode_statistics.get("reward_cache_misses", self.reward_cache_misses))
         
-        # Save episode data
-        self._save_episode_data()
+        # Save episode data in the background
+        self._pending_episode_saves = [future for future in self._pending_episode_saves if not future.done()]
+        self._pending_episode_saves.append(
+            self._episode_writer.submit(self._save_episode_data, self.current_episode, self.episode_data)
+        )
         
         # Calculate and return episode summary
         episode_summary = self._calculate_episode_summary()
@@ -171,9 +363,9 @@ class TrainingEpisodeManager:
     
     def _calculate_episode_summary(self) -> Dict[str, Any]:
         """Calculate summary statistics for the current episode."""
-        recent_rewards = self.reward_history[-10:] if len(self.reward_history) >= 10 else self.reward_history
-        recent_lengths = self.episode_length_history[-10:] if len(self.episode_length_history) >= 10 else self.episode_length_history
-        recent_success_rates = self.success_rate_history[-10:] if len(self.success_rate_history) >= 10 else self.success_rate_history
+        recent_rewards = self.reward_history.recent(10)
+        recent_lengths = self.episode_length_history.recent(10)
+        recent_success_rates = self.success_rate_history.recent(10)
         
         summary = {
             "episode_number": self.current_episode,
@@ -182,9 +374,9 @@ class TrainingEpisodeManager:
             "episode_duration": self.episode_data["duration"],
             
             # Recent performance (last 10 episodes)
-            "recent_avg_reward": np.mean(recent_rewards) if recent_rewards else 0.0,
-            "recent_avg_length": np.mean(recent_lengths) if recent_lengths else 0.0,
-            "recent_avg_success_rate": np.mean(recent_success_rates) if recent_success_rates else 0.0,
+            "recent_avg_reward": recent_rewards.mean() if len(recent_rewards) else 0.0,
+            "recent_avg_length": recent_lengths.mean() if len(recent_lengths) else 0.0,
+            "recent_avg_success_rate": recent_success_rates.mean() if len(recent_success_rates) else 0.0,
             
             # Overall statistics
             "total_episodes": self.total_episodes,
@@ -194,59 +386,53 @@ class TrainingEpisodeManager:
             "worst_episode_reward": self.worst_episode_reward,
             
             # Performance trends
-            "reward_trend": self._calculate_trend(self.reward_history[-20:]) if len(self.reward_history) >= 5 else 0.0,
-            "length_trend": self._calculate_trend(self.episode_length_history[-20:]) if len(self.episode_length_history) >= 5 else 0.0,
+            "reward_trend": self._calculate_trend(self.reward_history.recent(20)) if len(self.reward_history) >= 5 else 0.0,
+            "length_trend": self._calculate_trend(self.episode_length_history.recent(20)) if len(self.episode_length_history) >= 5 else 0.0,
         }
         
         return summary
     
-    def _calculate_trend(self, values: List[float]) -> float:
+    def _calculate_trend(self, values: Union[List[float], np.ndarray]) -> float:
         """Calculate trend (slope) of recent values."""
         if len(values) < 2:
             return 0.0
         
-        x = np.arange(len(values))
-        y = np.array(values)
+        y = np.asarray(values, dtype=np.float64)
+        n = len(y)
         
-        # Simple linear regression slope
-        n = len(values)
-        slope = (n * np.sum(x * y) - np.sum(x) * np.sum(y)) / (n * np.sum(x * x) - np.sum(x) ** 2)
+        # Least-squares slope against x = 0..n-1, whose sums have closed forms
+        sum_x = n * (n - 1) / 2
+        sum_xx = (n - 1) * n * (2 * n - 1) / 6
+        slope = (n * np.dot(np.arange(n), y) - sum_x * y.sum()) / (n * sum_xx - sum_x * sum_x)
         
         return slope
     
-    def _save_episode_data(self) -> None:
-        """Save episode data to JSON file."""
+    def _save_episode_data(self, episode_number: int, episode_data: Dict[str, Any]) -> None:
+        """Append episode data to the episodes JSON Lines file."""
         try:
-            episode_file = self.log_dir / f"episode_{self.current_episode:06d}.json"
+            # All episodes go to one append-only file (one line each) rather than a new
+            # file per episode; the single writer thread keeps the lines in episode order
+            episode_file = self.log_dir / "episodes.jsonl"
             
-            # Convert numpy arrays to lists for JSON serialization
-            episode_data_copy = self._prepare_data_for_json(self.episode_data)
+            # One compact dumps() call uses the C encoder (json.dump/indent fall back to the
+            # pure-Python one, which holds the GIL against the training loop for much longer);
+            # numpy values are converted by the default hook as the encoder reaches them
+            episode_json = json.dumps(episode_data, separators=(",", ":"), default=_json_default)
+            with open(episode_file, 'a') as f:
+                f.write(episode_json + "\n")
             
-            with open(episode_file, 'w') as f:
-                json.dump(episode_data_copy, f, indent=2)
-            
-            logger.debug(f"Saved episode data to {episode_file}")
+            logger.debug("Saved episode %d data to %s", episode_number, episode_file)
             
         except Exception as e:
             logger.error(f"Error saving episode data: {e}")
     
-    def _prepare_data_for_json(self, data: Any) -> Any:
-        """Prepare data for JSON serialization by converting numpy arrays."""
-        if isinstance(data, np.ndarray):
-            return data.tolist()
-        elif isinstance(data, np.integer):
-            return int(data)
-        elif isinstance(data, np.floating):
-            return float(data)
-        elif isinstance(data, dict):
-            return {key: self._prepare_data_for_json(value) for key, value in data.items()}
-        elif isinstance(data, list):
-            return [self._prepare_data_for_json(item) for item in data]
-        else:
-            return data
-    
     def save_training_summary(self) -> None:
         """Save overall training summary."""
+        self.step_logger.flush()
+        for future in self._pending_episode_saves:
+            future.result()
+        self._pending_episode_saves.clear()
+        
         try:
             summary = {
                 "total_episodes": self.total_episodes,
@@ -255,10 +441,10 @@ class TrainingEpisodeManager:
                 "average_reward": self.total_reward / max(1, self.total_episodes),
                 "best_episode_reward": self.best_episode_reward,
                 "worst_episode_reward": self.worst_episode_reward,
-                "config": self.config.dict() if hasattr(self.config, 'dict') else str(self.config),
-                "reward_history": self.reward_history,
-                "episode_length_history": self.episode_length_history,
-                "success_rate_history": self.success_rate_history,
+                "config": self._config_data,
+                "reward_history": self.reward_history.tolist(),
+                "episode_length_history": self.episode_length_history.tolist(),
+                "success_rate_history": self.success_rate_history.tolist(),
                 "timestamp": time.time(),
             }
             
@@ -290,9 +476,12 @@ class TrainingEpisodeManager:
             self.total_reward = summary.get("total_reward", 0.0)
             self.best_episode_reward = summary.get("best_episode_reward", float('-inf'))
             self.worst_episode_reward = summary.get("worst_episode_reward", float('inf'))
-            self.reward_history = summary.get("reward_history", [])
-            self.episode_length_history = summary.get("episode_length_history", [])
-            self.success_rate_history = summary.get("success_rate_history", [])
+            self.reward_history = RollingHistory(_HISTORY_LENGTH)
+            self.reward_history.extend(summary.get("reward_history", [])[-_HISTORY_LENGTH:])
+            self.episode_length_history = RollingHistory(_HISTORY_LENGTH, dtype=np.int64)
+            self.episode_length_history.extend(summary.get("episode_length_history", [])[-_HISTORY_LENGTH:])
+            self.success_rate_history = RollingHistory(_HISTORY_LENGTH)
+            self.success_rate_history.extend(summary.get("success_rate_history", [])[-_HISTORY_LENGTH:])
             
             # Set current episode to continue from where we left off
             self.current_episode = self.total_episodes
@@ -306,22 +495,29 @@ class TrainingEpisodeManager:
             logger.error(f"Error loading training history: {e}")
             return False
     
+    def close(self) -> None:
+        """Wait for queued step records and episode files to be written, then stop the step logger and episode writer."""
+        self.step_logger.close()
+        self._episode_writer.shutdown(wait=True)
+        self._pending_episode_saves.clear()
+    
     def get_performance_metrics(self) -> Dict[str, Any]:
         """Get current performance metrics."""
-        if not self.reward_history:
+        if not len(self.reward_history):
             return {"error": "No training data available"}
         
-        recent_rewards = self.reward_history[-10:] if len(self.reward_history) >= 10 else self.reward_history
+        recent_rewards = self.reward_history.recent(10)
         
         return {
             "episodes_completed": self.total_episodes,
             "total_steps": self.total_steps,
             "average_reward": self.total_reward / max(1, self.total_episodes),
-            "recent_average_reward": np.mean(recent_rewards),
+            "recent_average_reward": recent_rewards.mean(),
             "best_reward": self.best_episode_reward,
             "worst_reward": self.worst_episode_reward,
-            "reward_std": np.std(self.reward_history),
-            "average_episode_length": np.mean(self.episode_length_history) if self.episode_length_history else 0,
-            "average_success_rate": np.mean(self.success_rate_history) if self.success_rate_history else 0,
-            "improvement_trend": self._calculate_trend(self.reward_history[-20:]) if len(self.reward_history) >= 5 else 0.0,
+            "reward_std": self.reward_history.recent().std(),
+            "average_episode_length": self.episode_length_history.recent().mean() if len(self.episode_length_history) else 0,
+            "average_success_rate": self.success_rate_history.recent().mean() if len(self.success_rate_history) else 0,
+            "improvement_trend": self._calculate_trend(self.reward_history.recent(20)) if len(self.reward_history) >= 5 else 0.0,
+            "reward_cache_hit_rate": self.reward_cache_hits / max(1, self.reward_cache_hits + self.reward_cache_misses),
         }
\ No newline at end of file
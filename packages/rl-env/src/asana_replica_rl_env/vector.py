@@ -0,0 +1,87 @@
+"""Helpers for running several Asana Replica environments in parallel."""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import gymnasium as gym
+import numpy as np
+
+from .config import EnvironmentConfig
+from .environment import AsanaReplicaEnv
+
+
+def make_env(config: EnvironmentConfig) -> Callable[[], AsanaReplicaEnv]:
+    """Return a factory that builds an environment from the given config."""
+    def _make() -> AsanaReplicaEnv:
+        return AsanaReplicaEnv(config)
+    return _make
+
+
+def worker_configs(config: EnvironmentConfig, base_urls: Sequence[str]) -> List[EnvironmentConfig]:
+    """Create one config per worker, each pointed at its own application URL."""
+    # Rebuilt through validation (model_copy would skip it), so each URL is checked and normalized
+    config_data = config.model_dump()
+    return [EnvironmentConfig.model_validate({**config_data, "base_url": url}) for url in base_urls]
+
+
+def make_vec(
+    num_envs: int,
+    config: EnvironmentConfig,
+    base_urls: Optional[Sequence[str]] = None,
+    **vector_kwargs: Any,
+) -> gym.vector.AsyncVectorEnv:
+    """
+    Create an AsyncVectorEnv running one environment (and browser) per worker process.
+    
+    Finished sub-environments are reset within the same step, so callers only
+    reset the vector env once; the last observation and info of a finished
+    episode arrive in ``info["final_obs"]`` and ``info["final_info"]``.
+    
+    Observations (including screenshots) are written by the workers straight into
+    shared memory rather than pickled through the pipes; pass ``copy=False`` to
+    read the batch as views of that buffer, valid until the next step.
+    
+    Browser pooling (``browser_pool_size``) is turned off in the workers.
+    
+    Args:
+        num_envs: Number of worker processes
+        config: Environment configuration shared by all workers
+        base_urls: Optional application URL per worker (one app instance each)
+        **vector_kwargs: Further keyword arguments for AsyncVectorEnv
+    
+    Returns:
+        The vectorized environment
+    """
+    # A worker runs one environment until it exits, so a pooled browser would never be reused,
+    # and atexit does not reliably quit it when the worker is terminated; close() quits it instead
+    config = EnvironmentConfig.model_validate({**config.model_dump(), "browser_pool_size": 0})
+    
+    if base_urls is None:
+        configs = [config] * num_envs
+    elif len(base_urls) != num_envs:
+        raise ValueError(f"Expected {num_envs} base URLs, got {len(base_urls)}")
+    else:
+        configs = worker_configs(config, base_urls)
+    
+    return gym.vector.AsyncVectorEnv(
+        [make_env(worker_config) for worker_config in configs],
+        autoreset_mode=gym.vector.AutoresetMode.SAME_STEP,
+        **vector_kwargs,
+    )
+
+
+def unbatch_info(infos: Dict[str, Any], index: int) -> Dict[str, Any]:
+    """Extract the info dict of a single sub-environment from a vectorized info dict."""
+    info = {}
+    for key, value in infos.items():
+        if key.startswith("_"):
+            continue
+        mask = infos.get(f"_{key}")
+        if mask is not None and not mask[index]:
+            continue
+        if isinstance(value, dict):
+            info[key] = unbatch_info(value, index)
+        else:
+            item = value[index]
+            # Batched scalars come back as numpy scalars; hand out plain Python values
+            info[key] = item.item() if isinstance(item, np.generic) else item
+    return info
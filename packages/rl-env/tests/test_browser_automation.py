@@ -0,0 +1,199 @@
+"""Tests for the browser automation helpers, run against a mocked WebDriver."""
+
+import json
+import shutil
+import subprocess
+from unittest import mock
+
+import pytest
+
+from selenium.common.exceptions import ElementClickInterceptedException, NoSuchWindowException
+from selenium.webdriver.common.by import By
+
+from asana_replica_rl_env.browser_automation import BrowserAutomation
+from asana_replica_rl_env.config import EnvironmentConfig
+
+
+def make_browser(script_result):
+    """Build a BrowserAutomation whose driver answers every script with script_result."""
+    browser = BrowserAutomation(EnvironmentConfig())
+    browser.driver = mock.Mock()
+    browser.driver.execute_script.return_value = script_result
+    return browser
+
+
+def test_click_element_uses_native_click():
+    browser = make_browser("ok")
+    element = mock.Mock()
+    
+    with mock.patch.object(browser, "find_element", return_value=element):
+        assert browser.click_element("#menu-trigger")
+    
+    element.click.assert_called_once_with()
+    # Only the check-and-scroll script runs in the page; it must not click by itself
+    script, target = browser.driver.execute_script.call_args.args
+    assert target is element
+    assert ".click()" not in script
+
+
+def test_click_element_falls_back_to_script_click_when_intercepted():
+    browser = make_browser("ok")
+    element = mock.Mock()
+    element.click.side_effect = ElementClickInterceptedException("overlay")
+    
+    with mock.patch.object(browser, "find_element", return_value=element):
+        assert browser.click_element("#menu-trigger")
+    
+    browser.driver.execute_script.assert_called_with("arguments[0].click();", element)
+
+
+def test_click_element_skips_elements_that_cannot_be_clicked():
+    browser = make_browser("hidden")
+    element = mock.Mock()
+    
+    with mock.patch.object(browser, "find_element", return_value=element):
+        assert not browser.click_element("#menu-trigger")
+    
+    element.click.assert_not_called()
+
+
+def test_click_first_clicks_the_returned_element_natively():
+    element = mock.Mock()
+    browser = make_browser(element)
+    
+    assert browser.click_first('[data-testid="task-card"]')
+    
+    element.click.assert_called_once_with()
+    assert browser.driver.execute_script.call_count == 1
+
+
+def test_click_first_reports_a_missing_element():
+    browser = make_browser("missing")
+    
+    assert not browser.click_first('[data-testid="task-card"]')
+
+
+def test_click_first_with_non_css_locator():
+    browser = make_browser("ok")
+    element = mock.Mock()
+    browser.driver.find_elements.return_value = [element, mock.Mock()]
+    
+    assert browser.click_first((By.XPATH, "//button"))
+    
+    element.click.assert_called_once_with()
+
+
+def test_close_spare_tabs_survives_a_dead_tab():
+    browser = make_browser(None)
+    browser.driver.current_window_handle = "tab-0"
+    browser.driver.window_handles = ["tab-0"]
+    browser.driver.switch_to.window.side_effect = [NoSuchWindowException("tab-1 is gone"), None]
+    browser._spare_tabs = ["tab-1"]
+    
+    browser.close_spare_tabs()
+    
+    assert browser._spare_tabs == []
+    browser.driver.switch_to.window.assert_called_with("tab-0")
+
+
+def start_chrome_options(**config_kwargs):
+    """Start Chrome with a mocked driver and return the arguments it was given."""
+    browser = BrowserAutomation(EnvironmentConfig(driver_path="/usr/bin/chromedriver", **config_kwargs))
+    with mock.patch("asana_replica_rl_env.browser_automation.ChromeService"), \
+            mock.patch("asana_replica_rl_env.browser_automation.webdriver.Chrome") as chrome:
+        browser._start_chrome()
+    return chrome.call_args.kwargs["options"].arguments
+
+
+def test_chrome_gpu_is_disabled_by_default():
+    arguments = start_chrome_options()
+    
+    assert "--disable-gpu" in arguments
+    assert "--enable-gpu-rasterization" not in arguments
+
+
+def test_chrome_gpu_rasterization_is_opt_in():
+    arguments = start_chrome_options(gpu_rasterization=True)
+    
+    assert "--enable-gpu-rasterization" in arguments
+    assert "--disable-gpu" not in arguments
+
+
+# Minimal DOM for running the drag and drop script under node. The board mimics
+# React: the card dragged at dragstart is only recorded after the handler returns,
+# and a drop moves the card into the column once the status update completes.
+_FAKE_BOARD_JS = """
+class Element {
+    constructor(testId) { this.testId = testId; this.parent = null; this.children = []; this.listeners = {}; }
+    getAttribute(name) { return name === 'data-testid' ? this.testId : null; }
+    addEventListener(type, listener) { (this.listeners[type] = this.listeners[type] || []).push(listener); }
+    append(child) {
+        if (child.parent) child.parent.children = child.parent.children.filter((c) => c !== child);
+        child.parent = this;
+        this.children.push(child);
+    }
+    contains(other) { for (let el = other; el; el = el.parent) if (el === this) return true; return false; }
+    querySelector(selector) {
+        const testId = /data-testid="(.*)"/.exec(selector)[1];
+        const stack = [...this.children];
+        while (stack.length) { const el = stack.pop(); if (el.testId === testId) return el; stack.push(...el.children); }
+        return null;
+    }
+    dispatchEvent(event) {
+        for (let el = this; el; el = el.parent) for (const listener of el.listeners[event.type] || []) listener(event);
+        return true;
+    }
+}
+globalThis.DataTransfer = class {};
+globalThis.DragEvent = class { constructor(type, init) { this.type = type; Object.assign(this, init); } };
+globalThis.CSS = {escape: (value) => value};
+
+const [handlesDrop, timeoutMs] = process.argv.slice(2).map(Number);
+const todo = new Element('column-todo'), completed = new Element('column-completed');
+const card = new Element('task-card-1');
+todo.append(card);
+let draggedTask = null;
+card.addEventListener('dragstart', () => queueMicrotask(() => { draggedTask = card; }));
+if (handlesDrop) {
+    completed.addEventListener('drop', () => {
+        if (draggedTask) setTimeout(() => completed.append(new Element('task-card-1')), 100);
+    });
+}
+new Function(SCRIPT)(card, completed, timeoutMs, (moved) => console.log(JSON.stringify(moved)));
+"""
+
+
+def run_drag_and_drop_in_node(tmp_path, handles_drop):
+    """Run the drag and drop script against the fake board and return what it reported."""
+    script_file = tmp_path / "drag_and_drop.js"
+    script_file.write_text(f"const SCRIPT = {json.dumps(BrowserAutomation._html5_dnd_js)};\n{_FAKE_BOARD_JS}")
+    result = subprocess.run(
+        ["node", str(script_file), str(int(handles_drop)), "500"], capture_output=True, text=True, check=True, timeout=30
+    )
+    return json.loads(result.stdout)
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs node to run the page script")
+def test_drag_and_drop_script_lets_the_page_see_the_dragged_card(tmp_path):
+    assert run_drag_and_drop_in_node(tmp_path, handles_drop=True) is True
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs node to run the page script")
+def test_drag_and_drop_script_reports_a_card_that_did_not_move(tmp_path):
+    assert run_drag_and_drop_in_node(tmp_path, handles_drop=False) is False
+
+
+def test_drag_and_drop_fails_when_the_card_does_not_reach_the_target():
+    browser = BrowserAutomation(EnvironmentConfig(action_timeout=2.0))
+    browser.driver = mock.Mock()
+    source, target = mock.Mock(), mock.Mock()
+    
+    with mock.patch.object(browser, "find_element", side_effect=[source, target]):
+        browser.driver.execute_async_script.return_value = False
+        assert not browser.drag_and_drop('[data-testid="task-card"]', '[data-testid="column-completed"]')
+    
+    browser.driver.execute_async_script.assert_called_once_with(browser._html5_dnd_js, source, target, 2000.0)
+    
+    with mock.patch.object(browser, "find_element", side_effect=[source, target]):
+        browser.driver.execute_async_script.return_value = True
+        assert browser.drag_and_drop('[data-testid="task-card"]', '[data-testid="column-completed"]')
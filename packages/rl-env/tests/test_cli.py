@@ -0,0 +1,29 @@
+"""Tests for the command-line interface."""
+
+import json
+
+import pytest
+
+from asana_replica_rl_env.cli import build_parser, create_config
+
+
+def test_create_config_writes_the_config(tmp_path):
+    output_file = tmp_path / "config.json"
+    args = build_parser().parse_args(["config", "--output", str(output_file), "--max-steps", "50"])
+    
+    create_config(args)
+    
+    assert json.loads(output_file.read_text())["max_episode_steps"] == 50
+    assert not (tmp_path / "config.json.tmp").exists()
+
+
+def test_create_config_removes_the_temporary_file_on_failure(tmp_path):
+    # A non-empty directory cannot be replaced by a file
+    output_dir = tmp_path / "config.json"
+    (output_dir / "keep").mkdir(parents=True)
+    args = build_parser().parse_args(["config", "--output", str(output_dir)])
+    
+    with pytest.raises(OSError):
+        create_config(args)
+    
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["config.json"]
@@ -0,0 +1,40 @@
+"""Tests for the configuration models."""
+
+import os
+
+import pytest
+from pydantic import ValidationError
+
+from asana_replica_rl_env.config import EnvironmentConfig
+
+
+def test_load_reward_config_returns_a_copy_per_load(tmp_path):
+    config_file = tmp_path / "reward.json"
+    config_file.write_text('{"task_completion_reward": 12.0}')
+    
+    first = EnvironmentConfig.load_reward_config(str(config_file))
+    first.task_completion_reward = 0.0
+    
+    second = EnvironmentConfig.load_reward_config(str(config_file))
+    assert second is not first
+    assert second.task_completion_reward == 12.0
+
+
+def test_load_reward_config_rereads_a_changed_file(tmp_path):
+    config_file = tmp_path / "reward.json"
+    config_file.write_text('{"task_completion_reward": 12.0}')
+    assert EnvironmentConfig.load_reward_config(str(config_file)).task_completion_reward == 12.0
+    
+    config_file.write_text('{"task_completion_reward": 4.0}')
+    mtime_ns = os.stat(config_file).st_mtime_ns + 1_000_000
+    os.utime(config_file, ns=(mtime_ns, mtime_ns))
+    assert EnvironmentConfig.load_reward_config(str(config_file)).task_completion_reward == 4.0
+
+
+@pytest.mark.parametrize("quality", [0, 101])
+def test_screenshot_jpeg_quality_must_be_a_valid_jpeg_quality(quality):
+    with pytest.raises(ValidationError):
+        EnvironmentConfig(screenshot_jpeg_quality=quality)
+    
+    assert EnvironmentConfig(screenshot_jpeg_quality=1).screenshot_jpeg_quality == 1
+    assert EnvironmentConfig(screenshot_jpeg_quality=100).screenshot_jpeg_quality == 100
@@ -0,0 +1,111 @@
+"""Tests for the environment, run against a fake WebDriver."""
+
+from selenium.common.exceptions import NoSuchWindowException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from asana_replica_rl_env.config import EnvironmentConfig
+from asana_replica_rl_env.environment import AsanaReplicaEnv
+
+
+class FakeTabbedDriver:
+    """Fake WebDriver whose tabs each show the server's task count as it was when the tab loaded."""
+    
+    def __init__(self):
+        self.server_todo = 0
+        self.tabs = {"tab-0": 0}
+        self.opened_tabs = 0
+        self.current_window_handle = "tab-0"
+        self.current_url = "about:blank"
+        self.switch_to = self
+    
+    @property
+    def window_handles(self):
+        return list(self.tabs)
+    
+    def get(self, url):
+        self.current_url = url
+        self.tabs[self.current_window_handle] = self.server_todo
+    
+    def window(self, handle):
+        self.current_window_handle = handle
+    
+    def close(self):
+        del self.tabs[self.current_window_handle]
+    
+    def missing_window(self, handle):
+        raise NoSuchWindowException(f"No window {handle}")
+    
+    def execute_script(self, script, *args):
+        if "window.open" in script:
+            self.opened_tabs += 1
+            self.tabs[f"tab-{self.opened_tabs}"] = self.server_todo
+            return None
+        if "document.readyState" in script:
+            return "complete"
+        counts = {"todo_tasks": self.tabs[self.current_window_handle], "in_progress_tasks": 0, "completed_tasks": 0, "project_cards": 0}
+        return {"counts": counts, "scroll": [0, 0, 100, 100], "title": "", "ready_state": "complete"}
+    
+    def create_task(self, *args):
+        """Stand in for the create-task action: the server and the page in use both see the new task."""
+        self.server_todo += 1
+        self.tabs[self.current_window_handle] = self.server_todo
+        return True
+
+
+def make_env(driver):
+    """Build an environment driving the fake driver, with pre-loaded reset tabs and two-step episodes."""
+    config = EnvironmentConfig(
+        observation_mode="structured", login_required=False, max_episode_steps=2, preload_reset_tab=True
+    )
+    env = AsanaReplicaEnv(config)
+    env._ensure_components()
+    env.browser.driver = driver
+    env.browser.wait = WebDriverWait(driver, 1, poll_frequency=0.01)
+    env.action_executor.execute_action = driver.create_task
+    return env
+
+
+def test_reset_observation_matches_the_server_with_a_preloaded_tab():
+    driver = FakeTabbedDriver()
+    env = make_env(driver)
+    
+    observation, _ = env.reset()
+    assert observation["task_counts"].tolist() == [0, 0, 0]
+    
+    for _ in range(2):
+        observation, _, _, truncated, _ = env.step(0)
+        assert observation["task_counts"][0] == driver.server_todo
+    assert truncated
+    assert len(driver.tabs) == 2  # the tab for the next reset, loaded after the last change
+    
+    observation, info = env.reset()
+    assert "error" not in info
+    assert len(driver.tabs) == 1
+    assert observation["task_counts"].tolist() == [driver.server_todo, 0, 0]
+    
+    # A step taken after the end of the episode replaces the pre-loaded tab instead of leaving it stale
+    for _ in range(3):
+        env.step(0)
+    assert driver.opened_tabs == 3
+    assert list(driver.tabs.values()) == [driver.server_todo, driver.server_todo]
+
+
+def test_step_survives_a_spare_tab_that_cannot_be_closed():
+    driver = FakeTabbedDriver()
+    env = make_env(driver)
+    env.reset()
+    env.step(0)
+    env.step(0)
+    assert len(env.browser._spare_tabs) == 1
+    
+    # The spare tab died: switching to it fails while the episode goes on
+    dead_tab = env.browser._spare_tabs[0]
+    del driver.tabs[dead_tab]
+    switch = driver.window
+    driver.window = lambda handle: switch(handle) if handle in driver.tabs else driver.missing_window(handle)
+    
+    observation, _, terminated, _, info = env.step(0)
+    
+    assert "error" not in info and not terminated
+    assert dead_tab not in env.browser._spare_tabs
+    assert observation["task_counts"][0] == driver.server_todo
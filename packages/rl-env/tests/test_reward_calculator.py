@@ -0,0 +1,194 @@
+"""Tests for the reward calculator."""
+
+import logging
+import time
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from asana_replica_rl_env.config import EnvironmentConfig, RewardConfig
+from asana_replica_rl_env.environment import AsanaReplicaEnv
+from asana_replica_rl_env.reward_calculator import REWARD_CACHE_SIZE, RewardCalculator, get_scenario_config
+
+
+def structured_observation(todo=0, in_progress=0, completed=0, projects=0):
+    """Build the structured features the reward calculator reads."""
+    return {
+        "task_counts": np.array([todo, in_progress, completed], dtype=np.int32),
+        "project_count": np.array([projects], dtype=np.int32),
+    }
+
+
+def test_calculate_reward_for_task_creation():
+    calculator = RewardCalculator(RewardConfig())
+    
+    reward = calculator.calculate_reward("create_new_task", True, structured_observation(todo=1), step_time=0.5)
+    
+    breakdown = calculator.get_last_reward_breakdown()
+    assert breakdown["base_action"] == pytest.approx(0.5)
+    assert breakdown["task_creation"] == pytest.approx(2.0)
+    assert breakdown["efficiency_bonus"] == pytest.approx(0.5)  # quick action
+    assert breakdown["penalty"] == 0.0
+    assert reward == pytest.approx(3.0)
+    assert breakdown["total"] == reward
+    assert calculator.get_episode_statistics()["tasks_created"] == 1
+
+
+def test_calculate_reward_for_hybrid_observation():
+    calculator = RewardCalculator(RewardConfig())
+    observation = {"visual": np.zeros((4, 4, 3), dtype=np.uint8), "structured": structured_observation(projects=1)}
+    
+    reward = calculator.calculate_reward("create_new_project", True, observation, step_time=3.0)
+    
+    assert reward == pytest.approx(1.0 + 5.0)  # base action + project creation
+    assert calculator.get_episode_statistics()["projects_created"] == 1
+
+
+def test_calculate_reward_for_failed_action():
+    calculator = RewardCalculator(RewardConfig())
+    
+    reward = calculator.calculate_reward("add_comment", False, structured_observation(), step_time=3.0)
+    
+    # A failed comment still earns the collaboration reward, as it always has
+    breakdown = calculator.get_last_reward_breakdown()
+    assert breakdown["base_action"] == 0.0
+    assert breakdown["penalty"] == pytest.approx(-1.0)
+    assert reward == pytest.approx(-1.0 + 1.5)
+    assert calculator.get_episode_statistics()["invalid_actions"] == 1
+
+
+def test_timeout_penalty_uses_action_timeout():
+    calculator = RewardCalculator(RewardConfig(), action_timeout=2.0)
+    
+    reward = calculator.calculate_reward("refresh_page", True, structured_observation(), step_time=2.5)
+    
+    assert calculator.get_last_reward_breakdown()["penalty"] == pytest.approx(-5.0)
+    assert reward == pytest.approx(-5.0)
+    
+    calculator = RewardCalculator(RewardConfig(), action_timeout=10.0)
+    assert calculator.calculate_reward("refresh_page", True, structured_observation(), step_time=2.5) == 0.0
+
+
+def test_environment_passes_its_action_timeout():
+    env = AsanaReplicaEnv(EnvironmentConfig(action_timeout=3.0))
+    
+    assert env.reward_calculator.action_timeout == 3.0
+
+
+def step_with_action_duration(env, seconds):
+    """Take one step whose action takes the given time, and return its reward breakdown."""
+    def slow_action(action, action_name):
+        time.sleep(seconds)
+        return True
+    
+    with mock.patch.object(env.action_executor, "execute_action", side_effect=slow_action), \
+            mock.patch.object(env.state_observer, "get_observation", return_value=structured_observation()), \
+            mock.patch.object(env.browser, "get_current_url", return_value="http://localhost:3000/dashboard"):
+        _, reward, _, _, info = env.step(0)
+    assert info["reward_components"]["total"] == reward
+    return info["reward_components"]
+
+
+def test_step_rewards_use_the_measured_action_time():
+    env = AsanaReplicaEnv(EnvironmentConfig(observation_mode="structured", action_timeout=0.2))
+    env._ensure_components()
+    
+    # A quick action earns the quick action bonus, and nothing is penalized
+    quick = step_with_action_duration(env, 0.0)
+    assert quick["efficiency_bonus"] == pytest.approx(0.5)
+    assert quick["penalty"] == 0.0
+    
+    # An action slower than action_timeout gets the timeout penalty
+    slow = step_with_action_duration(env, 0.3)
+    assert slow["efficiency_bonus"] == pytest.approx(0.5)  # still under the 2 s quick action threshold
+    assert slow["penalty"] == pytest.approx(-5.0)
+
+
+def test_reward_cache_hit_and_miss():
+    calculator = RewardCalculator(RewardConfig())
+    
+    first = calculator.calculate_reward("create_new_task", True, structured_observation(todo=1), step_time=3.0)
+    assert (calculator.reward_cache_hits, calculator.reward_cache_misses) == (0, 1)
+    
+    # The cache is kept across episodes, so the same transition from a reset state is a hit
+    calculator.reset()
+    second = calculator.calculate_reward("create_new_task", True, structured_observation(todo=1), step_time=3.0)
+    assert (calculator.reward_cache_hits, calculator.reward_cache_misses) == (1, 1)
+    assert second == first
+    
+    # A different action or outcome on the same transition is a different entry
+    calculator.reset()
+    calculator.calculate_reward("create_new_task", False, structured_observation(todo=1), step_time=3.0)
+    assert (calculator.reward_cache_hits, calculator.reward_cache_misses) == (1, 2)
+
+
+def test_reward_cache_evicts_least_recently_used():
+    calculator = RewardCalculator(RewardConfig())
+    for todo in range(REWARD_CACHE_SIZE):
+        calculator._get_state_rewards((todo, 0, 0), 0, "scroll_down", True)
+    assert len(calculator._reward_cache) == REWARD_CACHE_SIZE
+    
+    # Touch the oldest entry, so the next insertion evicts the second oldest instead
+    calculator._get_state_rewards((0, 0, 0), 0, "scroll_down", True)
+    calculator._get_state_rewards((REWARD_CACHE_SIZE, 0, 0), 0, "scroll_down", True)
+    assert len(calculator._reward_cache) == REWARD_CACHE_SIZE
+    
+    misses = calculator.reward_cache_misses
+    calculator._get_state_rewards((0, 0, 0), 0, "scroll_down", True)
+    assert calculator.reward_cache_misses == misses
+    calculator._get_state_rewards((1, 0, 0), 0, "scroll_down", True)
+    assert calculator.reward_cache_misses == misses + 1
+
+
+def _complete_task_after_navigation(calculator, step_time, deadline_passed, navigation_steps):
+    """Reset, navigate a few times, then complete a task; return the last reward breakdown."""
+    calculator.reset()
+    if deadline_passed:
+        calculator._deadline_time = time.monotonic() - 1.0
+    for _ in range(navigation_steps):
+        calculator.calculate_reward("scroll_down", True, structured_observation(todo=1), step_time=3.0)
+    calculator.calculate_reward("change_task_status_completed", True, structured_observation(completed=1), step_time)
+    return calculator.get_last_reward_breakdown()
+
+
+@pytest.mark.parametrize("step_time", [0.5, 3.0, 20.0])
+@pytest.mark.parametrize("deadline_passed", [False, True])
+@pytest.mark.parametrize("navigation_steps", [1, 5])
+def test_cached_rewards_match_uncached(step_time, deadline_passed, navigation_steps):
+    # Warm the cache with the same transitions under the opposite timing and deadline
+    cached = RewardCalculator(RewardConfig())
+    _complete_task_after_navigation(cached, 20.5 - step_time, not deadline_passed, navigation_steps)
+    hits = cached.reward_cache_hits
+    
+    breakdown = _complete_task_after_navigation(cached, step_time, deadline_passed, navigation_steps)
+    assert cached.reward_cache_hits == hits + navigation_steps + 1
+    
+    uncached = RewardCalculator(RewardConfig())
+    expected = _complete_task_after_navigation(uncached, step_time, deadline_passed, navigation_steps)
+    assert uncached.reward_cache_hits <= navigation_steps - 1  # only repeated scrolls can hit
+    assert breakdown == expected
+    
+    # The deadline multiplier and the timing terms are applied per step, on top of the cached values
+    assert breakdown["task_completion"] == pytest.approx(10.0 if deadline_passed else 15.0)
+    assert breakdown["efficiency_bonus"] == pytest.approx(0.5 if step_time < 2.0 else 0.0)
+    expected_penalty = (-5.0 if step_time > 10.0 else 0.0) + (-0.1 * (navigation_steps - 3) if navigation_steps > 3 else 0.0)
+    assert breakdown["penalty"] == pytest.approx(expected_penalty)
+
+
+def test_scenario_configs_are_copies():
+    config = get_scenario_config("efficiency-training")
+    config.task_completion_reward = 0.0
+    
+    fresh = get_scenario_config("efficiency-training")
+    assert fresh is not config
+    assert fresh.task_completion_reward == 15.0
+
+
+def test_unknown_scenario_warns_on_every_lookup(caplog):
+    with caplog.at_level(logging.WARNING, logger="asana_replica_rl_env.reward_calculator"):
+        first = get_scenario_config("no-such-scenario")
+        second = get_scenario_config("no-such-scenario")
+    
+    assert [record.getMessage() for record in caplog.records] == ["Unknown scenario: no-such-scenario, using default"] * 2
+    assert first == RewardConfig() and first is not second
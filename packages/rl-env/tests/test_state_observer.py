@@ -0,0 +1,53 @@
+"""Tests for the state observer, run against a fake browser."""
+
+import threading
+import time
+
+import numpy as np
+
+from asana_replica_rl_env.config import EnvironmentConfig
+from asana_replica_rl_env.state_observer import StateObserver
+
+
+class SerialCheckingBrowser:
+    """Fake browser recording whether its WebDriver commands ever overlap or leave the calling thread."""
+    
+    def __init__(self, config):
+        self.frame = np.full((config.screenshot_height, config.screenshot_width, 3), 7, dtype=np.uint8)
+        self.threads = set()
+        self.overlapped = False
+        self._in_flight = 0
+        self._lock = threading.Lock()
+    
+    def _command(self, result):
+        with self._lock:
+            self._in_flight += 1
+            self.overlapped |= self._in_flight > 1
+            self.threads.add(threading.get_ident())
+        time.sleep(0.01)  # long enough for a concurrent command to show up
+        with self._lock:
+            self._in_flight -= 1
+        return result
+    
+    def get_page_screenshot(self):
+        return self._command(self.frame)
+    
+    def execute_javascript(self, script, *args):
+        counts = {"todo_tasks": 2, "in_progress_tasks": 1, "completed_tasks": 3, "project_cards": 4}
+        return self._command({"counts": counts, "scroll": [0, 0, 100, 100], "title": "", "ready_state": "complete"})
+
+
+def test_hybrid_observation_drives_the_browser_from_one_thread_at_a_time():
+    config = EnvironmentConfig(observation_mode="hybrid", screenshot_width=8, screenshot_height=6)
+    browser = SerialCheckingBrowser(config)
+    observer = StateObserver(browser, config)
+    
+    for _ in range(5):
+        observer.invalidate()
+        observation = observer.get_observation()
+    
+    assert not browser.overlapped
+    assert browser.threads == {threading.get_ident()}
+    assert observation["visual"] is browser.frame
+    assert observation["structured"]["task_counts"].tolist() == [2, 1, 3]
+    assert observation["structured"]["project_count"].tolist() == [4]
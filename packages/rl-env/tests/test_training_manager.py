@@ -0,0 +1,38 @@
+"""Tests for the training episode manager and its step logger."""
+
+import json
+
+import numpy as np
+
+from asana_replica_rl_env.config import EnvironmentConfig
+from asana_replica_rl_env.training_manager import AsyncStepLogger, TrainingEpisodeManager
+
+
+def read_records(log_file):
+    with open(log_file) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_step_logger_close_writes_queued_records_and_joins_thread(tmp_path):
+    step_logger = AsyncStepLogger(tmp_path / "steps.jsonl", batch_size=4)
+    for step in range(10):
+        step_logger.log({"step": step, "reward": np.float32(0.5)})
+    
+    step_logger.close()
+    
+    assert not step_logger._thread.is_alive()
+    assert read_records(tmp_path / "steps.jsonl") == [{"step": step, "reward": 0.5} for step in range(10)]
+    step_logger.close()  # closing again is a no-op
+
+
+def test_episode_manager_close_stops_step_logger(tmp_path):
+    manager = TrainingEpisodeManager(EnvironmentConfig(), log_dir=str(tmp_path))
+    manager.start_episode()
+    observation = {"task_counts": np.array([1, 0, 0], dtype=np.int32)}
+    for step in range(3):
+        manager.log_step(step, 0, "create_new_task", 1.0, observation, {})
+    
+    manager.close()
+    
+    assert not manager.step_logger._thread.is_alive()
+    assert [record["step"] for record in read_records(tmp_path / "steps.jsonl")] == [0, 1, 2]
@@ -0,0 +1,102 @@
+"""Tests for the vector environment helpers, run with a dummy environment instead of a browser."""
+
+from unittest import mock
+
+import gymnasium as gym
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from asana_replica_rl_env import vector
+from asana_replica_rl_env.browser_automation import BrowserAutomation
+from asana_replica_rl_env.config import EnvironmentConfig
+
+
+class CountingEnv(gym.Env):
+    """Dummy environment observing its step count and ending every `max_episode_steps` steps."""
+    
+    def __init__(self, config):
+        self.config = config
+        self.observation_space = gym.spaces.Box(0, 100, shape=(1,), dtype=np.int32)
+        self.action_space = gym.spaces.Discrete(2)
+        self.current_step = 0
+    
+    def reset(self, seed=None, options=None):
+        super().reset(seed=seed)
+        self.current_step = 0
+        return np.array([0], dtype=np.int32), {"base_url": self.config.base_url}
+    
+    def step(self, action):
+        self.current_step += 1
+        truncated = self.current_step >= self.config.max_episode_steps
+        info = {"episode_step": self.current_step, "reward_components": {"total": float(action)}}
+        return np.array([self.current_step], dtype=np.int32), float(action), False, truncated, info
+
+
+def test_worker_configs_validate_each_url():
+    config = EnvironmentConfig(max_episode_steps=7)
+    
+    configs = vector.worker_configs(config, ["http://localhost:3001/", "http://localhost:3002"])
+    
+    assert [worker_config.base_url for worker_config in configs] == ["http://localhost:3001", "http://localhost:3002"]
+    assert all(worker_config.max_episode_steps == 7 for worker_config in configs)
+    with pytest.raises(ValidationError):
+        vector.worker_configs(config, ["localhost:3003"])
+
+
+def test_make_vec_checks_the_number_of_urls():
+    with pytest.raises(ValueError):
+        vector.make_vec(2, EnvironmentConfig(), base_urls=["http://localhost:3001"])
+
+
+def test_worker_env_close_quits_its_browser_instead_of_pooling_it(monkeypatch):
+    # Build the worker factories without starting worker processes
+    monkeypatch.setattr(gym.vector, "AsyncVectorEnv", lambda env_fns, **kwargs: env_fns)
+    env_fns = vector.make_vec(1, EnvironmentConfig(browser_pool_size=2))
+    env = env_fns[0]()
+    env._ensure_components()
+    driver = env.browser.driver = mock.Mock()
+    
+    env.close()
+    
+    driver.quit.assert_called_once_with()
+    assert not any(BrowserAutomation._pool.values())
+
+
+def test_make_vec_resets_finished_workers_in_the_same_step(monkeypatch):
+    monkeypatch.setattr(vector, "AsanaReplicaEnv", CountingEnv)
+    config = EnvironmentConfig(max_episode_steps=2)
+    envs = vector.make_vec(2, config, base_urls=["http://localhost:3001", "http://localhost:3002"])
+    try:
+        _, infos = envs.reset(seed=0)
+        assert [vector.unbatch_info(infos, i)["base_url"] for i in range(2)] == ["http://localhost:3001", "http://localhost:3002"]
+        
+        observations, _, _, truncations, infos = envs.step(np.array([1, 0]))
+        assert observations[:, 0].tolist() == [1, 1]
+        assert "final_obs" not in infos
+        
+        # Both episodes end here, and each worker already starts its next episode
+        observations, _, _, truncations, infos = envs.step(np.array([1, 0]))
+        assert truncations.tolist() == [True, True]
+        assert observations[:, 0].tolist() == [0, 0]
+        assert [final_obs.tolist() for final_obs in infos["final_obs"]] == [[2], [2]]
+        
+        final_info = vector.unbatch_info(infos["final_info"], 0)
+        assert final_info == {"episode_step": 2, "reward_components": {"total": 1.0}}
+        assert type(final_info["episode_step"]) is int
+        assert vector.unbatch_info(infos, 1)["base_url"] == "http://localhost:3002"
+    finally:
+        envs.close()
+
+
+def test_unbatch_info_skips_masked_out_entries():
+    infos = {
+        "action_name": np.array(["scroll_down", None], dtype=object),
+        "_action_name": np.array([True, False]),
+        "reward_components": {"total": np.array([0.5, 1.5]), "_total": np.array([True, True])},
+        "_reward_components": np.array([True, True]),
+    }
+    
+    assert vector.unbatch_info(infos, 0) == {"action_name": "scroll_down", "reward_components": {"total": 0.5}}
+    assert vector.unbatch_info(infos, 1) == {"reward_components": {"total": 1.5}}
+    assert type(vector.unbatch_info(infos, 1)["reward_components"]["total"]) is float